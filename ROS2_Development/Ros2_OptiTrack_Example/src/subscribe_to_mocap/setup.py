@@ -21,6 +21,8 @@ setup(
     entry_points={
         'console_scripts': [
             'sub_mocap = subscribe_to_mocap.sub_mocap:main',
+            'path_follower = subscribe_to_mocap.path_follower:main',
+            'mocap_bridge = subscribe_to_mocap.mocap_bridge:main',
         ],
     },
 )
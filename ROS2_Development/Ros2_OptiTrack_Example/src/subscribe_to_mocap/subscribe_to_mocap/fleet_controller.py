@@ -0,0 +1,131 @@
+"""
+Pure-pursuit path following for a fleet of Zumo robots.
+
+All robots are handled as rows of NumPy arrays, so one control step for the
+whole fleet is a handful of vectorized operations instead of a Python loop
+per robot. The module has no ROS dependency; path_follower.py wraps it in a
+node fed by /mocap/rigid_bodies.
+
+Paths and nearest-point queries come from path_planner and path_tracking,
+the package's copies of the Pi-side planning tools, so the robots follow
+exactly the paths planned there.
+
+Units are metres and radians; wheel speeds are returned in m/s.
+"""
+import numpy as np
+
+from .path_tracking import PathTracker
+
+WHEELS_DISTANCE = 0.098   # m, V02 Odometry wheel distance
+
+
+def yaw_from_quaternion(qx, qy, qz, qw):
+    """Rotation about z of (arrays of) quaternions."""
+    return np.arctan2(2.0 * (qw * qz + qx * qy), 1.0 - 2.0 * (qy * qy + qz * qz))
+
+
+class FleetController:
+    """
+    Pure-pursuit controller for many robots following the same path shape.
+
+    Each robot owns a slot (row). With `relative` set, a robot's path is the
+    shared path shifted to the position where the robot was first seen, so
+    several robots can run the same figure without colliding.
+    """
+
+    def __init__(self, path, lookahead=0.08, v_max=0.15, a_max=0.1, omega_max=3.0,
+                 stop_distance=0.025, wheels_distance=WHEELS_DISTANCE, window=20,
+                 lost_distance=0.1, relative=True):
+        self.tracker = PathTracker(path, window_back=2, window_ahead=window,
+                                   lost_distance=lost_distance)
+        self.path = self.tracker.points
+        self.length = self.tracker.length
+
+        self.lookahead = lookahead
+        self.v_max = v_max
+        self.a_max = a_max
+        self.omega_max = omega_max
+        self.stop_distance = stop_distance
+        self.wheels_distance = wheels_distance
+        self.relative = relative
+
+        self.origin = np.zeros((0, 2))
+        self.index = np.zeros(0, dtype=int)
+        self.started = np.zeros(0, dtype=bool)
+        self.done = np.zeros(0, dtype=bool)
+
+    @property
+    def slots(self):
+        return len(self.index)
+
+    def add_slots(self, n):
+        """Grow the state arrays by n robots. Returns the first new slot."""
+        first = self.slots
+        self.origin = np.vstack([self.origin, np.zeros((n, 2))])
+        self.index = np.concatenate([self.index, np.zeros(n, dtype=int)])
+        self.started = np.concatenate([self.started, np.zeros(n, dtype=bool)])
+        self.done = np.concatenate([self.done, np.zeros(n, dtype=bool)])
+        return first
+
+    def reset(self, slots=None):
+        """Restart the path for the given slots (all by default)."""
+        slots = np.arange(self.slots) if slots is None else np.asarray(slots)
+        self.index[slots] = 0
+        self.started[slots] = False
+        self.done[slots] = False
+
+    def update(self, slots, xy, yaw):
+        """
+        Run one control step for the robots in `slots`.
+
+        xy (B, 2) are their positions and yaw (B,) their headings. Returns
+        wheel speeds vl, vr (m/s) and the remaining distance (m), all (B,)
+        arrays.
+        """
+        slots = np.asarray(slots, dtype=int)
+        xy = np.asarray(xy, dtype=float)
+        yaw = np.asarray(yaw, dtype=float)
+
+        new = ~self.started[slots]
+        if self.relative:
+            self.origin[slots[new]] = xy[new] - self.path[0]
+        self.started[slots] = True
+        local = xy - self.origin[slots]
+
+        # Windowed projection onto the path around the last segment index.
+        projection = self.tracker.project_batch(local, self.index[slots])
+        seg = projection['index']
+        self.index[slots] = seg
+        progress = projection['progress']
+
+        # Lookahead point in the robot frame.
+        target = self.tracker.point_at(progress + self.lookahead)
+        d = target - local
+        cos, sin = np.cos(yaw), np.sin(yaw)
+        dx = cos * d[:, 0] + sin * d[:, 1]
+        dy = -sin * d[:, 0] + cos * d[:, 1]
+        curvature = 2.0 * dy / np.maximum(dx ** 2 + dy ** 2, 1e-9)
+
+        # Speed: v_max, slowed to stop at the end (as P2P_CTRL does) and on tight turns.
+        end_dist = np.hypot(*(self.path[-1] - local).T)
+        remaining = np.maximum(self.length - progress, end_dist)
+        v = np.minimum(self.v_max, np.sqrt(2.0 * self.a_max * remaining))
+        omega = v * curvature
+        too_fast = np.abs(omega) > self.omega_max
+        with np.errstate(divide='ignore'):
+            v = np.where(too_fast, self.omega_max / np.abs(curvature), v)
+        omega = np.clip(omega, -self.omega_max, self.omega_max)
+
+        # Target behind the robot: turn on the spot first.
+        behind = dx < 0.0
+        v = np.where(behind, 0.0, v)
+        omega = np.where(behind, np.copysign(self.omega_max, dy), omega)
+
+        last_segment = seg == self.tracker.num_segments - 1
+        self.done[slots] |= last_segment & (end_dist < self.stop_distance)
+        finished = self.done[slots]
+        v = np.where(finished, 0.0, v)
+        omega = np.where(finished, 0.0, omega)
+
+        half = omega * self.wheels_distance / 2.0
+        return v - half, v + half, remaining
@@ -0,0 +1,73 @@
+"""
+Bridge /mocap/rigid_bodies into a shared-memory ring (see mocap_shm.py).
+
+The node spins in a background executor thread and writes every frame into
+the ring, so non-ROS processes on the same machine (the PathExample.py Dash
+app) can overlay mocap ground truth on the robot odometry. The main thread
+only reports the write rate and removes the ring on exit.
+
+    ros2 run subscribe_to_mocap mocap_bridge --ros-args -p shm_name:=zumo_mocap
+"""
+import threading
+import time
+
+import rclpy
+from rclpy.executors import SingleThreadedExecutor
+from rclpy.node import Node
+
+from mocap_interfaces.msg import RigidBodies
+
+from .fleet_controller import yaw_from_quaternion
+from .mocap_buffer import message_arrays
+from .mocap_shm import DEFAULT_NAME, PoseRing
+
+
+class MocapBridge(Node):
+
+    def __init__(self):
+        super().__init__('mocap_bridge')
+        self.declare_parameter('shm_name', DEFAULT_NAME)
+        self.declare_parameter('capacity', 65536)
+
+        self.ring = PoseRing.create(self.get_parameter('shm_name').value,
+                                    self.get_parameter('capacity').value)
+        self.subscription = self.create_subscription(
+            RigidBodies,
+            '/mocap/rigid_bodies',
+            self.listener_callback,
+            10)
+        self.get_logger().info('Writing mocap poses to shared memory %r (%d records)' % (
+            self.ring.shm.name, self.ring.capacity))
+
+    def listener_callback(self, msg):
+        ids, stamp, position, quaternion, _, tracking = message_arrays(msg)
+        self.ring.write(stamp, ids, tracking, position, yaw_from_quaternion(*quaternion.T))
+
+
+def main(args=None):
+    rclpy.init(args=args)
+
+    bridge = MocapBridge()
+    executor = SingleThreadedExecutor()
+    executor.add_node(bridge)
+    spin_thread = threading.Thread(target=executor.spin, daemon=True)
+    spin_thread.start()
+
+    try:
+        last = bridge.ring.count
+        while rclpy.ok():
+            time.sleep(5.0)
+            count = bridge.ring.count
+            bridge.get_logger().info('%.0f records/s' % ((count - last) / 5.0))
+            last = count
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+        bridge.destroy_node()
+        bridge.ring.close()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Per-body pose history for /mocap/rigid_bodies.
+
+A RigidBodies message is turned into flat arrays once (message_arrays) and
+written into per-body ring buffers in one vectorized step (PoseBuffer.add).
+Every body gets a row; an id->row map is kept in a dict.
+
+Each sample is written twice, at i and i + capacity, so the last n samples
+of a body are always one contiguous slice: window() returns NumPy views
+in chronological order without copying, and latest() is a plain index.
+"""
+import numpy as np
+
+
+def message_arrays(msg):
+    """
+    Flatten a mocap_interfaces/RigidBodies message.
+
+    Returns (ids, stamp, position (B, 3), quaternion (B, 4) as x, y, z, w,
+    mean_error, tracking); stamp is the header time in seconds.
+    """
+    bodies = msg.rigid_bodies
+    n = len(bodies)
+    ids = np.empty(n, dtype=np.int64)
+    stamp = np.empty(n)
+    pose = np.empty((n, 7))
+    error = np.empty(n)
+    tracking = np.empty(n, dtype=bool)
+    for i, rb in enumerate(bodies):
+        p = rb.pose_stamped.pose
+        s = rb.pose_stamped.header.stamp
+        ids[i] = rb.id
+        stamp[i] = s.sec + s.nanosec * 1e-9
+        pose[i] = (p.position.x, p.position.y, p.position.z,
+                   p.orientation.x, p.orientation.y, p.orientation.z, p.orientation.w)
+        error[i] = rb.mean_error
+        tracking[i] = rb.tracking
+    return ids, stamp, pose[:, :3], pose[:, 3:], error, tracking
+
+
+class PoseBuffer:
+    """Ring buffers of timestamped poses for many rigid bodies."""
+
+    def __init__(self, capacity=256, bodies=8):
+        self.capacity = capacity
+        self.ids = []
+        self.row_of = {}
+        self._allocate(bodies)
+
+    def _allocate(self, rows):
+        size = 2 * self.capacity
+        self.stamp = np.full((rows, size), np.nan)
+        self.position = np.zeros((rows, size, 3))
+        self.quaternion = np.zeros((rows, size, 4))
+        self.quaternion[..., 3] = 1.0
+        self.error = np.zeros((rows, size))
+        self.tracking = np.zeros((rows, size), dtype=bool)
+        self.head = np.full(rows, -1)     # slot of the latest sample, -1 = empty
+        self.count = np.zeros(rows, dtype=np.int64)
+
+    def _grow(self, rows):
+        old = (self.stamp, self.position, self.quaternion, self.error, self.tracking,
+               self.head, self.count)
+        n = len(self.head)
+        self._allocate(rows)
+        for new, prev in zip((self.stamp, self.position, self.quaternion, self.error,
+                              self.tracking, self.head, self.count), old):
+            new[:n] = prev
+
+    def rows(self, ids):
+        """Buffer rows for the given body ids, adding rows for new bodies."""
+        rows = np.empty(len(ids), dtype=np.int64)
+        for i, body_id in enumerate(ids):
+            body_id = int(body_id)
+            row = self.row_of.get(body_id)
+            if row is None:
+                row = len(self.ids)
+                if row == len(self.head):
+                    self._grow(max(2 * row, 1))
+                self.row_of[body_id] = row
+                self.ids.append(body_id)
+            rows[i] = row
+        return rows
+
+    def add(self, ids, stamp, position, quaternion, error=0.0, tracking=True):
+        """Append one sample per body (arrays indexed like ids). Returns the rows."""
+        rows = self.rows(ids)
+        head = (self.head[rows] + 1) % self.capacity
+        self.head[rows] = head
+        self.count[rows] += 1
+        for slot in (head, head + self.capacity):
+            self.stamp[rows, slot] = stamp
+            self.position[rows, slot] = position
+            self.quaternion[rows, slot] = quaternion
+            self.error[rows, slot] = error
+            self.tracking[rows, slot] = tracking
+        return rows
+
+    def add_message(self, msg):
+        """Append a RigidBodies message. Returns the rows of its bodies."""
+        return self.add(*message_arrays(msg))
+
+    def latest(self, rows=None):
+        """
+        Return the latest sample of the given rows (all bodies by default).
+
+        The result is a dict of arrays; rows without samples have a NaN stamp.
+        """
+        rows = np.arange(len(self.ids)) if rows is None else np.asarray(rows)
+        slot = np.maximum(self.head[rows], 0)
+        return {
+            'id': np.array(self.ids, dtype=np.int64)[rows],
+            'stamp': self.stamp[rows, slot],
+            'position': self.position[rows, slot],
+            'quaternion': self.quaternion[rows, slot],
+            'error': self.error[rows, slot],
+            'tracking': self.tracking[rows, slot] & (self.head[rows] >= 0),
+        }
+
+    def window(self, body_id, n=None):
+        """
+        Return the last n samples of one body (all stored ones by default).
+
+        Samples are oldest first, as a dict of views into the buffer. Views are
+        overwritten as new samples arrive; copy them to keep them.
+        """
+        row = self.row_of[body_id]
+        available = int(min(self.count[row], self.capacity))
+        n = available if n is None else min(n, available)
+        end = self.head[row] + self.capacity + 1
+        span = slice(end - n, end)
+        return {
+            'stamp': self.stamp[row, span],
+            'position': self.position[row, span],
+            'quaternion': self.quaternion[row, span],
+            'error': self.error[row, span],
+            'tracking': self.tracking[row, span],
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, body_id):
+        return body_id in self.row_of
@@ -0,0 +1,149 @@
+"""
+Shared-memory ring buffer of mocap poses for other processes on the Pi.
+
+The writer (mocap_bridge) appends one fixed-size record per body and frame;
+readers such as the PathExample.py Dash app map the same block and copy the
+newest records straight out of it as a NumPy structured array - no
+pickling, sockets or per-sample Python objects between the processes.
+
+Layout: a 64-byte header (magic, capacity, write count, generation)
+followed by `capacity` records of RECORD_DTYPE. The generation is new for
+every create(), so a reader can tell when the writer was restarted and the
+block it mapped was replaced (is_current()). There is a single writer. It writes the
+records first and publishes them by bumping the write count; a reader checks
+the count again after copying and drops records the writer may have
+overwritten in the meantime.
+
+This module needs only NumPy, so the Dash app can import it without ROS.
+"""
+import time
+
+import numpy as np
+from multiprocessing import shared_memory
+
+DEFAULT_NAME = 'zumo_mocap'
+MAGIC = 0x5A4D4F43          # 'ZMOC'
+HEADER_BYTES = 64
+
+RECORD_DTYPE = np.dtype([
+    ('t', 'f8'),            # header stamp, s
+    ('id', 'i4'),
+    ('tracking', 'i4'),
+    ('x', 'f4'),            # m, mocap frame
+    ('y', 'f4'),
+    ('z', 'f4'),
+    ('yaw', 'f4'),          # rad
+])
+
+
+def _open_untracked(name):
+    # Before Python 3.13 every process that opens a block registers it with
+    # the resource tracker, which unlinks it when a *reader* exits.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class PoseRing:
+    """A view of the shared block; use create() in the writer and attach() in readers."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name.lstrip('/')
+        self.header = np.ndarray(4, dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[1])
+        self.generation = int(self.header[3])
+        self.records = np.ndarray(self.capacity, dtype=RECORD_DTYPE,
+                                  buffer=shm.buf, offset=HEADER_BYTES)
+
+    @classmethod
+    def create(cls, name=DEFAULT_NAME, capacity=65536):
+        size = HEADER_BYTES + capacity * RECORD_DTYPE.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a writer that did not shut down cleanly.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray(4, dtype=np.int64, buffer=shm.buf)
+        header[:] = (MAGIC, capacity, 0, time.time_ns())
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=DEFAULT_NAME):
+        """Open an existing ring. Raises FileNotFoundError if no writer created it."""
+        shm = _open_untracked(name)
+        if int(np.ndarray(1, dtype=np.int64, buffer=shm.buf)[0]) != MAGIC:
+            shm.close()
+            raise ValueError('Shared memory %r is not a mocap pose ring' % name)
+        return cls(shm, owner=False)
+
+    def is_current(self):
+        """Check that the writer has not removed or re-created the ring since it was attached."""
+        try:
+            shm = _open_untracked(self.name)
+        except FileNotFoundError:
+            return False
+        try:
+            header = np.ndarray(4, dtype=np.int64, buffer=shm.buf)
+            current = int(header[0]) == MAGIC and int(header[3]) == self.generation
+            del header
+        finally:
+            shm.close()
+        return current
+
+    @property
+    def count(self):
+        """Records written since the ring was created."""
+        return int(self.header[2])
+
+    def write(self, t, ids, tracking, position, yaw):
+        """Append one record per body (arrays indexed like ids)."""
+        n = len(ids)
+        if n == 0:
+            return
+        start = self.count
+        slots = (start + np.arange(n)) % self.capacity
+        rec = self.records
+        rec['t'][slots] = t
+        rec['id'][slots] = ids
+        rec['tracking'][slots] = tracking
+        rec['x'][slots] = position[:, 0]
+        rec['y'][slots] = position[:, 1]
+        rec['z'][slots] = position[:, 2]
+        rec['yaw'][slots] = yaw
+        self.header[2] = start + n
+
+    def read(self, n=None, since=None):
+        """
+        Copy the newest records, oldest first.
+
+        Returns the last n, or those written after count `since`, as
+        (records, count), so the next call can pass since=count and receive
+        only new records.
+        """
+        end = self.count
+        first = end - min(end, self.capacity)
+        if since is not None:
+            first = max(first, since)
+        if n is not None:
+            first = max(first, end - n)
+        slots = np.arange(first, end) % self.capacity
+        out = self.records[slots]
+        # Records the writer overwrote while we copied are not trustworthy.
+        overwritten = self.count - self.capacity - first
+        if overwritten > 0:
+            out = out[overwritten:]
+        return out, end
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
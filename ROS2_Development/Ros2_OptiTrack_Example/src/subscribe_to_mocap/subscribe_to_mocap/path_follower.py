@@ -0,0 +1,138 @@
+"""
+Closed-loop path following from mocap poses.
+
+Subscribes to /mocap/rigid_bodies and, on every mocap frame (100 Hz with
+params.yaml), runs FleetController for all tracked bodies in one vectorized
+step. Wheel speed commands are published per body on <cmd_prefix><id>/cmd as
+the same JSON line the robot's UART expects, e.g. {"vl":120.0,"vr":95.5} in
+mm/s, so a serial bridge on each Pi only forwards the string.
+
+The controller runs on the pose each body is predicted to have when the
+command takes effect: PoseEstimator extrapolates the latest mocap samples by
+`actuation_delay` seconds past the callback time, and interpolates across
+short tracking dropouts. Bodies whose last tracked sample is older than
+`max_extrapolation` are commanded to stop until they are seen again.
+The default path is path_planner.lemniscate(path_scale), the same figure
+the Pi-side tools plan; path_file takes an x,y CSV in metres.
+Try it without a mocap with dummy_send: true in mocap_client's params.yaml:
+
+    ros2 run subscribe_to_mocap path_follower --ros-args -p v_max:=0.1
+"""
+import json
+
+import numpy as np
+import rclpy
+from rclpy.node import Node
+
+from std_msgs.msg import String
+from mocap_interfaces.msg import RigidBodies
+
+from .fleet_controller import FleetController, yaw_from_quaternion
+from .path_planner import lemniscate, load_path
+from .pose_estimator import PoseEstimator
+
+
+class PathFollower(Node):
+
+    def __init__(self):
+        super().__init__('path_follower')
+        self.declare_parameter('path_file', '')
+        self.declare_parameter('path_scale', 0.5)
+        self.declare_parameter('relative_path', True)
+        self.declare_parameter('body_ids', [-1])
+        self.declare_parameter('lookahead', 0.08)
+        self.declare_parameter('v_max', 0.15)
+        self.declare_parameter('a_max', 0.1)
+        self.declare_parameter('omega_max', 3.0)
+        self.declare_parameter('cmd_prefix', '/zumo_')
+        self.declare_parameter('actuation_delay', 0.02)
+        self.declare_parameter('max_extrapolation', 0.1)
+        self.declare_parameter('use_arrival_time', False)
+
+        path_file = self.get_parameter('path_file').value
+        if path_file:
+            path = load_path(path_file)
+        else:
+            path = lemniscate(self.get_parameter('path_scale').value)
+        self.controller = FleetController(
+            path,
+            lookahead=self.get_parameter('lookahead').value,
+            v_max=self.get_parameter('v_max').value,
+            a_max=self.get_parameter('a_max').value,
+            omega_max=self.get_parameter('omega_max').value,
+            relative=self.get_parameter('relative_path').value)
+        body_ids = self.get_parameter('body_ids').value
+        self.body_ids = None if -1 in body_ids else set(body_ids)
+        self.cmd_prefix = self.get_parameter('cmd_prefix').value
+
+        self.actuation_delay = self.get_parameter('actuation_delay').value
+        self.poses = PoseEstimator(
+            max_extrapolation=self.get_parameter('max_extrapolation').value,
+            use_arrival=self.get_parameter('use_arrival_time').value)
+        self.slot_of = {}
+        self.cmd_publishers = []
+        self.subscription = self.create_subscription(
+            RigidBodies,
+            '/mocap/rigid_bodies',
+            self.listener_callback,
+            10)
+        self.get_logger().info(
+            'Following a %.2f m path with %d waypoints' % (self.controller.length, len(path)))
+
+    def slot(self, body_id):
+        slot = self.slot_of.get(body_id)
+        if slot is None:
+            slot = self.controller.add_slots(1)
+            self.slot_of[body_id] = slot
+            self.cmd_publishers.append(
+                self.create_publisher(String, '%s%d/cmd' % (self.cmd_prefix, body_id), 10))
+            self.get_logger().info('Tracking body %d' % body_id)
+        return slot
+
+    def listener_callback(self, msg):
+        now = self.get_clock().now().nanoseconds * 1e-9
+        rows = self.poses.add_message(msg, now)
+        latest = self.poses.pose_at(now + self.actuation_delay, rows)
+        if self.body_ids is not None:
+            keep = np.isin(latest['id'], list(self.body_ids))
+            latest = {k: v[keep] for k, v in latest.items()}
+        if not len(latest['id']):
+            return
+        slots = np.array([self.slot(body_id) for body_id in latest['id']])
+        tracking = latest['valid']
+
+        vl = np.zeros(len(slots))
+        vr = np.zeros(len(slots))
+        if tracking.any():
+            yaw = yaw_from_quaternion(*latest['quaternion'][tracking].T)
+            vl[tracking], vr[tracking] = self.controller.update(
+                slots[tracking], latest['position'][tracking, :2], yaw)[:2]
+
+        for slot, left, right in zip(slots, vl * 1000.0, vr * 1000.0):
+            cmd = String()
+            cmd.data = json.dumps({'vl': round(float(left), 1), 'vr': round(float(right), 1)})
+            self.cmd_publishers[slot].publish(cmd)
+
+    def stop_all(self):
+        for publisher in self.cmd_publishers:
+            cmd = String()
+            cmd.data = json.dumps({'vl': 0.0, 'vr': 0.0})
+            publisher.publish(cmd)
+
+
+def main(args=None):
+    rclpy.init(args=args)
+
+    path_follower = PathFollower()
+    try:
+        rclpy.spin(path_follower)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        path_follower.stop_all()
+        path_follower.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Pi-side path planner.
+
+Vendored copy of ZumoPi_V02/WS_Zumo/Python/PathPlanning/path_planner.py, so
+the installed package has the same path definitions as the Pi-side tools.
+Only quoting, line wrapping and docstring layout differ (ament lint); keep
+the code of the two files in sync.
+
+Generates paths (lemniscate figure-eight, polylines, Catmull-Rom splines),
+resamples them at a fixed arc-length spacing and precomputes the tables the
+controller needs: cumulative distance, remaining distance to the end, heading
+and curvature. The waypoints are then streamed to the PathControl firmware
+over UART in chunks, each point carrying its remaining distance, so the robot
+never re-sums the path on a control tick and paths change without reflashing.
+
+Paths are built in metres (like infSignMath.m and diff_drive_sim.py); the
+UART stream is in millimetres like the V02 firmware.
+
+Usage:
+    python3 path_planner.py lemniscate --spacing 0.02 --port /dev/ttyAMA10 --start
+    python3 path_planner.py polyline 0,0 0.4,0 0.4,0.4 --c-array
+    python3 path_planner.py spline 0,0 0.3,0.2 0.6,0 --spacing 0.01 --dry-run
+"""
+import argparse
+import csv
+import json
+import time
+
+import numpy as np
+
+CHUNK_POINTS = 8       # waypoints per UART message, sized for the firmware JSON document
+MAX_PATH_POINTS = 1000  # MAX_PATH_POINTS in PathControl.ino
+
+
+def lemniscate(scale=0.5, pen_offset=0.05, step=0.1):
+    """
+    Figure-eight from infSignMath.m.
+
+    x = s*cos(t), y = s*cos(t)*sin(t), shifted sideways by `pen_offset` along
+    the path normal.
+    """
+    t = np.arange(-np.pi / 2, np.pi * 3 / 2, step)
+    x = np.cos(t) * scale
+    y = np.cos(t) * np.sin(t) * scale
+    x_dot = -np.sin(t)
+    y_dot = np.cos(t) ** 2 - np.sin(t) ** 2
+    norm = np.hypot(x_dot, y_dot)
+    return np.column_stack([x - y_dot / norm * pen_offset, y + x_dot / norm * pen_offset])
+
+
+def load_path(filename):
+    """Read an x,y CSV path in metres (header line optional)."""
+    rows = []
+    with open(filename) as f:
+        for row in csv.reader(f):
+            try:
+                rows.append((float(row[0]), float(row[1])))
+            except (ValueError, IndexError):
+                continue
+    return np.array(rows)
+
+
+def polyline(points):
+    return np.asarray(points, dtype=float)
+
+
+def catmull_rom(points, samples_per_segment=20):
+    """Uniform Catmull-Rom spline through the control points (end points repeated)."""
+    p = np.asarray(points, dtype=float)
+    p = np.vstack([p[:1], p, p[-1:]])
+    u = np.linspace(0.0, 1.0, samples_per_segment, endpoint=False)[:, None]
+    u2, u3 = u ** 2, u ** 3
+    segments = []
+    for i in range(1, len(p) - 2):
+        p0, p1, p2, p3 = p[i - 1], p[i], p[i + 1], p[i + 2]
+        segments.append(0.5 * (2 * p1 + (p2 - p0) * u + (2 * p0 - 5 * p1 + 4 * p2 - p3) * u2
+                               + (3 * p1 - p0 - 3 * p2 + p3) * u3))
+    segments.append(p[-2:-1])
+    return np.vstack(segments)
+
+
+def cumulative_distance(points):
+    seg = np.hypot(*np.diff(points, axis=0).T)
+    return np.concatenate([[0.0], np.cumsum(seg)])
+
+
+def resample(points, spacing):
+    """Resample a path at (approximately) equal arc-length spacing, keeping both end points."""
+    points = np.asarray(points, dtype=float)
+    s = cumulative_distance(points)
+    keep = np.concatenate([[True], np.diff(s) > 1e-9])   # drop repeated points
+    points, s = points[keep], s[keep]
+    n = max(int(np.ceil(s[-1] / spacing)), 1) + 1
+    s_new = np.linspace(0.0, s[-1], n)
+    return np.column_stack([np.interp(s_new, s, points[:, 0]), np.interp(s_new, s, points[:, 1])])
+
+
+class PathTable:
+    """A resampled path with its precomputed lookup tables (all (N,) arrays)."""
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.s = cumulative_distance(self.points)
+        self.length = self.s[-1]
+        self.remaining = self.length - self.s
+
+        # Heading and curvature (d heading / ds) by finite differences along s.
+        d = np.gradient(self.points, self.s, axis=0)
+        self.heading = np.unwrap(np.arctan2(d[:, 1], d[:, 0]))
+        self.curvature = np.gradient(self.heading, self.s)
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def from_points(cls, points, spacing):
+        return cls(resample(points, spacing))
+
+    def messages(self, chunk=CHUNK_POINTS, scale=1000.0):
+        """UART messages that upload this path: clear, then waypoint chunks."""
+        xy = np.round(self.points * scale, 1)
+        rem = np.round(self.remaining * scale, 1)
+        msgs = [{'path': 'clear'}]
+        for i in range(0, len(self), chunk):
+            rows = [[float(x), float(y), float(r)]
+                    for (x, y), r in zip(xy[i:i + chunk], rem[i:i + chunk])]
+            msgs.append({'wp': rows})
+        return [json.dumps(m, separators=(',', ':')) for m in msgs]
+
+    def c_array(self, scale=1000.0, per_line=4):
+        """Return the path as a C initialiser, for hand-pasting into a sketch like before."""
+        items = [f'{{{x * scale:.1f}, {y * scale:.1f}}}' for x, y in self.points]
+        lines = ['  ' + ', '.join(items[i:i + per_line]) for i in range(0, len(items), per_line)]
+        return 'float desiredPath[][2] = {\n' + ',\n'.join(lines) + '\n};'
+
+
+def stream_path(ser, table, chunk=CHUNK_POINTS, start=False, timeout=2.0):
+    """
+    Upload a path to the PathControl firmware.
+
+    Each chunk is acknowledged before the next is sent, so the robot's UART
+    buffer never overflows. Telemetry lines arriving in between are ignored.
+    """
+    if len(table) > MAX_PATH_POINTS:
+        raise ValueError(f'Path has {len(table)} points, the firmware stores {MAX_PATH_POINTS}; '
+                         'increase the spacing')
+    messages = table.messages(chunk)
+    if start:
+        messages.append(json.dumps({'path': 'start'}, separators=(',', ':')))
+    stored = 0
+    for msg in messages:
+        ser.write((msg + '\n').encode('ascii'))
+        reply = wait_for_reply(ser, timeout)
+        if reply.get('path') != 'ok':
+            raise RuntimeError(f'Robot rejected path message: {reply}')
+        stored = reply.get('n', stored)
+    return stored
+
+
+def wait_for_reply(ser, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        line = ser.readline().decode('ascii', errors='ignore').strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if 'path' in msg:
+            return msg
+    raise TimeoutError('No reply from robot')
+
+
+def parse_points(values):
+    return [tuple(float(v) for v in item.split(',')) for item in values]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate, resample and stream paths to the Zumo')
+    parser.add_argument('shape', choices=['lemniscate', 'polyline', 'spline'])
+    parser.add_argument('points', nargs='*', help='x,y control points in m for polyline/spline')
+    parser.add_argument('--scale', type=float, default=0.5, help='lemniscate size in m')
+    parser.add_argument('--spacing', type=float, default=0.02, help='waypoint spacing in m')
+    parser.add_argument('--port', default='/dev/ttyAMA10')
+    parser.add_argument('--chunk', type=int, default=CHUNK_POINTS,
+                        help='waypoints per UART message')
+    parser.add_argument('--start', action='store_true',
+                        help='start path following after the upload')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the UART messages instead of sending')
+    parser.add_argument('--c-array', action='store_true',
+                        help='print the path as a C array and exit')
+    args = parser.parse_args()
+
+    if args.shape == 'lemniscate':
+        raw = lemniscate(args.scale)
+    elif len(args.points) < 2:
+        parser.error(f'{args.shape} needs at least two x,y points')
+    elif args.shape == 'polyline':
+        raw = polyline(parse_points(args.points))
+    else:
+        raw = catmull_rom(parse_points(args.points))
+
+    table = PathTable.from_points(raw, args.spacing)
+    print(f'{len(table)} waypoints, length {table.length:.3f} m, '
+          f'max curvature {np.abs(table.curvature).max():.2f} 1/m')
+
+    if args.c_array:
+        print(table.c_array())
+        return
+    if args.dry_run:
+        for msg in table.messages(args.chunk):
+            print(msg)
+        return
+
+    import serial
+    ser = serial.Serial(args.port, 115200, timeout=0.1)
+    try:
+        ser.reset_input_buffer()
+        stored = stream_path(ser, table, args.chunk, start=args.start)
+        print(f'Robot stored {stored} waypoints' + (', path started' if args.start else ''))
+    finally:
+        ser.close()
+
+
+if __name__ == '__main__':
+    main()
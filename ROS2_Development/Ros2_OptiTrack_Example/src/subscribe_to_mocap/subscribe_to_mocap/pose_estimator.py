@@ -0,0 +1,136 @@
+"""
+Pose queries at arbitrary times from the mocap stream.
+
+A mocap pose is already old when the controller uses it (transport and
+callback delay), and the command it produces acts on the robot later still.
+PoseEstimator keeps the tracked samples of every body in a PoseBuffer and
+answers "where is body k at time t": positions are interpolated linearly,
+orientations with SLERP, between the two samples around t, or extrapolated
+from the last two samples when t is newer than the latest one (at most
+`max_extrapolation` seconds, after that the pose is reported invalid).
+
+Samples with tracking=false are not stored, so a dropout is bridged by
+interpolating across it (or extrapolating while it lasts).
+
+Times are header stamps in seconds. If the mocap clock is not synchronised
+with the local one, set use_arrival=True to timestamp samples on arrival
+instead. Either way the per-body latency (arrival - stamp) is estimated
+with an exponential average.
+"""
+import numpy as np
+
+from .mocap_buffer import PoseBuffer, message_arrays
+
+
+def slerp(q0, q1, u):
+    """
+    Interpolate spherically between quaternions.
+
+    q0 and q1 are (B, 4), u are (B,) fractions; u outside [0, 1]
+    extrapolates along the same rotation.
+    """
+    dot = (q0 * q1).sum(axis=-1)
+    q1 = np.where(dot[:, None] < 0.0, -q1, q1)    # shortest path
+    dot = np.abs(dot)
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    small = sin_theta < 1e-6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w0 = np.where(small, 1.0 - u, np.sin((1.0 - u) * theta) / sin_theta)
+        w1 = np.where(small, u, np.sin(u * theta) / sin_theta)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+class PoseEstimator:
+
+    def __init__(self, capacity=64, window=8, max_extrapolation=0.1,
+                 latency_smoothing=0.05, use_arrival=False):
+        """
+        Create an estimator with empty per-body buffers.
+
+        capacity: tracked samples kept per body.
+        window: newest samples searched for the pair around the query time.
+        max_extrapolation: s beyond the latest sample a pose is still valid.
+        """
+        self.buffer = PoseBuffer(capacity)
+        self.window = min(window, capacity)
+        self.max_extrapolation = max_extrapolation
+        self.latency_smoothing = latency_smoothing
+        self.use_arrival = use_arrival
+        self.latency = np.full(8, np.nan)
+
+    @property
+    def ids(self):
+        return self.buffer.ids
+
+    def add_message(self, msg, arrival):
+        """Store a RigidBodies message received at local time `arrival` (s). Returns the rows."""
+        ids, stamp, position, quaternion, error, tracking = message_arrays(msg)
+        rows = self.buffer.rows(ids)
+        if len(self.latency) < len(self.buffer):
+            self.latency = np.concatenate(
+                [self.latency, np.full(len(self.buffer.head) - len(self.latency), np.nan)])
+
+        delay = arrival - stamp
+        previous = self.latency[rows]
+        self.latency[rows] = np.where(
+            np.isnan(previous), delay,
+            previous + self.latency_smoothing * (delay - previous))
+
+        if self.use_arrival:
+            stamp = np.full(len(ids), float(arrival))
+        t = tracking
+        self.buffer.add(ids[t], stamp[t], position[t], quaternion[t], error[t], True)
+        return rows
+
+    def pose_at(self, t, rows=None):
+        """
+        Return the pose of the given rows (all bodies by default) at time t.
+
+        t is a scalar or per-row array. Returns a dict with id, position,
+        quaternion, valid and age (t minus the latest sample time). A pose is valid once the
+        body has two samples and t is at most max_extrapolation past them.
+        """
+        buf = self.buffer
+        rows = np.arange(len(buf)) if rows is None else np.asarray(rows)
+        t = np.broadcast_to(np.asarray(t, dtype=float), rows.shape)
+        k = self.window
+
+        # The newest k samples of each row are contiguous in the doubled buffer;
+        # a body with fewer samples only has the last `available` slots written.
+        idx = buf.head[rows, None] + buf.capacity + 1 - k + np.arange(k)
+        stamps = buf.stamp[rows[:, None], idx]
+        latest = stamps[:, -1]
+        age = t - latest
+        available = np.minimum(buf.count[rows], k)
+        valid = (available >= 2) & (age <= self.max_extrapolation)
+
+        # Pair (i0, i1) around t among the written slots; the last pair when t
+        # is newer than all samples. Unwritten slots have NaN stamps.
+        first = k - available
+        after = (stamps <= t[:, None]).sum(axis=1)
+        i1 = np.minimum(np.maximum(first + after, first + 1), k - 1)
+        i0 = i1 - 1
+        r = np.arange(len(rows))
+        t0, t1 = stamps[r, i0], stamps[r, i1]
+        single = np.isnan(t0) | (t1 <= t0)        # one sample only: hold it
+        i0 = np.where(single, i1, i0)
+        t_query = np.minimum(t, latest + self.max_extrapolation)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            u = np.where(single, 0.0, (t_query - t0) / (t1 - t0))
+
+        s0, s1 = idx[r, i0], idx[r, i1]
+        p0, p1 = buf.position[rows, s0], buf.position[rows, s1]
+        q0, q1 = buf.quaternion[rows, s0], buf.quaternion[rows, s1]
+        return {
+            'id': np.array(buf.ids, dtype=np.int64)[rows],
+            'position': p0 + u[:, None] * (p1 - p0),
+            'quaternion': slerp(q0, q1, u),
+            'valid': valid,
+            'age': age,
+        }
+
+    def latency_of(self, rows=None):
+        rows = np.arange(len(self.buffer)) if rows is None else np.asarray(rows)
+        return self.latency[rows]
@@ -1,9 +1,11 @@
 import rclpy
 from rclpy.node import Node
 
-from std_msgs.msg import String
 from mocap_interfaces.msg import RigidBodies
 
+from .mocap_buffer import PoseBuffer
+
+
 class MinimalSubscriber(Node):
 
     def __init__(self):
@@ -14,13 +16,21 @@ class MinimalSubscriber(Node):
             self.listener_callback,
             10)
         self.subscription  # prevent unused variable warning
+        self.poses = PoseBuffer()
+        self.timer = self.create_timer(1.0, self.print_bodies)
 
     def listener_callback(self, msg):
-        # print(msg,"msg")
-        print(msg.rigid_bodies[0].id,"id")
-        print(msg.rigid_bodies[0].pose_stamped.pose.position.x,"x pose")
-        
-        # self.get_logger().info('I heard: "%s"' % msg.data)
+        # All bodies go into per-body ring buffers; printing happens at 1 Hz.
+        self.poses.add_message(msg)
+
+    def print_bodies(self):
+        latest = self.poses.latest()
+        for i, body_id in enumerate(latest['id']):
+            stamps = self.poses.window(body_id, 100)['stamp']
+            rate = (len(stamps) - 1) / (stamps[-1] - stamps[0]) if stamps[-1] > stamps[0] else 0.0
+            x, y, z = latest['position'][i]
+            print('id %d  x %.3f  y %.3f  z %.3f  tracking %d  error %.2e  %.0f Hz' % (
+                body_id, x, y, z, latest['tracking'][i], latest['error'][i], rate))
 
 
 def main(args=None):
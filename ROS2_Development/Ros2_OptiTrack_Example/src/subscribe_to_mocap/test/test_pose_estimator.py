@@ -0,0 +1,48 @@
+import numpy as np
+
+from subscribe_to_mocap.pose_estimator import PoseEstimator
+
+
+def add_sample(estimator, body_id, stamp, x):
+    estimator.buffer.add(np.array([body_id]), np.array([stamp]),
+                         np.array([[x, 2.0 * x, 0.0]]), np.array([[0.0, 0.0, 0.0, 1.0]]))
+
+
+def test_first_samples_use_only_written_slots():
+    estimator = PoseEstimator(window=8)
+    add_sample(estimator, 1, 10.0, 1.0)
+    pose = estimator.pose_at(10.0)
+    assert not pose['valid'][0]
+    np.testing.assert_allclose(pose['position'][0], [1.0, 2.0, 0.0])
+
+    add_sample(estimator, 1, 10.1, 2.0)
+    pose = estimator.pose_at(10.05)
+    assert pose['valid'][0]
+    np.testing.assert_allclose(pose['position'][0], [1.5, 3.0, 0.0])
+
+    for n in range(2, 5):
+        add_sample(estimator, 1, 10.0 + 0.1 * n, 1.0 + n)
+        latest = 10.0 + 0.1 * n
+        pose = estimator.pose_at(latest)
+        assert pose['valid'][0]
+        np.testing.assert_allclose(pose['position'][0], [1.0 + n, 2.0 + 2.0 * n, 0.0])
+        # Extrapolated from the last two written samples.
+        pose = estimator.pose_at(latest + 0.05)
+        np.testing.assert_allclose(pose['position'][0], [1.5 + n, 3.0 + 2.0 * n, 0.0])
+
+
+def test_interpolates_between_first_samples():
+    estimator = PoseEstimator(window=8)
+    for n in range(3):
+        add_sample(estimator, 4, 1.0 + n, 10.0 * n)
+    pose = estimator.pose_at(np.array([1.25, 2.5]), np.array([0, 0]))
+    np.testing.assert_allclose(pose['position'][:, 0], [2.5, 15.0])
+
+
+def test_full_window():
+    estimator = PoseEstimator(capacity=16, window=8)
+    for n in range(40):
+        add_sample(estimator, 2, 0.1 * n, float(n))
+    pose = estimator.pose_at(3.85)
+    assert pose['valid'][0]
+    np.testing.assert_allclose(pose['position'][0, 0], 38.5)
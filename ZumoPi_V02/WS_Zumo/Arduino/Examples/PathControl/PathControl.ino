@@ -2,6 +2,7 @@
 #include <Scheduler.h>
 #include "Odometry.h"
 #include "PathController.h"
+#include <ArduinoJson.h>
 
 // Global hardware objects.
 Motors motors;
@@ -16,14 +17,23 @@ Odometry odom(37.5, 75, 12, 98);
 // Create a PathController instance.
 PathController pathCtrl;
 
-// Define desired path (coordinates in mm).
-float desiredPath[][2] = {
+// Default path (coordinates in mm), used until a path is uploaded over myUART.
+float defaultPath[][2] = {
   {100, 0},
   {200, -100},
   {350, -100},
   {500, -100}
 };
-const int numPoints = sizeof(desiredPath) / sizeof(desiredPath[0]);
+
+// Active path storage. Paths can be replaced at runtime by path_planner.py:
+//   {"path":"clear"}                      drop the current path
+//   {"wp":[[x,y,rem],[x,y,rem],...]}      append waypoints (mm) with remaining length (mm)
+//   {"path":"start"}                      reset odometry and start following
+// Each message is answered with {"path":"ok","n":<points stored>}.
+const int MAX_PATH_POINTS = 1000;
+float desiredPath[MAX_PATH_POINTS][2];
+float remainingDist[MAX_PATH_POINTS];  // path length from each point to the end
+int numPoints = 0;
 
 // Global variables to hold previous encoder counts.
 int lastRightCount = 0;
@@ -60,7 +70,7 @@ void updateTask() {
     
     // If the path is active, update the path controller and send motor commands.
     if (pathActive) {
-      pathCtrl.update(odom, desiredPath, numPoints);
+      pathCtrl.update(odom, desiredPath, remainingDist, numPoints);
       motors.setSpeeds(pathCtrl.currentCommands.leftSpeed, pathCtrl.currentCommands.rightSpeed);
     }
   }
@@ -97,6 +107,74 @@ void serialTask() {
   yield();
 }
 
+//--------------------------------------------------
+// Path Upload Task: poll myUART for path messages
+//--------------------------------------------------
+void startPath() {
+  // Reset odometry and the path controller, then start following.
+  odom.reset();
+  pathCtrl.reset();
+  pathActive = true;
+}
+
+void replyPath(const char* status) {
+  char buf[48];
+  snprintf(buf, sizeof(buf), "{\"path\":\"%s\",\"n\":%d}", status, numPoints);
+  myUART.println(buf);
+}
+
+void handlePathMessage(const String &jsonMessage) {
+  // Static so the waypoint chunk document does not live on the task stack.
+  static StaticJsonDocument<2048> doc;
+  DeserializationError error = deserializeJson(doc, jsonMessage);
+  if (error) {
+    myUART.print("JSON Parse Error: ");
+    myUART.println(error.c_str());
+    return;
+  }
+
+  if (doc.containsKey("wp")) {
+    JsonArray points = doc["wp"].as<JsonArray>();
+    for (JsonArray point : points) {
+      if (numPoints >= MAX_PATH_POINTS) {
+        replyPath("full");
+        return;
+      }
+      desiredPath[numPoints][0] = point[0];
+      desiredPath[numPoints][1] = point[1];
+      remainingDist[numPoints] = point[2];
+      numPoints++;
+    }
+    replyPath("ok");
+  } else if (doc["path"] == "clear") {
+    pathActive = false;
+    motors.setSpeeds(0, 0);
+    numPoints = 0;
+    replyPath("ok");
+  } else if (doc["path"] == "start") {
+    if (numPoints > 0) startPath();
+    replyPath(numPoints > 0 ? "ok" : "empty");
+  }
+}
+
+void pollUART() {
+  static String uartBuffer = "";
+
+  while (myUART.available()) {
+    char c = myUART.read();
+    if (c == '\n') {
+      uartBuffer.trim();
+      if (uartBuffer.length() > 0) {
+        handlePathMessage(uartBuffer);
+      }
+      uartBuffer = "";
+    } else {
+      uartBuffer += c;
+    }
+  }
+  yield();
+}
+
 // alternative messages
     // car states control         
 //    snprintf(buf, sizeof(buf), "X: %.2f mm, Y: %.2f mm, Theta: %.2f deg, de: %.2f mm/s, theta_t: %.2f mm/s", 
@@ -114,6 +192,11 @@ void setup() {
   
   // Initialize the PathController.
   pathCtrl.begin();
+
+  // Load the default path and precompute its remaining-distance table.
+  numPoints = sizeof(defaultPath) / sizeof(defaultPath[0]);
+  memcpy(desiredPath, defaultPath, sizeof(defaultPath));
+  PathController::computeRemaining(desiredPath, remainingDist, numPoints);
   
   // Initialize encoder counts.
   lastRightCount = encoders.getCountsRight();
@@ -122,16 +205,15 @@ void setup() {
   // Start the merged update and serial tasks.
   Scheduler.startLoop(updateTask);
   Scheduler.startLoop(serialTask);
+  Scheduler.startLoop(pollUART);
 }
 
 void loop() {
   // Button edge detection: if Button A is pressed now but wasn't last loop...
   bool currentButtonState = buttonA.isPressed();
-  if (currentButtonState && !lastButtonState) {
+  if (currentButtonState && !lastButtonState && numPoints > 0) {
     // Reset odometry and the path controller on each new button press.
-    odom.reset();
-    pathCtrl.reset();
-    pathActive = true;
+    startPath();
     //Serial.println("Path started (odometry and car state reset)");
   }
   lastButtonState = currentButtonState;
@@ -72,7 +72,17 @@ void PathController::control() {
   setMotorSpeeds(u_left, u_right);
 }
 
-void PathController::update(const Odometry &odom, float desired_pos[][2], int numPoints) {
+void PathController::computeRemaining(float desired_pos[][2], float remaining[], int numPoints) {
+  if (numPoints <= 0) return;
+  remaining[numPoints - 1] = 0.0f;
+  for (int i = numPoints - 2; i >= 0; i--) {
+    float dx = desired_pos[i+1][0] - desired_pos[i][0];
+    float dy = desired_pos[i+1][1] - desired_pos[i][1];
+    remaining[i] = remaining[i+1] + sqrt(dx*dx + dy*dy);
+  }
+}
+
+void PathController::update(const Odometry &odom, float desired_pos[][2], const float remaining[], int numPoints) {
   // Copy current odometry data into the controller's car state.
   car_state.posx = odom.posX;
   car_state.posy = odom.posY;
@@ -123,15 +133,10 @@ void PathController::update(const Odometry &odom, float desired_pos[][2], int nu
   
   // Distance to current target point.
   path_state.dist = sqrt(Vt[0]*Vt[0] + Vt[1]*Vt[1]);
-  float pathDist = 0.0f;
   
   if (path_state.currPoint < (numPoints - 1)) {
-    // Sum remaining path distances.
-    for (int i = path_state.currPoint; i < (numPoints - 1); i++) {
-      float dx = desired_pos[i+1][0] - desired_pos[i][0];
-      float dy = desired_pos[i+1][1] - desired_pos[i][1];
-      pathDist += sqrt(dx*dx + dy*dy);
-    }
+    // Remaining path length from the precomputed table (O(1) per tick).
+    float pathDist = remaining[path_state.currPoint];
     // Transition condition: if close enough to current target.
     if (path_state.dist < passDistance) {
       path_state.currPoint++;
@@ -43,9 +43,14 @@ public:
 
   // Update the controller using the current odometry (from the Odometry class)
   // and a desired path (an array of [x,y] points in mm).
-  // numPoints is the number of target points.
+  // remaining[i] is the path length from point i to the last point (mm), see
+  // computeRemaining(). numPoints is the number of target points.
   // This function updates the public member 'currentCommands'.
-  void update(const Odometry &odom, float desired_pos[][2], int numPoints);
+  void update(const Odometry &odom, float desired_pos[][2], const float remaining[], int numPoints);
+
+  // Fill remaining[i] with the path length from point i to the last point.
+  // Call once whenever the path changes, not every control tick.
+  static void computeRemaining(float desired_pos[][2], float remaining[], int numPoints);
 
   // Control parameters (tune these as needed)
   float dt_time;         // time interval (s)
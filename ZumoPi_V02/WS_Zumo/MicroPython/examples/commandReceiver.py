@@ -0,0 +1,90 @@
+import json
+import utime
+import uasyncio as asyncio
+from machine import Pin, UART
+from zumo_2040_robot import robot
+from cmd_parser import CommandParser, SPEED, LED, PING, NONE, COLOR_RGB
+from led_anim import LedAnimator
+from uart_rx import LineReceiver
+
+# UART0 on pins 28 (TX) and 29 (RX), as in uartExample.py.
+uart = UART(0, baudrate=115200, tx=Pin(28), rx=Pin(29), rxbuf=1024)
+motors = robot.Motors()
+rgb_leds = robot.RGBLEDs(10)
+parser = CommandParser()
+animator = LedAnimator(rgb_leds)
+
+MAX_MOTOR_SPEED = 6000          # motors.set_speeds() range
+MOTOR_PER_MM_S_X8 = 60          # open loop: 6000 at roughly 800 mm/s, times 8
+COMMAND_TIMEOUT_MS = 1000       # stop if no command arrives, as the Arduino firmware does
+
+last_command = utime.ticks_ms()
+
+
+def motor_speed(mm_s):
+    # Integer arithmetic: floats would allocate on every command.
+    return max(-MAX_MOTOR_SPEED, min(MAX_MOTOR_SPEED, mm_s * MOTOR_PER_MM_S_X8 // 8))
+
+
+def handle_line(buf, n):
+    """
+    {"vl":..,"vr":..} sets the wheel speeds, {"LEDNumber":..,"Color":..} an
+    LED; {"ping":..} is echoed back for latency tests. {"anim":..} and
+    {"play":..} (led_anim.py) are rare, so they go through json.loads().
+    """
+    try:
+        dispatch(buf, n)
+    except Exception as e:
+        # One bad line must not end the receive loop (and the watchdog with it).
+        uart.write("Command failed: %r\n" % e)
+
+
+def dispatch(buf, n):
+    global last_command
+    kind = parser.parse(buf, n)
+    if kind == SPEED:
+        motors.set_speeds(motor_speed(parser.vl), motor_speed(parser.vr))
+        last_command = utime.ticks_ms()
+    elif kind == LED and 0 <= parser.led < 10:
+        animator.release()
+        rgb_leds.set(parser.led, COLOR_RGB[parser.color])
+        rgb_leds.show()
+    elif kind == PING:
+        uart.write(buf[:n])
+        uart.write(b"\n")
+    elif kind == NONE:
+        try:
+            error = animator.handle(json.loads(bytes(buf[:n])))
+        except ValueError:
+            error = "Invalid command"
+        if error:
+            uart.write(error + "\n")
+    else:
+        uart.write(b"Invalid command\n")
+
+
+async def watchdog():
+    while True:
+        if utime.ticks_diff(utime.ticks_ms(), last_command) > COMMAND_TIMEOUT_MS:
+            motors.off()
+        await asyncio.sleep_ms(50)
+
+
+async def animate():
+    while True:
+        animator.poll()
+        await asyncio.sleep_ms(10)
+
+
+async def main():
+    # Lines up to 1 kB, enough for an uploaded animation of ~25 frames.
+    receiver = LineReceiver(uart, handle_line, line_size=1024)
+    asyncio.create_task(watchdog())
+    asyncio.create_task(animate())
+    # Wakes as soon as bytes arrive, instead of every 100 ms like uartExample.py.
+    # Measure from the Pi with: python3 uart_latency.py --serial /dev/ttyAMA10
+    await receiver.run()
+
+
+uart.write("Command receiver ready\n")
+asyncio.run(main())
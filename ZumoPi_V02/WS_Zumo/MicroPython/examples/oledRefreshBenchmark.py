@@ -0,0 +1,96 @@
+# Counts what ssd1306.show() puts on the I2C bus for typical screen updates,
+# with a mocked bus, and converts it to transfer time at 400 kHz. Runs on the
+# robot (no display needed) or on the Pi with the CPython stand-ins:
+#     cd MicroPython && PYTHONPATH=lib:host python3 examples/oledRefreshBenchmark.py
+
+import ssd1306
+
+I2C_HZ = 400_000
+
+
+class CountingI2C:
+    """Accepts writes like machine.I2C and counts transactions and bytes."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.bytes = 0
+
+    def writeto(self, addr, buf):
+        self.transactions += 1
+        self.bytes += len(buf)
+
+    def writevto(self, addr, bufs):
+        self.transactions += 1
+        for buf in bufs:
+            self.bytes += len(buf)
+
+    def cost_ms(self):
+        # Address byte + data, 9 clocks per byte (ACK), start/stop ignored.
+        return (self.transactions + self.bytes) * 9 * 1000 / I2C_HZ
+
+
+def report(name, i2c):
+    print("%-28s %3d transactions %5d bytes  %5.2f ms" % (name, i2c.transactions, i2c.bytes, i2c.cost_ms()))
+    i2c.reset()
+
+
+i2c = CountingI2C()
+oled = ssd1306.SSD1306_I2C(128, 64, i2c, addr=0x3D)
+i2c.reset()
+
+oled.fill(0)
+oled.text("Hello World", 0, 0)
+oled.invalidate()
+oled.show()
+report("full refresh", i2c)
+
+oled.show()
+report("nothing changed", i2c)
+
+oled.fill_rect(0, 16, 128, 8, 0)
+oled.text("X 123.4", 0, 16)
+oled.show()
+report("one text line", i2c)
+
+oled.fill_rect(64, 56, 24, 8, 0)
+oled.text("87%", 64, 56)
+oled.show()
+report("3 characters", i2c)
+
+oled.fill_rect(0, 0, 128, 64, 0)
+oled.text("Pose", 0, 0)
+oled.text("Battery", 0, 48)
+oled.start_show()
+steps = 1
+while oled.show_step(32):
+    steps += 1
+report("non-blocking, %d steps" % steps, i2c)
+
+# Status screen: cost of typical updates once the screen is drawn.
+from oled_status import StatusScreen
+
+screen = StatusScreen(oled)
+screen.set_mode("TELEOP")
+screen.set_ip("192.168.0.12")
+screen.set_rssi(-61)
+screen.set_pose(120.5, -3.2, 87.0)
+screen.set_battery(5200)
+screen.refresh()
+report("status screen, first draw", i2c)
+
+screen.set_pose(120.6, -3.2, 87.0)
+screen.refresh()
+report("pose moved 0.1 mm", i2c)
+
+screen.set_pose(131.0, 12.7, 91.5)
+screen.set_battery(5150)
+screen.refresh()
+report("pose + battery", i2c)
+
+screen.set_rssi(-80)
+screen.set_mode("PATH")
+screen.refresh()
+report("mode + rssi", i2c)
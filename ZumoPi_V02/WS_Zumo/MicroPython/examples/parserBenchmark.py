@@ -0,0 +1,94 @@
+# Compares cmd_parser.CommandParser with json.loads() for the UART commands:
+# checks that both read the same values, then measures time and heap bytes
+# allocated per message. Runs on the robot and, for the correctness check,
+# under CPython on the Pi:
+#     cd MicroPython && PYTHONPATH=lib python3 examples/parserBenchmark.py
+
+import gc
+import json
+import sys
+
+from cmd_parser import CommandParser, SPEED, LED, PING, NONE, ERROR, COLORS
+
+try:
+    from utime import ticks_us, ticks_diff
+except ImportError:
+    from time import perf_counter
+
+    def ticks_us():
+        return int(perf_counter() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+MESSAGES = [
+    b'{"vl":150,"vr":-150}',
+    b'{"vl": 141.4213562373095, "vr": 0.0}',
+    b'{"vr":-12.5,"vl":-0.4}',
+    b'{"vl":1e-05,"vr":-1.2246467991473532e-14}',
+    b'{"vl":1E2,"vr":-2.5e+1}',
+    b'{"vl":1.25e2,"vr":0.95e0}',
+    b'{"LEDNumber":3,"Color":"Red"}',
+    b'{"LEDNumber": 9, "Color": "white"}',
+    b'{"ping":42}',
+    b'{"play":"blink","code":3,"color":[255,0,0],"loop":true}',
+    b'{"vl":100',
+    b'not json',
+]
+
+
+def check(parser):
+    """Parse every message both ways and compare."""
+    buf = bytearray(64)
+    for msg in MESSAGES:
+        n = len(msg)
+        buf[:n] = msg
+        kind = parser.parse(buf, n)
+        try:
+            ref = json.loads(msg)
+        except ValueError:
+            assert kind == ERROR, msg
+            continue
+        if kind == SPEED:
+            assert (parser.vl, parser.vr) == (round_half_away(ref["vl"]), round_half_away(ref["vr"])), msg
+        elif kind == LED:
+            assert parser.led == ref["LEDNumber"] and COLORS[parser.color] == ref["Color"].lower(), msg
+        elif kind == PING:
+            assert parser.ping == ref["ping"], msg
+        elif kind == NONE:
+            assert not ({"vl", "LEDNumber", "ping"} & set(ref)), msg
+        else:
+            raise AssertionError(msg)
+    print("parser matches json.loads on", len(MESSAGES), "messages")
+
+
+def round_half_away(x):
+    # Matches the parser: rounds on the first decimal digit.
+    return int(x + 0.5) if x >= 0 else -int(-x + 0.5)
+
+
+def bench(name, fn, buf, n, count=1000):
+    mem_alloc = getattr(gc, "mem_alloc", None)
+    gc.collect()
+    gc.disable()
+    before = mem_alloc() if mem_alloc else 0
+    start = ticks_us()
+    for _ in range(count):
+        fn(buf, n)
+    elapsed = ticks_diff(ticks_us(), start)
+    after = mem_alloc() if mem_alloc else 0
+    gc.enable()
+    heap = "%.1f bytes/message" % ((after - before) / count) if mem_alloc else "heap not measurable here"
+    print("%-12s %6.1f us/message, %s" % (name, elapsed / count, heap))
+
+
+parser = CommandParser()
+check(parser)
+
+line = b'{"vl":141.42,"vr":-58.58}'
+buf = bytearray(64)
+buf[:len(line)] = line
+bench("CommandParser", parser.parse, buf, len(line))
+bench("json.loads", lambda b, n: json.loads(bytes(b[:n])), buf, len(line))
+if sys.implementation.name != "micropython":
+    print("(allocation counts are only meaningful on the robot)")
@@ -0,0 +1,55 @@
+import json
+import utime
+from machine import Pin, I2C, UART
+from zumo_2040_robot import robot
+import ssd1306
+from oled_status import StatusScreen
+
+# Display as in oledExample.py; UART0 as in uartExample.py.
+i2c = I2C(id=0, scl=Pin(5), sda=Pin(4), freq=400_000)
+oled = ssd1306.SSD1306_I2C(128, 64, i2c, addr=0x3D)
+uart = UART(0, baudrate=115200, tx=Pin(28), rx=Pin(29))
+battery = robot.Battery()
+
+screen = StatusScreen(oled)
+screen.set_mode("IDLE")
+screen.set_ip("no link")
+
+# The Pi sends status lines now and then, e.g.
+#   {"mode":"TELEOP","ip":"192.168.0.12","rssi":-61,"X":120.5,"Y":-3.2,"Theta":87.0}
+# Only changed widgets are redrawn, and each refresh is sent in small steps
+# between loop passes so the loop never waits ~25 ms for a full I2C frame.
+pose = [0.0, 0.0, 0.0]
+next_battery = utime.ticks_ms()
+
+while True:
+    if uart.any():
+        line = uart.readline()
+        try:
+            status = json.loads(line)
+        except ValueError:
+            status = None
+        if isinstance(status, dict):
+            # Values come from the UART unchecked: skip a field of the wrong
+            # type instead of ending the display loop.
+            try:
+                if "mode" in status:
+                    screen.set_mode(status["mode"])
+                if "ip" in status:
+                    screen.set_ip(status["ip"])
+                if "rssi" in status:
+                    screen.set_rssi(status["rssi"])
+                if "X" in status:
+                    new_pose = [float(status.get("X", pose[0])), float(status.get("Y", pose[1])),
+                                float(status.get("Theta", pose[2]))]
+                    screen.set_pose(*new_pose)
+                    pose = new_pose
+            except (TypeError, ValueError):
+                pass
+
+    if utime.ticks_diff(utime.ticks_ms(), next_battery) >= 0:
+        screen.set_battery(battery.get_level_millivolts())
+        next_battery = utime.ticks_add(next_battery, 1000)
+
+    if not oled.show_step(32):
+        screen.refresh(blocking=False)
@@ -0,0 +1,22 @@
+from machine import Pin, UART
+from zumo_2040_robot import robot
+from telemetry import TelemetryBatcher
+
+# UART0 on pins 28 (TX) and 29 (RX), as in uartExample.py. The TX buffer
+# holds a few frames so write() returns immediately.
+uart = UART(0, baudrate=115200, tx=Pin(28), rx=Pin(29), txbuf=1024)
+
+encoders = robot.Encoders()
+imu = robot.IMU()
+imu.reset()
+imu.enable_default()
+
+# 200 samples/s in frames of 10: 20 frames (3.7 kB) per second, well inside
+# the 11.5 kB/s a 115200 baud link carries. On the Pi:
+#     python3 telemetry_frames.py --serial /dev/ttyAMA10
+telemetry = TelemetryBatcher(uart, encoders, imu, rate=200, batch=10)
+
+while True:
+    telemetry.poll()
+    # Other work goes here; keep each pass shorter than one sample period
+    # (5 ms) or samples are skipped and counted in telemetry.overruns.
@@ -0,0 +1,74 @@
+# CPython stand-in for MicroPython's `framebuf`, MONO_VLSB format only.
+#
+# Enough of the FrameBuffer API for the OLED driver and screens to run on
+# the Pi with a mocked I2C bus:
+#     PYTHONPATH=lib:host python3 examples/oledRefreshBenchmark.py
+# Pixels are stored exactly as on the robot (one byte = 8 vertical pixels of
+# a page), so byte counts and dirty regions match. text() draws a
+# placeholder glyph per character (same size and position as the built-in
+# 8x8 font, not the same shapes).
+
+MONO_VLSB = 0
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format=MONO_VLSB, stride=None):
+        if format != MONO_VLSB:
+            raise ValueError("only MONO_VLSB is supported")
+        self._buf = buffer
+        self._width = width
+        self._height = height
+        self._stride = stride or width
+
+    def fill(self, c):
+        value = 0xFF if c else 0x00
+        for i in range((self._height + 7) // 8 * self._stride):
+            self._buf[i] = value
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return 0 if c is None else None
+        i = (y >> 3) * self._stride + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[i] & bit else 0
+        if c:
+            self._buf[i] |= bit
+        else:
+            self._buf[i] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self._height)):
+            for xx in range(max(x, 0), min(x + w, self._width)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=1):
+        for k, ch in enumerate(s):
+            code = ord(ch)
+            for col in range(8):
+                bits = 0 if ch == " " or col == 7 else ((code * 37 + col * 11) & 0x7E) | 0x02
+                for row in range(8):
+                    if bits >> row & 1:
+                        self.pixel(x + 8 * k + col, y + row, c)
+
+    def blit(self, fbuf, x, y, key=-1):
+        for yy in range(fbuf._height):
+            for xx in range(fbuf._width):
+                c = fbuf.pixel(xx, yy)
+                if c != key:
+                    self.pixel(x + xx, y + yy, c)
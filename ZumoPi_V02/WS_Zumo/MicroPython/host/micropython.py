@@ -0,0 +1,19 @@
+# CPython stand-in for the `micropython` module, for running the robot-side
+# libraries on the Pi (see framebuf.py next to this file). The native code
+# emitters become plain Python; viper pointer annotations are accepted.
+
+import builtins
+
+builtins.ptr8 = builtins.ptr16 = builtins.ptr32 = object
+
+
+def const(x):
+    return x
+
+
+def native(f):
+    return f
+
+
+def viper(f):
+    return f
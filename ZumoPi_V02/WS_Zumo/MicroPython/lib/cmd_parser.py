@@ -0,0 +1,255 @@
+# Allocation-free parser for the UART JSON commands.
+#
+# json.loads() builds a dict, key strings and float objects for every
+# message, which on the RP2040 means a few hundred bytes of heap per command
+# and a garbage collection every few hundred commands, right in the control
+# loop. CommandParser only understands the command shapes the Pi sends:
+#
+#   {"vl":150,"vr":-150}              wheel speeds, mm/s (rounded, exponents allowed)
+#   {"LEDNumber":3,"Color":"Red"}     LED colour (Red/Green/Blue/White/Off/Black)
+#   {"ping":12}                       latency probe, echoed by the receiver
+#
+# A viper function scans the bytes in place and writes key hashes and
+# integer values into a preallocated array; parse() then copies them into
+# plain integer attributes. Nothing is allocated per message. Other
+# commands (arrays, booleans, unknown keys) parse as NONE, for the caller
+# to hand to json.loads().
+#
+# The module also imports under CPython (viper becomes plain Python), so the
+# parser can be checked against json.loads() on the Pi; see
+# examples/parserBenchmark.py.
+
+from array import array
+
+try:
+    import micropython
+    from micropython import const
+except ImportError:
+    # CPython: no native emitters, run the same code as plain Python.
+    class micropython:
+        @staticmethod
+        def viper(f):
+            return f
+
+    def const(x):
+        return x
+    ptr8 = ptr32 = object
+
+NONE = const(0)
+SPEED = const(1)
+LED = const(2)
+PING = const(3)
+ERROR = const(-1)
+
+_MAX_PAIRS = const(4)
+_NUMBER = const(1)
+_STRING = const(2)
+COLORS = ("red", "green", "blue", "white", "off", "black")
+COLOR_RGB = ((255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255), (0, 0, 0), (0, 0, 0))
+
+
+def key_hash(name):
+    """Hash used for keys and (lower-cased) string values; 16 bits, same as _scan()."""
+    h = 0
+    for c in name:
+        h = (h * 31 + c) & 0xFFFF
+    return h
+
+
+_KEY_VL = key_hash(b"vl")
+_KEY_VR = key_hash(b"vr")
+_KEY_LED = key_hash(b"LEDNumber")
+_KEY_COLOR = key_hash(b"Color")
+_KEY_PING = key_hash(b"ping")
+_COLOR_HASHES = tuple(key_hash(name.encode()) for name in COLORS)
+
+
+@micropython.viper
+def _scan(buf: ptr8, n: int, out: ptr32) -> int:
+    # Flat JSON object -> out[0] = pairs, then (key hash, value, type) per
+    # pair. Returns the pair count, or -1 if the line is not such an object.
+    i = 0
+    while i < n and int(buf[i]) != 123:             # '{'
+        i += 1
+    i += 1
+    pairs = 0
+    while i < n:
+        c = int(buf[i])
+        if c == 125:                                # '}'
+            out[0] = pairs
+            return pairs
+        if c == 32 or c == 44 or c == 9:            # space, ',', tab
+            i += 1
+            continue
+        if c != 34:                                 # '"'
+            return -1
+        i += 1
+        h = 0
+        while i < n and int(buf[i]) != 34:
+            h = (h * 31 + int(buf[i])) & 0xFFFF
+            i += 1
+        i += 1
+        while i < n and int(buf[i]) == 32:
+            i += 1
+        if i >= n or int(buf[i]) != 58:             # ':'
+            return -1
+        i += 1
+        while i < n and int(buf[i]) == 32:
+            i += 1
+        if i >= n:
+            return -1
+        v = 0
+        if int(buf[i]) == 34:                       # string: case-insensitive hash
+            i += 1
+            while i < n and int(buf[i]) != 34:
+                c = int(buf[i])
+                if c >= 65 and c <= 90:
+                    c += 32
+                v = (v * 31 + c) & 0xFFFF
+                i += 1
+            if i >= n:
+                return -1
+            i += 1
+            kind = 2
+        elif int(buf[i]) == 91 or int(buf[i]) == 123:   # array or object: skipped
+            depth = 0
+            while i < n:
+                c = int(buf[i])
+                if c == 34:
+                    i += 1
+                    while i < n and int(buf[i]) != 34:
+                        i += 1
+                elif c == 91 or c == 123:
+                    depth += 1
+                elif c == 93 or c == 125:
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            if i >= n:
+                return -1
+            i += 1
+            kind = 0
+        elif int(buf[i]) >= 97 and int(buf[i]) <= 122:  # true, false, null: skipped
+            while i < n and int(buf[i]) >= 97 and int(buf[i]) <= 122:
+                i += 1
+            kind = 0
+        else:                                       # number, rounded to an integer
+            neg = 0
+            if int(buf[i]) == 45:                   # '-'
+                neg = 1
+                i += 1
+            digits = 0
+            scale = 0                               # value is v * 10**scale
+            while i < n and int(buf[i]) >= 48 and int(buf[i]) <= 57:
+                if v < 100000000:
+                    v = v * 10 + int(buf[i]) - 48
+                else:
+                    scale += 1
+                digits += 1
+                i += 1
+            if i < n and int(buf[i]) == 46:         # '.'
+                i += 1
+                while i < n and int(buf[i]) >= 48 and int(buf[i]) <= 57:
+                    if v < 100000000:
+                        v = v * 10 + int(buf[i]) - 48
+                        scale -= 1
+                    digits += 1
+                    i += 1
+            if digits == 0:
+                return -1
+            if i < n and (int(buf[i]) == 101 or int(buf[i]) == 69):    # 'e', 'E'
+                i += 1
+                eneg = 0
+                if i < n and (int(buf[i]) == 45 or int(buf[i]) == 43):  # '-', '+'
+                    if int(buf[i]) == 45:
+                        eneg = 1
+                    i += 1
+                e = 0
+                edigits = 0
+                while i < n and int(buf[i]) >= 48 and int(buf[i]) <= 57:
+                    if e < 1000:
+                        e = e * 10 + int(buf[i]) - 48
+                    edigits += 1
+                    i += 1
+                if edigits == 0:
+                    return -1
+                if eneg:
+                    scale -= e
+                else:
+                    scale += e
+            while scale > 0 and v < 100000000:
+                v *= 10
+                scale -= 1
+            while scale < -1 and v:                 # keep one decimal digit
+                v //= 10
+                scale += 1
+            if scale == -1:                         # round on it
+                v = (v + 5) // 10
+            elif scale < 0:
+                v = 0
+            if neg:
+                v = -v
+            kind = 1
+        if pairs < _MAX_PAIRS:
+            out[1 + 3 * pairs] = h
+            out[2 + 3 * pairs] = v
+            out[3 + 3 * pairs] = kind
+            pairs += 1
+    return -1
+
+
+class CommandParser:
+    def __init__(self):
+        self._out = array('i', [0] * (1 + 3 * _MAX_PAIRS))
+        self.kind = NONE
+        self.vl = 0
+        self.vr = 0
+        self.led = 0
+        self.color = 0          # index into COLORS / COLOR_RGB
+        self.ping = 0
+
+    def parse(self, buf, n):
+        """
+        Parse buf[0:n]. Returns and stores in self.kind one of SPEED, LED,
+        PING, NONE (valid JSON object, unknown command) or ERROR; the values
+        are left in vl/vr, led/color or ping.
+        """
+        out = self._out
+        pairs = _scan(buf, n, out)
+        if pairs < 0:
+            self.kind = ERROR
+            return ERROR
+        found = 0
+        for p in range(pairs):
+            key = out[1 + 3 * p]
+            value = out[2 + 3 * p]
+            typ = out[3 + 3 * p]
+            if key == _KEY_VL and typ == _NUMBER:
+                self.vl = value
+                found |= 1
+            elif key == _KEY_VR and typ == _NUMBER:
+                self.vr = value
+                found |= 2
+            elif key == _KEY_LED and typ == _NUMBER:
+                self.led = value
+                found |= 4
+            elif key == _KEY_COLOR and typ == _STRING:
+                self.color = -1
+                for c in range(len(_COLOR_HASHES)):
+                    if _COLOR_HASHES[c] == value:
+                        self.color = c
+                found |= 8
+            elif key == _KEY_PING and typ == _NUMBER:
+                self.ping = value
+                found |= 16
+        if found & 3 == 3:
+            kind = SPEED
+        elif found & 4:
+            kind = LED if found & 8 and self.color >= 0 else ERROR
+        elif found & 16:
+            kind = PING
+        else:
+            kind = NONE
+        self.kind = kind
+        return kind
@@ -0,0 +1,184 @@
+# LED animation engine for the Zumo 2040 RGB LEDs.
+#
+# An animation is a bytearray of frames, each `count` LEDs x 3 bytes (R, G,
+# B), played at a fixed frame rate. LedAnimator.poll() from the main loop
+# shows the next frame when it is due, calls rgb_leds.set() only for LEDs
+# whose colour changed since the last frame, and rgb_leds.show() only if
+# something did. A 10-frame blink code is 300 bytes and costs nothing
+# between frame changes.
+#
+# Built-in animations are generated on the robot (ID code, blink codes for
+# the barcode hub markers, battery gauge). Anything else is uploaded from
+# the Pi in one line instead of one {"LEDNumber":..,"Color":..} command per
+# LED (Python/Examples/led_animations.py):
+#
+#   {"anim":"name","fps":10,"loop":true,"frames":"<base64 RGB frames>"}
+#   {"play":"name"}
+#   {"play":"blink","code":3,"color":[255,0,0]}
+#   {"play":"battery","percent":70}
+#   {"play":"id","id":5}
+#   {"play":"off"}
+
+import ubinascii
+import utime
+
+LED_COUNT = 10
+MARKER_LEDS = (6, 7, 8, 9)      # LEDs lit by setBarcodeLeds.py for the hub marker
+
+
+class Animation:
+    def __init__(self, frames, fps=10, loop=True, count=LED_COUNT):
+        if not frames or len(frames) % (3 * count):
+            raise ValueError("frame data is not a whole number of frames")
+        if not isinstance(fps, int) or fps <= 0:
+            raise ValueError("fps must be a positive integer")
+        self.frames = frames
+        self.count = count
+        self.length = len(frames) // (3 * count)
+        self.period_ms = max(1, 1000 // fps)
+        self.loop = loop
+
+
+def solid(color, leds=None, count=LED_COUNT):
+    """One frame: `color` on `leds` (default all), the rest off."""
+    frame = bytearray(3 * count)
+    for i in range(count) if leds is None else leds:
+        frame[3 * i:3 * i + 3] = bytes(color)
+    return Animation(frame, fps=1, loop=False, count=count)
+
+
+def blink_code(code, color=(255, 0, 0), leds=MARKER_LEDS, count=LED_COUNT):
+    """`code` blinks (200 ms on, 200 ms off) on the marker LEDs, then a 1 s pause; repeats."""
+    on = solid(color, leds, count).frames
+    off = bytearray(3 * count)
+    frames = bytearray()
+    for _ in range(code):
+        frames += on + on + off + off
+    for _ in range(10):
+        frames += off
+    return Animation(frames, fps=10, loop=True, count=count)
+
+
+def battery_gauge(percent, count=LED_COUNT):
+    """Bar of lit LEDs, green/yellow/red by level; blinks below 15 %."""
+    lit = (max(0, min(100, percent)) * count + 99) // 100
+    color = (0, 255, 0) if percent > 50 else (255, 160, 0) if percent > 20 else (255, 0, 0)
+    frame = solid(color, range(lit), count).frames
+    if percent >= 15:
+        return Animation(frame, fps=1, loop=False, count=count)
+    return Animation(frame + bytearray(3 * count), fps=2, loop=True, count=count)
+
+
+def id_code(robot_id, count=LED_COUNT, bits=6):
+    """Robot id in binary on the first `bits` LEDs: blue = 1, dim white = 0."""
+    frame = bytearray(3 * count)
+    for i in range(bits):
+        frame[3 * i:3 * i + 3] = b"\x00\x00\xff" if robot_id >> (bits - 1 - i) & 1 else b"\x10\x10\x10"
+    return Animation(frame, fps=1, loop=False, count=count)
+
+
+class LedAnimator:
+    def __init__(self, rgb_leds, count=LED_COUNT):
+        self.rgb_leds = rgb_leds
+        self.count = count
+        self.library = {}
+        self.current = None
+        self.frame = 0
+        self.next_ms = 0
+        self.shown = bytearray(3 * count)
+        self.forced = True
+        self.colors = [[0, 0, 0] for _ in range(count)]
+        self.frames_shown = 0
+        self.leds_set = 0
+
+    def add(self, name, animation):
+        self.library[name] = animation
+
+    def play(self, animation):
+        """Start an Animation (or the name of one added before) from its first frame."""
+        if isinstance(animation, str):
+            animation = self.library[animation]
+        self.current = animation
+        self.frame = 0
+        self.next_ms = utime.ticks_ms()
+        self.poll()
+
+    def stop(self):
+        self.play(solid((0, 0, 0), count=self.count))
+
+    def release(self):
+        """Stop animating because the LEDs are being set directly; the next frame rewrites them all."""
+        self.current = None
+        self.forced = True
+
+    def poll(self):
+        """Call from the main loop; shows the next frame when it is due."""
+        anim = self.current
+        if anim is None:
+            return False
+        now = utime.ticks_ms()
+        late = utime.ticks_diff(now, self.next_ms)
+        if late < 0:
+            return False
+        self._show(anim.frames, 3 * self.count * self.frame)
+        self.frame += 1
+        if self.frame >= anim.length:
+            if not anim.loop:
+                self.current = None
+                return True
+            self.frame = 0
+        # Fixed frame rate; after a stall, continue from now instead of catching up.
+        self.next_ms = utime.ticks_add(now if late >= anim.period_ms else self.next_ms, anim.period_ms)
+        return True
+
+    def _show(self, frames, base):
+        shown = self.shown
+        forced = self.forced
+        self.forced = False
+        changed = False
+        for i in range(self.count):
+            o = 3 * i
+            r = frames[base + o]
+            g = frames[base + o + 1]
+            b = frames[base + o + 2]
+            if forced or r != shown[o] or g != shown[o + 1] or b != shown[o + 2]:
+                shown[o] = r
+                shown[o + 1] = g
+                shown[o + 2] = b
+                color = self.colors[i]
+                color[0] = r
+                color[1] = g
+                color[2] = b
+                self.rgb_leds.set(i, color)
+                self.leds_set += 1
+                changed = True
+        if changed:
+            self.rgb_leds.show()
+        self.frames_shown += 1
+
+    def handle(self, msg):
+        """Apply an {"anim":..} or {"play":..} command dict. Returns an error string or None."""
+        try:
+            if "anim" in msg:
+                frames = ubinascii.a2b_base64(msg["frames"])
+                anim = Animation(frames, msg.get("fps", 10), msg.get("loop", True), self.count)
+                self.add(msg["anim"], anim)
+                if msg.get("start", True):
+                    self.play(anim)
+                return None
+            name = msg["play"]
+            if name == "off":
+                self.stop()
+            elif name == "blink":
+                self.play(blink_code(msg.get("code", 1), msg.get("color", (255, 0, 0)), count=self.count))
+            elif name == "battery":
+                self.play(battery_gauge(msg["percent"], self.count))
+            elif name == "id":
+                self.play(id_code(msg["id"], self.count))
+            elif name in self.library:
+                self.play(name)
+            else:
+                return "Unknown animation: " + name
+        except (KeyError, ValueError, TypeError) as e:
+            return "Bad animation command: " + str(e)
+        return None
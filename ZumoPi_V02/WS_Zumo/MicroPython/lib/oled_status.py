@@ -0,0 +1,204 @@
+# Status screen for the SSD1306 OLED: mode, link RSSI, IP address, pose and
+# battery.
+#
+# Each value lives in a fixed widget. A widget redraws only the characters
+# whose text changed, using glyphs rendered once into small framebuffers and
+# then blitted, and ssd1306.show() only sends the page columns that changed.
+# Updating a pose field that moved by 0.1 mm costs one or two glyph blits
+# and a few dozen bus bytes, not a full redraw and a 1 KB transfer.
+#
+# Layout (128x64, 8-pixel rows):
+#   row 0   MODE..........  RSSI bars
+#   row 1   IP address
+#   row 3   X   -1234.5
+#   row 4   Y   -1234.5
+#   row 5   T    -180.0
+#   row 6-7 battery %, 2x digits, and a level bar
+
+import framebuf
+
+BATTERY_EMPTY_MV = 4400     # 4 x AA NiMH under load
+BATTERY_FULL_MV = 5600
+
+
+class GlyphCache:
+    """8x8 font glyphs (optionally scaled up), each rendered once on first use."""
+
+    def __init__(self, scale=1):
+        self.scale = scale
+        self.size = 8 * scale
+        self.glyphs = {}
+        self._one = bytearray(8)
+        self._one_fb = framebuf.FrameBuffer(self._one, 8, 8, framebuf.MONO_VLSB)
+
+    def get(self, ch):
+        glyph = self.glyphs.get(ch)
+        if glyph is None:
+            size = self.size
+            buf = bytearray(size * size // 8)
+            glyph = framebuf.FrameBuffer(buf, size, size, framebuf.MONO_VLSB)
+            one = self._one_fb
+            one.fill(0)
+            one.text(ch, 0, 0, 1)
+            if self.scale == 1:
+                glyph.blit(one, 0, 0)
+            else:
+                s = self.scale
+                for y in range(8):
+                    for x in range(8):
+                        if one.pixel(x, y):
+                            glyph.fill_rect(x * s, y * s, s, s, 1)
+            self.glyphs[ch] = glyph
+        return glyph
+
+
+class TextField:
+    """Fixed-width text at (x, y); set() redraws only the characters that changed."""
+
+    def __init__(self, fb, x, y, width, glyphs):
+        self.fb = fb
+        self.x = x
+        self.y = y
+        self.width = width
+        self.glyphs = glyphs
+        self.shown = bytearray(b" " * width)
+        self.blits = 0
+
+    def set(self, text):
+        """Show text (padded/cut to the field width). Returns the number of characters redrawn."""
+        size = self.glyphs.size
+        changed = 0
+        n = len(text)
+        for i in range(self.width):
+            c = ord(text[i]) if i < n else 32
+            if c == self.shown[i]:
+                continue
+            self.shown[i] = c
+            x = self.x + i * size
+            if c == 32:
+                self.fb.fill_rect(x, self.y, size, size, 0)
+            else:
+                self.fb.blit(self.glyphs.get(chr(c)), x, self.y)
+            changed += 1
+        self.blits += changed
+        return changed
+
+
+class LevelBar:
+    """Horizontal bar of `segments` blocks; set() redraws only the blocks that toggle."""
+
+    def __init__(self, fb, x, y, w, h, segments, outline=True):
+        self.fb = fb
+        self.x = x
+        self.y = y
+        self.h = h
+        self.segments = segments
+        self.step = w // segments
+        self.level = 0
+        if outline:
+            fb.rect(x - 1, y - 1, w + 1, h + 2, 1)
+
+    def set(self, level):
+        level = max(0, min(self.segments, level))
+        if level == self.level:
+            return 0
+        lo = min(level, self.level)
+        hi = max(level, self.level)
+        for i in range(lo, hi):
+            self.fb.fill_rect(self.x + i * self.step, self.y, self.step - 1, self.h, 1 if i < level else 0)
+        self.level = level
+        return hi - lo
+
+
+class SignalBars:
+    """Four rising bars for the link RSSI; set(bars) redraws only the bars that toggle."""
+
+    def __init__(self, fb, x, y):
+        self.fb = fb
+        self.x = x
+        self.y = y
+        self.bars = -1
+
+    def set(self, bars):
+        bars = max(0, min(4, bars))
+        if bars == self.bars:
+            return 0
+        for i in range(4):
+            on = i < bars
+            if self.bars < 0 or on != (i < self.bars):
+                h = 2 * (i + 1)
+                self.fb.fill_rect(self.x + 4 * i, self.y, 3, 8, 0)
+                if on:
+                    self.fb.fill_rect(self.x + 4 * i, self.y + 8 - h, 3, h, 1)
+                else:
+                    self.fb.hline(self.x + 4 * i, self.y + 7, 3, 1)
+        self.bars = bars
+        return 1
+
+
+def rssi_bars(dbm):
+    """Wi-Fi RSSI (dBm) to 0..4 bars."""
+    if dbm is None:
+        return 0
+    return max(0, min(4, (dbm + 90) // 12 + 1))
+
+
+def battery_percent(millivolts):
+    p = (millivolts - BATTERY_EMPTY_MV) * 100 // (BATTERY_FULL_MV - BATTERY_EMPTY_MV)
+    return max(0, min(100, p))
+
+
+class StatusScreen:
+    def __init__(self, oled):
+        """oled: ssd1306.SSD1306 (or any FrameBuffer with show()/start_show())."""
+        self.oled = oled
+        small = GlyphCache(1)
+        big = GlyphCache(2)
+        oled.fill(0)
+        self.mode = TextField(oled, 0, 0, 12, small)
+        self.rssi = SignalBars(oled, 112, 0)
+        self.ip = TextField(oled, 0, 8, 16, small)
+        oled.text("X", 0, 24, 1)
+        oled.text("Y", 0, 32, 1)
+        oled.text("T", 0, 40, 1)
+        self.x = TextField(oled, 24, 24, 8, small)
+        self.y = TextField(oled, 24, 32, 8, small)
+        self.theta = TextField(oled, 24, 40, 8, small)
+        self.battery = TextField(oled, 0, 48, 4, big)
+        self.battery_bar = LevelBar(oled, 72, 52, 50, 8, 10)
+        self.changes = 0
+
+    def set_mode(self, mode):
+        self.changes += self.mode.set(mode)
+
+    def set_ip(self, ip):
+        self.changes += self.ip.set(ip)
+
+    def set_rssi(self, dbm):
+        self.changes += self.rssi.set(rssi_bars(dbm))
+
+    def set_pose(self, x, y, theta):
+        """Position in mm, heading in degrees."""
+        self.changes += self.x.set("%8.1f" % x)
+        self.changes += self.y.set("%8.1f" % y)
+        self.changes += self.theta.set("%8.1f" % theta)
+
+    def set_battery(self, millivolts):
+        percent = battery_percent(millivolts)
+        self.changes += self.battery.set("%3d%%" % percent)
+        self.changes += self.battery_bar.set((percent + 5) // 10)
+
+    def refresh(self, blocking=True):
+        """
+        Push the changes to the display: blocking sends them now, otherwise
+        a non-blocking transfer is started (continue it with oled.show_step()).
+        Returns False if nothing had changed.
+        """
+        if not self.changes:
+            return False
+        self.changes = 0
+        if blocking:
+            self.oled.show()
+        else:
+            self.oled.start_show()
+        return True
@@ -0,0 +1,126 @@
+# Batched binary telemetry for the Zumo 2040.
+#
+# Samples the encoders (and optionally the IMU) at a fixed rate into a
+# preallocated frame buffer and writes a whole frame to the UART every
+# `batch` samples, instead of formatting and writing one text line per
+# sample. Nothing is allocated per sample, so the garbage collector does not
+# interrupt the loop, and one 185-byte write every 10 samples replaces ten
+# ~60-byte lines.
+#
+# Frame layout (little endian):
+#   0xA5 0x5A            sync
+#   uint8  count         samples in this frame
+#   uint16 seq           frame counter, wraps at 65536 (gaps = lost frames)
+#   count records of:
+#     uint32 t_us        utime.ticks_us() when sampled (wraps at 2**30, ~17.9 min)
+#     int32  left, right encoder counts
+#     int16  gyro_z      0.1 deg/s
+#     int16  acc_x, acc_y  mg
+#   uint8  checksum      sum of the bytes from `count` to the last record, mod 256
+#
+# Python/Examples/telemetry_frames.py decodes the stream on the Pi.
+
+import struct
+import micropython
+import utime
+
+SYNC = b'\xa5\x5a'
+HEADER = '<BH'
+RECORD = '<Iii3h'
+HEADER_SIZE = 5
+RECORD_SIZE = 18
+
+
+@micropython.viper
+def _checksum(buf: ptr8, start: int, end: int) -> int:
+    s = 0
+    for i in range(start, end):
+        s += buf[i]
+    return s & 0xFF
+
+
+class TelemetryBatcher:
+    def __init__(self, uart, encoders, imu=None, rate=200, batch=10):
+        """
+        uart: machine.UART (give it a txbuf of at least one frame so write()
+        returns without waiting for the bytes to go out).
+        encoders: robot.Encoders(); imu: robot.IMU() already enabled, or None.
+        """
+        self.uart = uart
+        self.encoders = encoders
+        self.imu = imu
+        self.batch = batch
+        self.period = 1000000 // rate
+        self.frame = bytearray(HEADER_SIZE + batch * RECORD_SIZE + 1)
+        self.frame[0:2] = SYNC
+        self.view = memoryview(self.frame)
+        self.count = 0
+        self.seq = 0
+        self.overruns = 0
+        self.next_sample = utime.ticks_us()
+        self._timer_callback = self._on_timer
+
+    def sample(self):
+        """Take one sample now; sends the frame once it is full."""
+        t = utime.ticks_us()
+        left, right = self.encoders.get_counts()
+        gyro_z = acc_x = acc_y = 0
+        if self.imu is not None:
+            self.imu.read()
+            gyro_z = int(self.imu.gyro.last_reading_dps[2] * 10)
+            acc = self.imu.acc.last_reading_g
+            acc_x = int(acc[0] * 1000)
+            acc_y = int(acc[1] * 1000)
+        struct.pack_into(RECORD, self.frame, HEADER_SIZE + self.count * RECORD_SIZE,
+                         t, left, right, gyro_z, acc_x, acc_y)
+        self.count += 1
+        if self.count == self.batch:
+            self.flush()
+
+    def flush(self):
+        """Send the samples collected so far (a short frame if not full)."""
+        n = self.count
+        if n == 0:
+            return
+        struct.pack_into(HEADER, self.frame, 2, n, self.seq)
+        end = HEADER_SIZE + n * RECORD_SIZE
+        self.frame[end] = _checksum(self.frame, 2, end)
+        if n == self.batch:
+            self.uart.write(self.frame)
+        else:
+            self.uart.write(self.view[:end + 1])
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.count = 0
+
+    def poll(self):
+        """
+        Call from the main loop as often as possible: samples whenever the
+        next sample time has passed. If the loop stalls for more than one
+        period the missed samples are skipped (and counted in overruns)
+        rather than taken in a burst.
+        """
+        now = utime.ticks_us()
+        late = utime.ticks_diff(now, self.next_sample)
+        if late < 0:
+            return False
+        self.sample()
+        if late >= self.period:
+            self.overruns += late // self.period
+            self.next_sample = utime.ticks_add(now, self.period)
+        else:
+            self.next_sample = utime.ticks_add(self.next_sample, self.period)
+        return True
+
+    def start_timer(self, timer_id=-1):
+        """Sample from a hardware timer instead of poll() (soft IRQ on the RP2040)."""
+        from machine import Timer
+        self.timer = Timer(timer_id)
+        self.timer.init(freq=1000000 // self.period, mode=Timer.PERIODIC,
+                        callback=self._timer_callback)
+
+    def stop_timer(self):
+        self.timer.deinit()
+        self.flush()
+
+    def _on_timer(self, timer):
+        self.sample()
@@ -0,0 +1,85 @@
+# Low-latency UART line receiver for the Zumo 2040.
+#
+# The UART driver already receives in its RX interrupt into a ring buffer
+# (the `rxbuf` argument of machine.UART); the latency of uartExample.py comes
+# from only looking at it every 100 ms, and readline() allocates a new bytes
+# object per line. LineReceiver drains the driver's buffer into a fixed
+# chunk with readinto(), assembles lines in a preallocated line buffer and
+# hands each complete line to a handler as (buffer, length). No objects are
+# created per byte or per line, so receiving does not trigger the garbage
+# collector.
+#
+# Two ways to drive it:
+#   - poll() from a busy main loop (no sleep), a few microseconds when idle
+#   - `await receiver.run()` as a uasyncio task, which sleeps until the UART
+#     has data and so costs nothing while the link is quiet
+#
+# UART.irq() with an RX trigger would call us from the interrupt itself, but
+# it is not available on the rp2 port of the v1.22 firmware used here.
+
+import uasyncio as asyncio
+
+
+class LineReceiver:
+    def __init__(self, uart, handler, line_size=128, chunk_size=64):
+        """
+        handler(buf, n) is called for every complete line with the line in
+        buf[0:n] (without the line ending). buf is reused for the next line,
+        so copy out anything that must outlive the call.
+        """
+        self.uart = uart
+        self.handler = handler
+        self.line = bytearray(line_size)
+        self.chunk = bytearray(chunk_size)
+        self.length = 0
+        self.lines = 0
+        self.overflows = 0
+        self.discarding = False
+
+    def poll(self):
+        """Process everything received so far. Returns the number of complete lines."""
+        before = self.lines
+        while self.uart.any():
+            n = self.uart.readinto(self.chunk)
+            if not n:
+                break
+            self.feed(n)
+        return self.lines - before
+
+    def feed(self, n):
+        """Add the first n bytes of self.chunk to the current line."""
+        chunk = self.chunk
+        line = self.line
+        size = len(line)
+        length = self.length
+        for i in range(n):
+            c = chunk[i]
+            if c == 10:     # '\n' ends a line; a preceding '\r' is dropped
+                if self.discarding:
+                    self.discarding = False
+                else:
+                    if length and line[length - 1] == 13:
+                        length -= 1
+                    if length:
+                        self.lines += 1
+                        self.handler(line, length)
+                length = 0
+            elif self.discarding:
+                pass
+            elif length < size:
+                line[length] = c
+                length += 1
+            else:
+                # Too long for the buffer: drop the whole line rather than
+                # handing out a truncated command.
+                self.overflows += 1
+                self.discarding = True
+                length = 0
+        self.length = length
+
+    async def run(self):
+        reader = asyncio.StreamReader(self.uart)
+        while True:
+            n = await reader.readinto(self.chunk)
+            if n:
+                self.feed(n)
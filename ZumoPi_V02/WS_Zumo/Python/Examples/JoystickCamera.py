@@ -19,14 +19,17 @@ from dash import html, dcc
 import plotly.graph_objs as go
 from flask import request
 
+from drive_mixing import DriveMixer
+
 # Picamera2 and OpenCV imports
 from picamera2 import Picamera2
 import cv2
 
 class ZumoApp:
-    def __init__(self, serial_port, external_stylesheets):
+    def __init__(self, serial_port, external_stylesheets, mixer=None):
         # Open the serial port with the proper baud rate.
         self.ser = serial.Serial(serial_port, 115200)
+        self.mixer = mixer or DriveMixer()
         self.zumo_angle = 0
         self.zumo_speed = 0
         self.closing_event = threading.Event()
@@ -61,12 +64,12 @@ class ZumoApp:
         while not self.closing_event.is_set() and self.ser.isOpen:
             with self.lock:
                 # Compute joystick components based on current angle and force.
-                joy_y = math.sin(math.radians(self.zumo_angle)) * self.zumo_speed * 200
-                joy_x = math.cos(math.radians(self.zumo_angle)) * self.zumo_speed * 200
+                # We assume the force (zumo_speed) is normalized.
+                joy_y = math.sin(math.radians(self.zumo_angle)) * self.zumo_speed
+                joy_x = math.cos(math.radians(self.zumo_angle)) * self.zumo_speed
 
-            # Simple mixing: left = joy_y + joy_x, right = joy_y - joy_x.
-            left_velocity = joy_y + joy_x
-            right_velocity = joy_y - joy_x
+            # Shared mixing: saturates without changing the curve, applies the wheel calibration.
+            left_velocity, right_velocity = self.mixer.mix(joy_x, joy_y)
 
             # Pack velocities into JSON using keys 'vl' and 'vr'
             command = {"vl": left_velocity, "vr": right_velocity}
@@ -227,7 +230,8 @@ class ZumoApp:
 def main():
     external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
     serial_port = '/dev/ttyAMA10'
-    zumo_app = ZumoApp(serial_port, external_stylesheets)
+    calibration_file = None     # wheel calibration JSON, see drive_mixing.py
+    zumo_app = ZumoApp(serial_port, external_stylesheets, DriveMixer.load(calibration_file))
 
     try:
         zumo_app.start()
@@ -16,6 +16,19 @@ from dash import html, dcc
 import plotly.graph_objs as go
 from flask import request
 
+from session_log import SessionWriter
+
+# Optional mocap ground truth from the subscribe_to_mocap mocap_bridge node
+# (needs the ROS workspace sourced so the package is importable).
+try:
+    from subscribe_to_mocap.mocap_shm import PoseRing
+except ImportError:
+    PoseRing = None
+
+MOCAP_BODY_ID = 1          # rigid body id of this robot in Motive
+MOCAP_TRACK_LENGTH = 2000  # mocap samples kept for the overlay
+MOCAP_STALE_TIME = 1.0     # s without new records before checking for a restarted bridge
+
 class RobotApp:
     def __init__(self, serial_port, external_stylesheets):
         # Open the serial port (adjust your baud rate and timeout as needed)
@@ -35,8 +48,15 @@ class RobotApp:
         self.app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
         self.create_layout()
 
-        # Log file (optional)
-        self.file = open('recorded_messages.txt', 'a')
+        # Mocap overlay: ring attached lazily once the bridge is running
+        self.mocap = None
+        self.mocap_count = None
+        self.mocap_advanced = 0.0
+        self.mocap_xy = np.empty((0, 2))
+
+        # Columnar session log of the run (see session_log.py)
+        self.session = SessionWriter(time.strftime('session_%Y%m%d_%H%M%S'),
+                                     serial_port=serial_port)
 
     def start(self):
         # Start thread(s)
@@ -63,7 +83,6 @@ class RobotApp:
                 if not line:
                     continue
                 with self.lock:
-                    self.file.write(line + "\n")  # record raw line to file (optional)
                     try:
                         data_msg = json.loads(line)
                         # Extract relevant fields, with defaults if missing
@@ -74,8 +93,11 @@ class RobotApp:
                         vR = data_msg.get("vR", 0.0)
 
                         self.received_data.append((x, y, theta, vL, vR))
-                    except json.JSONDecodeError:
-                        # If the line isn't valid JSON, just skip it
+                        if not self.session.closed:
+                            self.session.append_message(data_msg)
+                    except (TypeError, ValueError, AttributeError):
+                        # Not valid JSON, not an object, or a non-numeric
+                        # field: skip the line
                         pass
             else:
                 time.sleep(0.05)
@@ -89,6 +111,38 @@ class RobotApp:
     #         self.ser.write(msg.encode('ascii'))
     #         time.sleep(0.1)
 
+    def read_mocap(self):
+        """
+        Append new mocap poses of MOCAP_BODY_ID (in mm) from the shared-memory
+        ring. Records are copied out as one NumPy array per update. When the
+        ring stops advancing and the bridge has replaced it (restart), the
+        new ring is attached on the next update.
+        """
+        if PoseRing is None:
+            return
+        now = time.monotonic()
+        if self.mocap is None:
+            try:
+                self.mocap = PoseRing.attach()
+            except (FileNotFoundError, ValueError):
+                return
+            self.mocap_count = None
+            self.mocap_advanced = now
+        elif self.mocap.count == self.mocap_count and now - self.mocap_advanced > MOCAP_STALE_TIME:
+            self.mocap_advanced = now
+            if not self.mocap.is_current():
+                self.mocap.close()
+                self.mocap = None
+                return
+        with self.lock:
+            if self.mocap.count != self.mocap_count:
+                self.mocap_advanced = now
+            records, self.mocap_count = self.mocap.read(since=self.mocap_count)
+            mine = records[(records['id'] == MOCAP_BODY_ID) & (records['tracking'] != 0)]
+            if len(mine):
+                xy = np.column_stack([mine['x'], mine['y']]) * 1000.0
+                self.mocap_xy = np.vstack([self.mocap_xy, xy])[-MOCAP_TRACK_LENGTH:]
+
     def create_layout(self):
         """
         Creates the Dash layout with:
@@ -169,7 +223,16 @@ class RobotApp:
                     scaleanchor='x',
                     scaleratio=1),
         )
-        fig_path = go.Figure(data=[path_trace], layout=layout_path)
+        traces = [path_trace]
+        self.read_mocap()
+        if len(self.mocap_xy):
+            traces.append(go.Scatter(
+                x=self.mocap_xy[:, 0],
+                y=self.mocap_xy[:, 1],
+                mode='lines',
+                name='Mocap (ground truth)'
+            ))
+        fig_path = go.Figure(data=traces, layout=layout_path)
 
         # ------------------------------------------------------
         #  2) Time-Series Plot (Theta, vL, vR)
@@ -207,7 +270,10 @@ class RobotApp:
     def close(self):
         # Signal the threads to close
         self.closing_event.set()
-        self.file.close()
+        with self.lock:
+            self.session.close()
+        if self.mocap is not None:
+            self.mocap.close()
 
     def close_button_clicked(self, n_clicks):
         if n_clicks is not None and n_clicks > 0:
@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+"""
+Odometry drift against mocap ground truth.
+
+Loads a recorded odometry session (session_log.py; X/Y in mm, Theta in deg)
+and the mocap poses of the same run, then:
+
+  1. resamples both on a uniform grid and finds the time offset between the
+     two clocks by FFT cross-correlation of the heading rates (the heading
+     rate does not depend on either frame's origin or rotation)
+  2. fits the rigid transform (rotation + translation) from the odometry
+     frame to the mocap frame on the first `fit_seconds` of the run, where
+     the odometry has not drifted yet
+  3. reports position and heading error against distance travelled: final,
+     RMS and 95th percentile error, and the drift rate (slope of error vs
+     distance, mm/m and deg/m)
+
+Every step works on whole arrays, so an hour-long recording takes well under
+a second.
+
+Mocap poses are read from a CSV with columns t,x,y,yaw (s, m, rad; an id
+column selects the body with --body) or from a .npy of mocap_shm.PoseRing
+records, e.g. np.save('mocap.npy', PoseRing.attach().read()[0]).
+
+Usage:
+    python3 drift_analysis.py run_dir mocap.csv --body 1
+    python3 drift_analysis.py --batch runs.csv       # rows: session_dir,mocap_file,body
+"""
+import argparse
+import csv
+
+import numpy as np
+
+from session_log import load_session
+
+DT = 0.01   # s, common resampling period
+
+
+def load_odometry(session_dir):
+    """(t, x, y, theta) in s, m, rad from a session directory."""
+    session = load_session(session_dir)
+    t = np.asarray(session["t"], dtype=float)
+    xy = session.as_array(["X", "Y"]).astype(float) / 1000.0
+    theta = np.radians(np.asarray(session["Theta"], dtype=float))
+    keep = np.isfinite(t) & np.isfinite(xy).all(axis=1) & np.isfinite(theta)
+    return t[keep], xy[keep, 0], xy[keep, 1], theta[keep]
+
+
+def load_mocap(filename, body=None):
+    """(t, x, y, yaw) in s, m, rad from a mocap CSV or PoseRing .npy file."""
+    if filename.endswith(".npy"):
+        data = np.load(filename)
+        if "tracking" in data.dtype.names:
+            data = data[data["tracking"] != 0]
+        data = {name: data[name] for name in data.dtype.names}
+    else:
+        with open(filename) as f:
+            names = [name.strip() for name in f.readline().split(",")]
+        columns = np.loadtxt(filename, delimiter=",", skiprows=1, ndmin=2)
+        data = dict(zip(names, columns.T))
+    if body is not None:
+        if "id" not in data:
+            raise ValueError(f"{filename} has no id column to select body {body}")
+        mine = data["id"] == body
+        data = {name: column[mine] for name, column in data.items()}
+    order = np.argsort(data["t"], kind="stable")
+    return tuple(np.asarray(data[name], dtype=float)[order] for name in ("t", "x", "y", "yaw"))
+
+
+def uniform(t, values, dt=DT):
+    """Resample columns onto a uniform time grid. Returns (grid, (len(grid), k) array)."""
+    grid = np.arange(t[0], t[-1], dt)
+    return grid, np.column_stack([np.interp(grid, t, v) for v in values])
+
+
+def heading_rate(theta, dt=DT):
+    return np.gradient(theta, dt)
+
+
+def estimate_offset(t_odom, theta_odom, t_mocap, yaw_mocap, max_offset=5.0, dt=DT):
+    """
+    Clock offset (s) to add to the odometry time to match the mocap time,
+    from the peak of the heading-rate cross-correlation (FFT, sub-sample
+    refined with a parabola through the peak).
+    """
+    # Unwrap before resampling: interpolating across a +-pi wrap invents turns.
+    g_odom, th = uniform(t_odom, [np.unwrap(theta_odom)], dt)
+    g_mocap, yw = uniform(t_mocap, [np.unwrap(yaw_mocap)], dt)
+    a = heading_rate(th[:, 0], dt)
+    b = heading_rate(yw[:, 0], dt)
+    a = a - a.mean()
+    b = b - b.mean()
+
+    n = len(a) + len(b) - 1
+    size = 1 << int(np.ceil(np.log2(n)))
+    corr = np.fft.irfft(np.fft.rfft(b, size) * np.conj(np.fft.rfft(a, size)), size)
+    # corr[k] = sum b[i + k] * a[i]; negative lags wrap to the end.
+    lags = np.concatenate([np.arange(0, len(b)), np.arange(-(len(a) - 1), 0)])
+    corr = np.concatenate([corr[:len(b)], corr[size - (len(a) - 1):]])
+
+    # Offset for each lag; search near zero when the recordings overlap in
+    # time (same host clock), otherwise near aligned start times.
+    shift = g_mocap[0] - g_odom[0]
+    offset = lags * dt + shift
+    overlap = t_odom[0] < t_mocap[-1] and t_mocap[0] < t_odom[-1]
+    prior = 0.0 if overlap else t_mocap[0] - t_odom[0]
+    window = np.abs(offset - prior) <= max_offset
+    if not window.any():
+        window[:] = True
+    k = np.flatnonzero(window)[np.argmax(corr[window])]
+    refine = 0.0
+    if 0 < k < len(corr) - 1 and lags[k - 1] == lags[k] - 1 and lags[k + 1] == lags[k] + 1:
+        y0, y1, y2 = corr[k - 1], corr[k], corr[k + 1]
+        denom = y0 - 2 * y1 + y2
+        if denom != 0:
+            refine = 0.5 * (y0 - y2) / denom
+    return offset[k] + refine * dt
+
+
+def fit_rigid(src, dst):
+    """Rotation angle and translation mapping (N, 2) src onto dst (least squares)."""
+    src_c = src - src.mean(axis=0)
+    dst_c = dst - dst.mean(axis=0)
+    h = src_c.T @ dst_c
+    angle = np.arctan2(h[0, 1] - h[1, 0], h[0, 0] + h[1, 1])
+    rot = rotation(angle)
+    return angle, dst.mean(axis=0) - src.mean(axis=0) @ rot.T
+
+
+def rotation(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s], [s, c]])
+
+
+def analyse(odom, mocap, fit_seconds=5.0, max_offset=5.0, dt=DT):
+    """
+    Drift statistics for one run. odom and mocap are (t, x, y, heading)
+    tuples in s, m, rad. Returns a dict of scalars and per-sample arrays.
+    """
+    t_o, x_o, y_o, th_o = odom
+    t_m, x_m, y_m, yaw_m = mocap
+    offset = estimate_offset(t_o, th_o, t_m, yaw_m, max_offset, dt)
+
+    # Odometry samples inside the mocap time span, mocap interpolated onto them.
+    t = t_o + offset
+    inside = (t >= t_m[0]) & (t <= t_m[-1])
+    if inside.sum() < 10:
+        raise ValueError("Odometry and mocap recordings do not overlap")
+    t = t[inside]
+    odom_xy = np.column_stack([x_o[inside], y_o[inside]])
+    odom_th = np.unwrap(th_o[inside])
+    yaw_u = np.unwrap(yaw_m)
+    truth_xy = np.column_stack([np.interp(t, t_m, x_m), np.interp(t, t_m, y_m)])
+    truth_th = np.interp(t, t_m, yaw_u)
+
+    # Frame transform from the start of the run (fall back to the initial pose
+    # if the robot barely moved, where the least-squares rotation is undefined).
+    fit = t <= t[0] + fit_seconds
+    spread = np.ptp(odom_xy[fit], axis=0).max() if fit.sum() > 1 else 0.0
+    if spread > 0.05:
+        angle, shift = fit_rigid(odom_xy[fit], truth_xy[fit])
+    else:
+        angle = truth_th[0] - odom_th[0]
+        shift = truth_xy[0] - odom_xy[0] @ rotation(angle).T
+    aligned = odom_xy @ rotation(angle).T + shift
+
+    pos_err = np.hypot(*(aligned - truth_xy).T)
+    head_drift = odom_th + angle - truth_th
+    head_drift -= 2 * np.pi * np.round(head_drift[0] / (2 * np.pi))
+    head_err = np.angle(np.exp(1j * head_drift))
+    distance = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(truth_xy, axis=0).T))])
+
+    moving = distance > 0
+    pos_rate = np.polyfit(distance[moving], pos_err[moving], 1)[0] if moving.sum() > 2 else np.nan
+    head_rate = (np.polyfit(distance[moving], np.abs(head_drift[moving]), 1)[0]
+                 if moving.sum() > 2 else np.nan)
+    return {
+        "offset": offset,
+        "rotation": angle,
+        "translation": shift,
+        "duration": t[-1] - t[0],
+        "distance": distance[-1],
+        "final_error": pos_err[-1],
+        "rms_error": np.sqrt(np.mean(pos_err ** 2)),
+        "p95_error": np.percentile(pos_err, 95),
+        "final_heading_error": head_err[-1],
+        "drift_rate": pos_rate,
+        "heading_drift_rate": head_rate,
+        "t": t,
+        "position_error": pos_err,
+        "heading_error": head_err,
+        "distance_travelled": distance,
+    }
+
+
+def report(name, r):
+    print(f"{name}: {r['duration']:.1f} s, {r['distance']:.2f} m travelled, "
+          f"clock offset {r['offset'] * 1000:+.1f} ms, frame rotation {np.degrees(r['rotation']):+.1f} deg")
+    print(f"  position error  final {r['final_error'] * 1000:7.1f} mm  RMS {r['rms_error'] * 1000:7.1f} mm"
+          f"  p95 {r['p95_error'] * 1000:7.1f} mm  drift {r['drift_rate'] * 1000:6.1f} mm/m")
+    print(f"  heading error   final {np.degrees(r['final_heading_error']):+7.2f} deg"
+          f"  drift {np.degrees(r['heading_drift_rate']):6.2f} deg/m")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odometry drift against mocap ground truth")
+    parser.add_argument("session_dir", nargs="?", help="odometry session (session_log.py)")
+    parser.add_argument("mocap_file", nargs="?", help="mocap CSV (t,x,y,yaw[,id]) or PoseRing .npy")
+    parser.add_argument("--body", type=int, default=None, help="mocap body id")
+    parser.add_argument("--batch", default=None, help="CSV of session_dir,mocap_file[,body] rows")
+    parser.add_argument("--fit-seconds", type=float, default=5.0,
+                        help="initial span used to fit the odometry->mocap transform")
+    parser.add_argument("--max-offset", type=float, default=5.0, help="largest clock offset searched, s")
+    parser.add_argument("--out", default=None, help="CSV of t,position_error,heading_error,distance")
+    args = parser.parse_args()
+
+    if args.batch:
+        with open(args.batch) as f:
+            runs = [(row[0], row[1], int(row[2]) if len(row) > 2 and row[2] else None)
+                    for row in csv.reader(f) if row and not row[0].startswith("#")]
+    elif args.session_dir and args.mocap_file:
+        runs = [(args.session_dir, args.mocap_file, args.body)]
+    else:
+        parser.error("give session_dir and mocap_file, or --batch")
+
+    rates = []
+    for session_dir, mocap_file, body in runs:
+        result = analyse(load_odometry(session_dir), load_mocap(mocap_file, body),
+                         args.fit_seconds, args.max_offset)
+        report(session_dir if body is None else f"{session_dir} (body {body})", result)
+        rates.append(result["drift_rate"])
+        if args.out and len(runs) == 1:
+            np.savetxt(args.out, np.column_stack([result["t"], result["position_error"],
+                                                  result["heading_error"], result["distance_travelled"]]),
+                       delimiter=",", header="t,position_error,heading_error,distance", comments="",
+                       fmt="%.5f")
+    if len(runs) > 1:
+        rates = np.array(rates)
+        print(f"{len(runs)} runs: drift {np.nanmean(rates) * 1000:.1f} mm/m mean, "
+              f"{np.nanmax(rates) * 1000:.1f} mm/m worst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""
+Differential-drive mixing shared by the teleoperation apps.
+
+Every app used to mix with left = y + x, right = y - x and scale by 200,
+which gives up to 283 mm/s on a diagonal (1.41 * 200) and ignores the fact
+that the two Zumo motors never run at quite the same speed for the same
+command. DriveMixer does it once for all of them:
+
+  - stick input (x right, y forward, -1..1) or a body command (forward
+    speed, turn speed in mm/s) becomes wheel speeds
+  - saturation is curvature preserving: if either wheel would exceed
+    max_speed, both are scaled by the same factor, so the robot still
+    drives the arc it was asked for, only slower (clipping each wheel
+    independently turns a fast curve into a spin)
+  - a per-wheel calibration table maps the wheel speed we want to the
+    command that produces it, by linear interpolation between measured
+    points; a plain gain/offset (offset = deadband, applied away from zero)
+    is the two-parameter special case
+  - every function takes NumPy arrays as well as scalars, so a simulation
+    can mix a whole batch of inputs in one call
+
+Calibration files are JSON, one entry per wheel, either a table of
+[wanted mm/s, command mm/s] points or a gain/offset pair:
+
+    {"left":  [[-300, -320], [-50, -62], [0, 0], [50, 62], [300, 318]],
+     "right": {"gain": 0.96, "offset": 8}}
+
+Usage (prints the mixing of a few stick positions):
+    python3 drive_mixing.py --max-speed 200 --calibration wheels.json
+"""
+import argparse
+import json
+
+import numpy as np
+
+MAX_SPEED = 200.0       # mm/s at full stick, as in Joystick.py
+
+
+def shape(x, y, deadzone=0.0, expo=0.0):
+    """
+    Radial deadzone (rescaled so the output still starts from 0) and expo
+    curve (0 = linear, 1 = cubic) on a stick position.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    r = np.hypot(x, y)
+    r_out = np.clip((r - deadzone) / (1.0 - deadzone), 0.0, 1.0)
+    r_out = (1.0 - expo) * r_out + expo * r_out ** 3
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gain = np.where(r > deadzone, r_out / r, 0.0)
+    return _out(x * gain), _out(y * gain)
+
+
+def saturate(left, right, limit):
+    """Scale both wheels by the same factor so that neither exceeds limit."""
+    left = np.asarray(left, dtype=float)
+    right = np.asarray(right, dtype=float)
+    peak = np.maximum(np.abs(left), np.abs(right))
+    scale = limit / np.maximum(peak, limit)
+    return _out(left * scale), _out(right * scale)
+
+
+def _out(a):
+    return float(a) if a.ndim == 0 else a
+
+
+class WheelCalibration:
+    """Wanted wheel speed -> wheel command, for one wheel."""
+
+    def __init__(self, speeds=(-1.0, 1.0), commands=(-1.0, 1.0)):
+        order = np.argsort(speeds)
+        self.speeds = np.asarray(speeds, dtype=float)[order]
+        self.commands = np.asarray(commands, dtype=float)[order]
+
+    @classmethod
+    def from_gain_offset(cls, gain=1.0, offset=0.0):
+        # Points just either side of zero keep the deadband step sharp.
+        eps = 1e-6
+        return cls([-1.0, -eps, 0.0, eps, 1.0],
+                   [-gain - offset, -eps * gain - offset, 0.0, eps * gain + offset, gain + offset])
+
+    @classmethod
+    def from_spec(cls, spec):
+        if isinstance(spec, dict):
+            return cls.from_gain_offset(spec.get("gain", 1.0), spec.get("offset", 0.0))
+        points = np.asarray(spec, dtype=float)
+        return cls(points[:, 0], points[:, 1])
+
+    def __call__(self, speed):
+        speed = np.asarray(speed, dtype=float)
+        # Linear inside the table, extrapolated with the end segments' slopes.
+        s, c = self.speeds, self.commands
+        out = np.interp(speed, s, c)
+        lo = speed < s[0]
+        hi = speed > s[-1]
+        if lo.any():
+            out = np.where(lo, c[0] + (speed - s[0]) * (c[1] - c[0]) / (s[1] - s[0]), out)
+        if hi.any():
+            out = np.where(hi, c[-1] + (speed - s[-1]) * (c[-1] - c[-2]) / (s[-1] - s[-2]), out)
+        return _out(out)
+
+
+class DriveMixer:
+    def __init__(self, max_speed=MAX_SPEED, left=None, right=None):
+        self.max_speed = max_speed
+        self.left = left or WheelCalibration()
+        self.right = right or WheelCalibration()
+
+    @classmethod
+    def load(cls, filename, max_speed=MAX_SPEED):
+        """Mixer with the calibration from a JSON file (no file: uncalibrated)."""
+        if not filename:
+            return cls(max_speed)
+        with open(filename) as f:
+            spec = json.load(f)
+        return cls(max_speed, WheelCalibration.from_spec(spec["left"]),
+                   WheelCalibration.from_spec(spec["right"]))
+
+    def wheels(self, forward, turn):
+        """
+        Body command (forward speed, turn speed in mm/s; positive turn adds to
+        the left wheel, i.e. turns right) to calibrated wheel commands.
+        """
+        forward = np.asarray(forward, dtype=float)
+        turn = np.asarray(turn, dtype=float)
+        left, right = saturate(forward + turn, forward - turn, self.max_speed)
+        return self.left(left), self.right(right)
+
+    def mix(self, x, y):
+        """Stick position (x right, y forward, -1..1) to calibrated wheel commands in mm/s."""
+        return self.wheels(np.asarray(y, dtype=float) * self.max_speed,
+                           np.asarray(x, dtype=float) * self.max_speed)
+
+    def command(self, x, y):
+        """Stick position to a {"vl","vr"} line for the UART."""
+        left, right = self.mix(x, y)
+        return b'{"vl":%d,"vr":%d}\n' % (round(left), round(right))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print wheel speeds for a few stick positions")
+    parser.add_argument("--max-speed", type=float, default=MAX_SPEED)
+    parser.add_argument("--calibration", default=None, help="JSON wheel calibration")
+    args = parser.parse_args()
+
+    mixer = DriveMixer.load(args.calibration, args.max_speed)
+    angles = np.radians(np.arange(0, 360, 45))
+    x, y = np.cos(angles), np.sin(angles)
+    left, right = mixer.mix(x, y)
+    for a, l, r in zip(np.degrees(angles), left, right):
+        print(f"stick {a:5.0f} deg  vl {l:7.1f}  vr {r:7.1f} mm/s")
+
+
+if __name__ == "__main__":
+    main()
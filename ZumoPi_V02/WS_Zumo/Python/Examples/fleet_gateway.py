@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+"""
+Fleet gateway: many Zumo links in one asyncio event loop.
+
+Each robot link is a serial device (the UART of a Pi, a USB port, or a
+zumo_simulator.py pty) or a TCP address (tcp://host:port, e.g. ser2net on a
+robot's Pi). All links are read and written from one event loop, so one
+process serves a whole classroom fleet.
+
+Control stations connect to the gateway's TCP port and speak JSON lines:
+
+  - telemetry from every robot, keyed by robot id and stamped on arrival:
+        {"robot":"zumo01","t":1712345678.123,"msg":{"X":..,"Y":..,...}}
+    (lines that are not valid JSON objects, like firmware debug prints or
+    lines garbled on the wire, arrive as "text" instead of "msg"); a valid
+    line is spliced in as-is, never re-serialised
+  - commands are routed by their "robot" key, which is stripped before the
+    line goes to the UART; "*" sends to every robot:
+        {"robot":"zumo01","vl":150,"vr":150}
+  - {"stats":true} returns per-link counters: lines and bytes each way,
+    telemetry rate, largest gap between telemetry lines and the time
+    commands spend in the gateway before they are written
+
+A slow client never stalls the fleet: each client has a bounded queue and
+the oldest lines are dropped when it fills up.
+
+Usage:
+    python3 fleet_gateway.py zumo01=/dev/ttyAMA10 zumo02=tcp://192.168.0.12:5000
+    python3 zumo_simulator.py --robots 3      # then pass the printed /dev/pts/N
+    python3 fleet_gateway.py /dev/pts/3 /dev/pts/4 /dev/pts/5 --listen 0.0.0.0:9000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import serial
+
+CLIENT_QUEUE = 1000      # lines buffered per control station before dropping
+RECONNECT_DELAY = 2.0    # s
+
+
+class LinkStats:
+    def __init__(self):
+        self.rx_lines = 0
+        self.rx_bytes = 0
+        self.tx_lines = 0
+        self.tx_bytes = 0
+        self.max_gap = 0.0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.last_rx = None
+        self.window_start = time.monotonic()
+        self.window_lines = 0
+        self.rate = 0.0
+
+    def received(self, nbytes, now):
+        self.rx_lines += 1
+        self.rx_bytes += nbytes
+        self.window_lines += 1
+        if self.last_rx is not None:
+            self.max_gap = max(self.max_gap, now - self.last_rx)
+        self.last_rx = now
+        if now - self.window_start >= 1.0:
+            self.rate = self.window_lines / (now - self.window_start)
+            self.window_start = now
+            self.window_lines = 0
+
+    def sent(self, nbytes, latency):
+        self.tx_lines += 1
+        self.tx_bytes += nbytes
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self):
+        return {
+            "rx_lines": self.rx_lines,
+            "rx_bytes": self.rx_bytes,
+            "tx_lines": self.tx_lines,
+            "tx_bytes": self.tx_bytes,
+            "rate_hz": round(self.rate, 1),
+            "max_gap_ms": round(self.max_gap * 1000, 1),
+            "cmd_latency_ms": round(self.latency_sum / self.tx_lines * 1000, 3) if self.tx_lines else None,
+            "cmd_latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+
+def _reject_constant(name):
+    raise ValueError(name)
+
+
+def is_json_object(line):
+    """True if line is a strict JSON object (NaN/Infinity would break browser clients)."""
+    try:
+        return isinstance(json.loads(line, parse_constant=_reject_constant), dict)
+    except (ValueError, UnicodeDecodeError):
+        return False
+
+
+class RobotLink:
+    """One robot connection, reopened automatically when it drops."""
+
+    def __init__(self, robot_id, target, baudrate=115200):
+        self.robot_id = robot_id
+        self.target = target
+        self.baudrate = baudrate
+        self.stats = LinkStats()
+        self.connected = False
+        self.outbox = asyncio.Queue()
+        self.prefix = ('{"robot":%s,"t":' % json.dumps(robot_id)).encode()
+
+    async def open(self):
+        """Returns (reader, writer) streams for the link."""
+        if self.target.startswith("tcp://"):
+            host, _, port = self.target[len("tcp://"):].rpartition(":")
+            return await asyncio.open_connection(host, int(port))
+
+        # Serial: let pyserial set up the port, then hand its descriptor to
+        # asyncio (tty devices are supported by the pipe transports).
+        loop = asyncio.get_running_loop()
+        ser = serial.Serial(self.target, self.baudrate, timeout=0)
+        reader = asyncio.StreamReader()
+        self._read_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader),
+            open(ser.fileno(), "rb", buffering=0, closefd=False))
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, open(ser.fileno(), "wb", buffering=0, closefd=False))
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        self._serial = ser
+        return reader, writer
+
+    def close(self):
+        transport = getattr(self, "_read_transport", None)
+        if transport is not None:
+            transport.close()
+            self._read_transport = None
+        ser = getattr(self, "_serial", None)
+        if ser is not None:
+            ser.close()
+            self._serial = None
+
+    def clear_outbox(self):
+        """Drop queued commands; after a reconnect they would be stale."""
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+
+    def frame(self, line, now):
+        """Wrap one telemetry line for the common stream without re-serialising it."""
+        line = line.rstrip(b"\r\n")
+        if line.startswith(b"{") and line.endswith(b"}") and is_json_object(line):
+            return b"%s%.3f,\"msg\":%s}\n" % (self.prefix, now, line)
+        text = json.dumps(line.decode("ascii", errors="replace"))
+        return b"%s%.3f,\"text\":%s}\n" % (self.prefix, now, text.encode())
+
+
+class FleetGateway:
+    def __init__(self, links):
+        self.links = {link.robot_id: link for link in links}
+        self.clients = set()
+
+    async def run_link(self, link):
+        while True:
+            writer = None
+            try:
+                reader, writer = await link.open()
+                link.connected = True
+                print(f"{link.robot_id}: connected to {link.target}")
+                sender = asyncio.create_task(self.send_commands(link, writer))
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if not line:
+                            break
+                        now = time.time()
+                        link.stats.received(len(line), time.monotonic())
+                        if line.strip():
+                            self.publish(link.frame(line, now))
+                finally:
+                    sender.cancel()
+            except (OSError, serial.SerialException, ValueError) as e:
+                print(f"{link.robot_id}: {e}")
+            finally:
+                link.connected = False
+                link.clear_outbox()
+                if writer is not None:
+                    writer.close()
+                link.close()
+            print(f"{link.robot_id}: disconnected, retrying in {RECONNECT_DELAY:.0f} s")
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def send_commands(self, link, writer):
+        try:
+            while True:
+                data, queued = await link.outbox.get()
+                writer.write(data)
+                await writer.drain()
+                link.stats.sent(len(data), time.monotonic() - queued)
+        except OSError as e:
+            # Stop taking commands for the dead link and close it, so the
+            # reader sees EOF and run_link reconnects.
+            print(f"{link.robot_id}: write failed: {e}")
+            link.connected = False
+            link.clear_outbox()
+            writer.close()
+            link.close()
+
+    def publish(self, data):
+        for queue in self.clients:
+            if queue.full():
+                queue.get_nowait()      # drop the oldest line for slow clients
+            queue.put_nowait(data)
+
+    def route(self, msg):
+        """Queue a command for its robot(s). Returns an error string or None."""
+        robot = msg.pop("robot", None)
+        if robot == "*":
+            targets = list(self.links.values())
+        elif robot in self.links:
+            targets = [self.links[robot]]
+        else:
+            return f"unknown robot {robot!r}"
+        data = (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+        now = time.monotonic()
+        for link in targets:
+            if link.connected:
+                link.outbox.put_nowait((data, now))
+        return None
+
+    def stats(self):
+        return {robot_id: dict(link.stats.as_dict(), connected=link.connected)
+                for robot_id, link in self.links.items()}
+
+    async def handle_client(self, reader, writer):
+        queue = asyncio.Queue(CLIENT_QUEUE)
+        self.clients.add(queue)
+        peer = writer.get_extra_info("peername")
+        print(f"Client {peer} connected")
+
+        async def forward():
+            while True:
+                writer.write(await queue.get())
+                await writer.drain()
+
+        forwarder = asyncio.create_task(forward())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit; the reader has dropped it.
+                    self.publish_to(queue, {"error": "line too long"})
+                    continue
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError:
+                    msg = None
+                if not isinstance(msg, dict):
+                    reply = {"error": "expected a JSON object"}
+                elif msg.get("stats"):
+                    reply = {"stats": self.stats()}
+                else:
+                    error = self.route(msg)
+                    reply = {"error": error} if error else None
+                if reply is not None:
+                    self.publish_to(queue, reply)
+        except ConnectionError:
+            pass
+        finally:
+            forwarder.cancel()
+            self.clients.discard(queue)
+            writer.close()
+            print(f"Client {peer} disconnected")
+
+    @staticmethod
+    def publish_to(queue, reply):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait((json.dumps(reply, separators=(",", ":")) + "\n").encode())
+
+    async def report(self, every):
+        while True:
+            await asyncio.sleep(every)
+            for robot_id, s in self.stats().items():
+                print(f"{robot_id}: {'up' if s['connected'] else 'down'}  rx {s['rate_hz']:6.1f} Hz  "
+                      f"{s['rx_lines']} lines in, {s['tx_lines']} out  max gap {s['max_gap_ms']} ms  "
+                      f"cmd latency {s['cmd_latency_ms']} ms")
+
+    async def serve(self, host, port, stats_every=None):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Gateway listening on {host}:{port} for {len(self.links)} robots")
+        tasks = [asyncio.create_task(self.run_link(link)) for link in self.links.values()]
+        if stats_every:
+            tasks.append(asyncio.create_task(self.report(stats_every)))
+        async with server:
+            await asyncio.gather(server.serve_forever(), *tasks)
+
+
+def parse_links(specs, baudrate):
+    links = []
+    for i, spec in enumerate(specs):
+        robot_id, sep, target = spec.partition("=")
+        if not sep or robot_id.startswith("/") or robot_id.startswith("tcp"):
+            robot_id, target = f"robot{i}", spec
+        links.append(RobotLink(robot_id, target, baudrate))
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fleet of Zumo links from one process")
+    parser.add_argument("links", nargs="+", metavar="[ID=]DEVICE|tcp://HOST:PORT",
+                        help="robot links; ids default to robot0, robot1, ...")
+    parser.add_argument("--listen", default="0.0.0.0:9000", help="host:port for control stations")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--stats-every", type=float, default=10.0,
+                        help="print link statistics every N seconds (0 = never)")
+    args = parser.parse_args()
+
+    host, _, port = args.listen.rpartition(":")
+    gateway = FleetGateway(parse_links(args.links, args.baudrate))
+    try:
+        asyncio.run(gateway.serve(host or "0.0.0.0", int(port), args.stats_every))
+    except KeyboardInterrupt:
+        print("Gateway stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/python3
+"""
+Gamepad teleoperation for the V02 JSON protocol.
+
+Replaces the V01 GamePadDrive.py pattern (read_loop() into globals, resend
+"joyX*2,joyY*2" every 100 ms) with:
+
+  - non-blocking evdev reads: the loop sleeps in select() until the pad
+    sends something or the heartbeat is due
+  - event coalescing: everything queued since the last wake-up is drained,
+    only the last value of each axis counts, and one command is computed
+    per batch instead of one per event
+  - axis scaling from the device's own absinfo (min/max/flat), a radial
+    deadzone and an expo curve for fine control around the centre, then
+    the shared drive_mixing.py saturation and wheel calibration
+  - commands sent only when they change, plus a heartbeat so the firmware's
+    1 s command timeout never stops a robot that is being held steady
+  - input-to-send latency (kernel event timestamp to UART write) and
+    coalescing statistics printed every --stats-every seconds
+
+--virtual creates a uinput gamepad that sweeps the stick, to exercise the
+whole path without hardware (needs /dev/uinput, e.g. sudo on the Pi); point
+--serial at a zumo_simulator.py pty to run without a robot as well.
+
+Usage:
+    python3 gamepad_teleop.py --serial /dev/ttyAMA10
+    python3 gamepad_teleop.py --device /dev/input/event2 --deadzone 0.1 --expo 0.4
+    sudo python3 gamepad_teleop.py --virtual --serial /dev/pts/3
+"""
+import argparse
+import json
+import math
+import select
+import threading
+import time
+
+import evdev
+import serial
+from evdev import ecodes
+
+from drive_mixing import DriveMixer, MAX_SPEED, shape
+
+HEARTBEAT = 0.25         # s between repeated commands while nothing changes
+
+
+def find_gamepad():
+    """First input device with an X/Y stick."""
+    for path in evdev.list_devices():
+        device = evdev.InputDevice(path)
+        axes = [code for code, _ in device.capabilities().get(ecodes.EV_ABS, [])]
+        if ecodes.ABS_X in axes and ecodes.ABS_Y in axes:
+            return device
+        device.close()
+    raise RuntimeError("No gamepad with an X/Y stick found")
+
+
+def axis_scaler(absinfo):
+    """Function mapping raw axis values to -1..1, with the device's flat zone removed."""
+    centre = (absinfo.max + absinfo.min) / 2.0
+    half = max((absinfo.max - absinfo.min) / 2.0, 1.0)
+    flat = absinfo.flat / half
+
+    def scale(value):
+        x = (value - centre) / half
+        if abs(x) <= flat:
+            return 0.0
+        return math.copysign(min((abs(x) - flat) / (1.0 - flat), 1.0), x)
+    return scale
+
+
+class GamepadTeleop:
+    def __init__(self, device, ser, deadzone=0.08, expo=0.3, invert_y=True, mixer=None):
+        self.device = device
+        self.ser = ser
+        self.mixer = mixer or DriveMixer()
+        self.deadzone = deadzone
+        self.expo = expo
+        self.y_sign = -1.0 if invert_y else 1.0     # most pads report "up" as negative Y
+        self.scale_x = axis_scaler(device.absinfo(ecodes.ABS_X))
+        self.scale_y = axis_scaler(device.absinfo(ecodes.ABS_Y))
+        self.raw = {ecodes.ABS_X: None, ecodes.ABS_Y: None}
+        self.last_command = None
+        self.last_send = 0.0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.events = 0
+        self.batches = 0
+        self.sends = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def drain(self):
+        """Read every queued event. Returns the kernel time of the newest axis event, or None."""
+        newest = None
+        try:
+            for event in self.device.read():
+                if event.type == ecodes.EV_ABS and event.code in self.raw:
+                    self.raw[event.code] = event.value
+                    newest = event.timestamp()
+                    self.events += 1
+        except BlockingIOError:
+            pass
+        return newest
+
+    def command(self):
+        x = self.scale_x(self.raw[ecodes.ABS_X]) if self.raw[ecodes.ABS_X] is not None else 0.0
+        y = self.scale_y(self.raw[ecodes.ABS_Y]) if self.raw[ecodes.ABS_Y] is not None else 0.0
+        return self.mixer.command(*shape(x, self.y_sign * y, self.deadzone, self.expo))
+
+    def send(self, data):
+        self.ser.write(data)
+        self.last_command = data
+        self.last_send = time.monotonic()
+        self.sends += 1
+
+    def step(self, timeout):
+        """Wait up to `timeout` for input, then send if the command changed or the heartbeat is due."""
+        ready, _, _ = select.select([self.device.fd], [], [], timeout)
+        if ready:
+            event_time = self.drain()
+            self.batches += 1
+            data = self.command()
+            if data != self.last_command:
+                self.send(data)
+                if event_time is not None:
+                    latency = time.time() - event_time
+                    self.latency_count += 1
+                    self.latency_sum += latency
+                    self.latency_max = max(self.latency_max, latency)
+                return
+        if time.monotonic() - self.last_send >= HEARTBEAT:
+            self.send(self.last_command or self.command())
+
+    def run(self, stats_every=5.0):
+        report = time.monotonic() + stats_every
+        while True:
+            self.step(max(HEARTBEAT - (time.monotonic() - self.last_send), 0.0))
+            now = time.monotonic()
+            if stats_every and now >= report:
+                print(f"{self.events} events in {self.batches} batches -> {self.sends} sends; "
+                      f"latency mean {self.latency_sum / max(self.latency_count, 1) * 1000:.2f} ms, "
+                      f"max {self.latency_max * 1000:.2f} ms; last {self.last_command.decode().strip()}")
+                self.reset_stats()
+                report = now + stats_every
+
+
+def virtual_gamepad(period=4.0):
+    """uinput pad whose stick sweeps a circle at 250 Hz (background thread)."""
+    absinfo = evdev.AbsInfo(value=128, min=0, max=255, fuzz=0, flat=4, resolution=0)
+    ui = evdev.UInput({ecodes.EV_ABS: [(ecodes.ABS_X, absinfo), (ecodes.ABS_Y, absinfo)],
+                       ecodes.EV_KEY: [ecodes.BTN_SOUTH]}, name="zumo-virtual-pad")
+
+    def sweep():
+        start = time.monotonic()
+        while True:
+            phase = 2 * math.pi * (time.monotonic() - start) / period
+            ui.write(ecodes.EV_ABS, ecodes.ABS_X, int(128 + 100 * math.cos(phase)))
+            ui.write(ecodes.EV_ABS, ecodes.ABS_Y, int(128 + 100 * math.sin(phase)))
+            ui.syn()
+            time.sleep(0.004)
+
+    threading.Thread(target=sweep, daemon=True).start()
+    time.sleep(0.5)     # let udev create the event node
+    return evdev.InputDevice(ui.device.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gamepad teleoperation with evdev")
+    parser.add_argument("--serial", default="/dev/ttyAMA10")
+    parser.add_argument("--device", default=None, help="input device (default: first gamepad found)")
+    parser.add_argument("--deadzone", type=float, default=0.08, help="radial deadzone, 0..1")
+    parser.add_argument("--expo", type=float, default=0.3, help="0 = linear, 1 = cubic")
+    parser.add_argument("--max-speed", type=float, default=MAX_SPEED, help="mm/s at full stick")
+    parser.add_argument("--calibration", default=None, help="wheel calibration JSON (drive_mixing.py)")
+    parser.add_argument("--no-invert-y", action="store_true", help="stick up reports positive Y")
+    parser.add_argument("--virtual", action="store_true", help="drive a uinput test pad instead")
+    parser.add_argument("--stats-every", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.virtual:
+        device = virtual_gamepad()
+    elif args.device:
+        device = evdev.InputDevice(args.device)
+    else:
+        device = find_gamepad()
+    print(f"Using {device.path}: {device.name}")
+
+    ser = serial.Serial(args.serial, 115200, timeout=0.1)
+    teleop = GamepadTeleop(device, ser, args.deadzone, args.expo, not args.no_invert_y,
+                           DriveMixer.load(args.calibration, args.max_speed))
+    try:
+        teleop.run(args.stats_every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.write(json.dumps({"vl": 0, "vr": 0}).encode("ascii") + b"\n")
+        ser.close()
+
+
+if __name__ == "__main__":
+    main()
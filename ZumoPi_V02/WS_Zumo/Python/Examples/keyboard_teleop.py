@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+"""
+Keyboard teleoperation with held-key state and acceleration ramps.
+
+KeyboardTeleoperate.py (V01) reads single characters in cbreak mode, so it
+only sees the terminal's key repeat: the robot jumps to a fixed speed on the
+first character, keeps it until some other key arrives, and cannot tell
+"W and D held together" from "W, then D". Here the keyboard is read through
+evdev, which reports presses and releases:
+
+  - the set of held keys gives a target forward speed and turn rate
+  - a fixed-rate control loop (--rate Hz) moves the commanded speeds towards
+    the target by at most --accel (speeding up) or --decel (slowing down)
+    mm/s per second, so there are no steps in wheel speed; drive_mixing.py
+    turns speed and turn rate into calibrated wheel speeds, slowing both
+    wheels together when a curve would exceed the top speed
+  - {"vl","vr"} is written only when the rounded command changes, plus a
+    repeat every RESEND_PERIOD while moving so the firmware's 1 s command
+    timeout does not trip
+
+Keys: W/S or Up/Down drive, A/D or Left/Right turn (both can be held),
+1-5 set the top speed (50 mm/s steps, as in V01), Space stops immediately,
+Q or Esc quits. Reading /dev/input needs the "input" group or sudo; --grab
+keeps the keys from also reaching the shell.
+
+Usage:
+    python3 keyboard_teleop.py --serial /dev/ttyAMA10
+    python3 keyboard_teleop.py --device /dev/input/event0 --accel 300 --rate 50 --grab
+"""
+import argparse
+import select
+import time
+
+import evdev
+import serial
+from evdev import ecodes
+
+from drive_mixing import DriveMixer
+
+RESEND_PERIOD = 0.5     # s, repeat an unchanged non-zero command (firmware times out after 1 s)
+SPEED_STEP = 50.0       # mm/s per digit key
+STOP = b'{"vl":0,"vr":0}\n'
+
+FORWARD = {ecodes.KEY_W, ecodes.KEY_UP}
+BACKWARD = {ecodes.KEY_S, ecodes.KEY_DOWN}
+LEFT = {ecodes.KEY_A, ecodes.KEY_LEFT}
+RIGHT = {ecodes.KEY_D, ecodes.KEY_RIGHT}
+DIGITS = {ecodes.KEY_1: 1, ecodes.KEY_2: 2, ecodes.KEY_3: 3, ecodes.KEY_4: 4, ecodes.KEY_5: 5}
+QUIT = {ecodes.KEY_Q, ecodes.KEY_ESC}
+
+
+def find_keyboard():
+    """First input device with letter keys."""
+    for path in evdev.list_devices():
+        device = evdev.InputDevice(path)
+        keys = device.capabilities().get(ecodes.EV_KEY, [])
+        if ecodes.KEY_W in keys and ecodes.KEY_SPACE in keys:
+            return device
+        device.close()
+    raise RuntimeError("No keyboard found")
+
+
+def ramp(current, target, accel, decel, dt):
+    """Move towards target by at most accel*dt (decel*dt when slowing down or reversing)."""
+    limit = (decel if abs(target) < abs(current) or target * current < 0 else accel) * dt
+    return current + max(-limit, min(limit, target - current))
+
+
+class KeyboardTeleop:
+    def __init__(self, ser, accel=400.0, decel=800.0, turn_ratio=0.6, level=3, mixer=None):
+        self.ser = ser
+        self.mixer = mixer or DriveMixer()
+        self.accel = accel
+        self.decel = decel
+        self.turn_ratio = turn_ratio    # turn speed as a fraction of the top speed
+        self.max_speed = self.mixer.max_speed = level * SPEED_STEP
+        self.held = set()
+        self.speed = 0.0                # mm/s forward
+        self.turn = 0.0                 # mm/s added to the left wheel, taken from the right
+        self.last_command = None
+        self.last_send = 0.0
+        self.sends = 0
+        self.quit = False
+
+    def handle(self, code, value):
+        """One EV_KEY event: value 1 press, 0 release, 2 autorepeat (ignored)."""
+        if value == 2:
+            return
+        if value == 0:
+            self.held.discard(code)
+            return
+        self.held.add(code)
+        if code in DIGITS:
+            self.max_speed = self.mixer.max_speed = DIGITS[code] * SPEED_STEP
+        elif code == ecodes.KEY_SPACE:
+            self.speed = self.turn = 0.0
+        elif code in QUIT:
+            self.quit = True
+
+    def target(self):
+        drive = bool(self.held & FORWARD) - bool(self.held & BACKWARD)
+        steer = bool(self.held & RIGHT) - bool(self.held & LEFT)
+        if ecodes.KEY_SPACE in self.held:
+            return 0.0, 0.0
+        return drive * self.max_speed, steer * self.max_speed * self.turn_ratio
+
+    def tick(self, dt, now):
+        """Advance the ramps by dt and send the command if it changed (or is due a repeat)."""
+        target_speed, target_turn = self.target()
+        if ecodes.KEY_SPACE in self.held:
+            self.speed = self.turn = 0.0
+        else:
+            self.speed = ramp(self.speed, target_speed, self.accel, self.decel, dt)
+            self.turn = ramp(self.turn, target_turn, self.accel, self.decel, dt)
+        left, right = self.mixer.wheels(self.speed, self.turn)
+        data = b'{"vl":%d,"vr":%d}\n' % (round(left), round(right))
+        if data != self.last_command or (data != STOP and now - self.last_send >= RESEND_PERIOD):
+            self.ser.write(data)
+            self.last_command = data
+            self.last_send = now
+            self.sends += 1
+
+    def run(self, device, rate=50.0):
+        period = 1.0 / rate
+        next_tick = time.monotonic()
+        last = next_tick
+        while not self.quit:
+            timeout = max(next_tick - time.monotonic(), 0.0)
+            if select.select([device.fd], [], [], timeout)[0]:
+                try:
+                    for event in device.read():
+                        if event.type == ecodes.EV_KEY:
+                            self.handle(event.code, event.value)
+                except BlockingIOError:
+                    pass
+                continue
+            now = time.monotonic()
+            self.tick(now - last, now)
+            last = now
+            # Fixed-rate schedule; skip ahead rather than bursting after a stall.
+            next_tick = max(next_tick + period, now)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyboard teleoperation with acceleration limits")
+    parser.add_argument("--serial", default="/dev/ttyAMA10")
+    parser.add_argument("--device", default=None, help="keyboard input device (default: first found)")
+    parser.add_argument("--rate", type=float, default=50.0, help="control loop rate, Hz")
+    parser.add_argument("--accel", type=float, default=400.0, help="mm/s^2 when speeding up")
+    parser.add_argument("--decel", type=float, default=800.0, help="mm/s^2 when slowing down")
+    parser.add_argument("--turn-ratio", type=float, default=0.6, help="turn speed / top speed")
+    parser.add_argument("--calibration", default=None, help="wheel calibration JSON (drive_mixing.py)")
+    parser.add_argument("--grab", action="store_true", help="take exclusive use of the keyboard")
+    args = parser.parse_args()
+
+    device = evdev.InputDevice(args.device) if args.device else find_keyboard()
+    print(f"Using {device.path}: {device.name}  (WASD/arrows drive, 1-5 speed, Space stop, Q quit)")
+    ser = serial.Serial(args.serial, 115200, timeout=0.1)
+    teleop = KeyboardTeleop(ser, args.accel, args.decel, args.turn_ratio,
+                            mixer=DriveMixer.load(args.calibration))
+    if args.grab:
+        device.grab()
+    try:
+        teleop.run(device, args.rate)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.grab:
+            device.ungrab()
+        ser.write(STOP)
+        ser.close()
+        print(f"{teleop.sends} commands sent")
+
+
+if __name__ == "__main__":
+    main()
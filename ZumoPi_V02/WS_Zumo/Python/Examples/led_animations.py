@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+LED animations for the robot's 10 RGB LEDs (MicroPython led_anim.py, run by
+commandReceiver.py).
+
+Instead of one {"LEDNumber":..,"Color":..} command per LED and per change,
+an animation is built here as a (frames, 10, 3) uint8 array and uploaded in
+one line; the robot stores it and plays it at a fixed frame rate, updating
+only the LEDs that change between frames. The built-in animations (blink
+code, battery gauge, robot id) are generated on the robot and only need a
+{"play":..} line.
+
+Usage:
+    python3 led_animations.py chase --color 0 0 255 --fps 15
+    python3 led_animations.py pulse --color 255 0 0
+    python3 led_animations.py rainbow
+    python3 led_animations.py blink --code 3
+    python3 led_animations.py battery --percent 40
+    python3 led_animations.py id --id 5
+    python3 led_animations.py off
+"""
+import argparse
+import base64
+import json
+import time
+
+import numpy as np
+import serial
+
+LED_COUNT = 10
+LINE_SIZE = 1024            # commandReceiver.py line buffer
+# JSON around the frames stays under 80 bytes; base64 is 4 chars per 3 bytes.
+MAX_FRAMES = (LINE_SIZE - 80) * 3 // 4 // (3 * LED_COUNT)
+
+
+def chase(color, frames=LED_COUNT, tail=3):
+    """One lit LED running around the ring with a fading tail."""
+    out = np.zeros((frames, LED_COUNT, 3))
+    for f in range(frames):
+        for k in range(tail):
+            out[f, (f - k) % LED_COUNT] = np.asarray(color) / (1 << (2 * k))
+    return out
+
+
+def pulse(color, frames=20):
+    """All LEDs breathing in and out."""
+    level = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frames) / frames)
+    return level[:, None, None] * np.asarray(color)[None, None, :] * np.ones((1, LED_COUNT, 1))
+
+
+def rainbow(frames=20, brightness=64):
+    """Hue wheel across the LEDs, rotating."""
+    hue = (np.arange(frames)[:, None] / frames + np.arange(LED_COUNT)[None, :] / LED_COUNT) % 1.0
+    phase = hue[..., None] * 3.0 - np.array([0.0, 1.0, 2.0])
+    phase = (phase + 1.5) % 3.0 - 1.5
+    return brightness * np.clip(1.0 - np.abs(phase), 0.0, 1.0)
+
+
+def upload_line(name, frames, fps=10, loop=True, start=True):
+    """{"anim":..} command line for frames of shape (n, 10, 3), values 0..255."""
+    frames = np.clip(np.rint(frames), 0, 255).astype(np.uint8)
+    if frames.ndim != 3 or frames.shape[1:] != (LED_COUNT, 3):
+        raise ValueError(f"frames must have shape (n, {LED_COUNT}, 3), got {frames.shape}")
+    if len(frames) > MAX_FRAMES:
+        raise ValueError(f"{len(frames)} frames do not fit in one line (max {MAX_FRAMES})")
+    msg = {"anim": name, "fps": fps, "loop": loop, "start": start,
+           "frames": base64.b64encode(frames.tobytes()).decode("ascii")}
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+def play_line(name, **params):
+    return (json.dumps(dict(play=name, **params), separators=(",", ":")) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload or start LED animations on the robot")
+    parser.add_argument("animation", choices=["chase", "pulse", "rainbow", "blink", "battery", "id", "off"])
+    parser.add_argument("--serial", default="/dev/ttyAMA10")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--color", type=int, nargs=3, default=[0, 0, 255], metavar=("R", "G", "B"))
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--code", type=int, default=1, help="blink count for 'blink'")
+    parser.add_argument("--percent", type=int, default=100, help="level for 'battery'")
+    parser.add_argument("--id", type=int, default=0, help="robot id for 'id'")
+    args = parser.parse_args()
+
+    if args.animation == "chase":
+        line = upload_line("chase", chase(args.color), args.fps)
+    elif args.animation == "pulse":
+        line = upload_line("pulse", pulse(args.color), args.fps)
+    elif args.animation == "rainbow":
+        line = upload_line("rainbow", rainbow(), args.fps)
+    elif args.animation == "blink":
+        line = play_line("blink", code=args.code, color=args.color)
+    elif args.animation == "battery":
+        line = play_line("battery", percent=args.percent)
+    elif args.animation == "id":
+        line = play_line("id", id=args.id)
+    else:
+        line = play_line("off")
+
+    ser = serial.Serial(args.serial, args.baudrate, timeout=0.2)
+    try:
+        ser.write(line)
+        print(f"Sent {len(line)} bytes")
+        # Errors come back as a text line; wait briefly for one.
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            reply = ser.readline().strip()
+            if reply and not reply.startswith(b"{"):
+                print("Robot:", reply.decode(errors="replace"))
+    finally:
+        ser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""
+Replay recorded robot UART traffic into a pseudo-terminal.
+
+The replay opens a pty and prints its device name (e.g. /dev/pts/5). Point
+any of the Pi-side apps at that name instead of /dev/ttyAMA10 and they read
+the recorded messages through the real serial.Serial code path.
+
+Sources:
+  - capture files written by `serial_replay.py record` (timestamped lines)
+  - session directories written by session_log.py (timestamps from column t)
+  - plain recorded_messages.txt logs (no timestamps, spaced by --period)
+
+Timing:
+  --speed 1     original timing (default)
+  --speed 4     four times faster
+  --speed 0     as fast as the reader consumes - use this to measure the
+                throughput limit of the parsing/plotting pipeline
+
+Usage:
+    python3 serial_replay.py record --port /dev/ttyAMA10 --out run.cap
+    python3 serial_replay.py play run.cap --speed 2 --loop
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+import tty
+
+# Telemetry fields re-encoded when replaying a session, in firmware key order.
+SESSION_KEYS = ["X", "Y", "Theta", "vL", "vR", "battery"]
+
+
+def load_capture(path):
+    """Read a capture file: one `<seconds>\\t<line>` record per line."""
+    records = []
+    with open(path, errors="ignore") as f:
+        for row in f:
+            stamp, sep, line = row.rstrip("\n").partition("\t")
+            if not sep:
+                continue
+            records.append((float(stamp), (line + "\n").encode("ascii", errors="ignore")))
+    return records
+
+
+def load_text_log(path, period=0.01):
+    """Read a recorded_messages.txt log, spacing the lines `period` seconds apart."""
+    records = []
+    with open(path, errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append((len(records) * period, (line + "\n").encode("ascii", errors="ignore")))
+    return records
+
+
+def load_session_records(path):
+    """Re-encode a session's telemetry columns as firmware-style JSON lines."""
+    from session_log import load_session
+
+    session = load_session(path)
+    keys = [k for k in SESSION_KEYS if k in session]
+    columns = [session[k] for k in keys]
+    t = session["t"]
+    t0 = float(t[0]) if len(t) else 0.0
+    records = []
+    for i in range(len(t)):
+        msg = {}
+        for key, column in zip(keys, columns):
+            value = float(column[i])
+            if not math.isnan(value):
+                msg[key] = round(value, 2)
+        if msg:
+            line = json.dumps(msg, separators=(",", ":")) + "\n"
+            records.append((float(t[i]) - t0, line.encode("ascii")))
+    return records
+
+
+def load_records(path, period=0.01):
+    if os.path.isdir(path):
+        return load_session_records(path)
+    with open(path, errors="ignore") as f:
+        first = f.readline()
+    if "\t" in first:
+        return load_capture(path)
+    return load_text_log(path, period)
+
+
+class SerialReplay:
+    def __init__(self, records, speed=1.0, loop=False, echo_commands=False):
+        """
+        records: list of (time_s, raw_bytes) in playback order.
+        speed: playback speed factor, 0 for as fast as possible.
+        """
+        self.records = records
+        self.speed = speed
+        self.loop = loop
+        self.echo_commands = echo_commands
+
+        # Open the pty. The slave end behaves like a raw serial device.
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port_name = os.ttyname(self.slave_fd)
+
+        self.closing_event = threading.Event()
+        self.drain_thread = threading.Thread(target=self.drain_commands, daemon=True)
+
+        # Statistics
+        self.lines_sent = 0
+        self.bytes_sent = 0
+        self.commands_received = 0
+        self.max_lag = 0.0
+
+    def drain_commands(self):
+        """Read whatever the app writes back (commands) so it never blocks."""
+        buffer = b""
+        while not self.closing_event.is_set():
+            try:
+                data = os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                self.commands_received += 1
+                if self.echo_commands:
+                    print("Command:", line.decode("ascii", errors="replace").strip())
+
+    def run(self):
+        """Play the records. Returns the elapsed wall-clock time in seconds."""
+        self.drain_thread.start()
+        start = time.perf_counter()
+        try:
+            while True:
+                self.play_once()
+                if not self.loop or self.closing_event.is_set():
+                    break
+        finally:
+            elapsed = time.perf_counter() - start
+        return elapsed
+
+    def play_once(self):
+        if not self.records:
+            return
+        t0 = self.records[0][0]
+        start = time.perf_counter()
+        for stamp, data in self.records:
+            if self.closing_event.is_set():
+                return
+            if self.speed > 0:
+                # Schedule against the absolute start time so sleeps don't accumulate drift.
+                due = start + (stamp - t0) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+            os.write(self.master_fd, data)
+            self.lines_sent += 1
+            self.bytes_sent += len(data)
+
+    def close(self):
+        self.closing_event.set()
+        os.close(self.slave_fd)
+        os.close(self.master_fd)
+
+
+def record(port, out_path, baudrate=115200):
+    """Capture lines from a real serial port with host receive timestamps."""
+    import serial
+
+    ser = serial.Serial(port, baudrate, timeout=0.1)
+    print(f"Recording {port} to {out_path} (Ctrl+C to stop)")
+    count = 0
+    start = time.time()
+    try:
+        with open(out_path, "w") as f:
+            while True:
+                line = ser.readline()
+                if not line:
+                    continue
+                text = line.decode("ascii", errors="ignore").strip()
+                if text:
+                    f.write(f"{time.time() - start:.6f}\t{text}\n")
+                    count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+    print(f"Recorded {count} lines")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ZumoPi UART traffic into a pty")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="capture a serial port with timestamps")
+    rec.add_argument("--port", default="/dev/ttyAMA10")
+    rec.add_argument("--baudrate", type=int, default=115200)
+    rec.add_argument("--out", required=True)
+
+    play = sub.add_parser("play", help="replay a capture, session or text log into a pty")
+    play.add_argument("source", help="capture file, session directory or recorded_messages.txt")
+    play.add_argument("--speed", type=float, default=1.0, help="speed factor, 0 = max speed")
+    play.add_argument("--period", type=float, default=0.01,
+                      help="line spacing in seconds for logs without timestamps")
+    play.add_argument("--loop", action="store_true", help="restart at the end of the recording")
+    play.add_argument("--echo-commands", action="store_true", help="print commands sent by the app")
+    play.add_argument("--wait", type=float, default=3.0,
+                      help="seconds to wait before playback so the app can open the port")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.port, args.out, args.baudrate)
+        return
+
+    records = load_records(args.source, args.period)
+    replay = SerialReplay(records, speed=args.speed, loop=args.loop,
+                          echo_commands=args.echo_commands)
+    print(f"Loaded {len(records)} lines. Serial port: {replay.port_name}")
+    time.sleep(args.wait)
+
+    elapsed = 0.0
+    try:
+        elapsed = replay.run()
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        replay.close()
+
+    if elapsed > 0:
+        print(f"Sent {replay.lines_sent} lines / {replay.bytes_sent} bytes in {elapsed:.2f} s "
+              f"({replay.lines_sent / elapsed:.0f} lines/s, {replay.bytes_sent / elapsed / 1024:.1f} KiB/s)")
+    print(f"Max scheduling lag: {replay.max_lag * 1000:.1f} ms, commands received: {replay.commands_received}")
+
+
+if __name__ == "__main__":
+    main()
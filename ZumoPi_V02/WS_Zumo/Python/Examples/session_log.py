@@ -0,0 +1,284 @@
+#!/usr/bin/python3
+"""
+Columnar session files for robot runs.
+
+A session is a directory holding one NumPy column per telemetry field plus a
+JSON metadata header:
+
+    run_2025_03_01/
+        meta.json           robot id, firmware, controller gains, field dtypes
+        t.npy               host receive time (s)
+        X.npy, Y.npy, ...   one column per field
+
+While recording, samples are collected in preallocated buffers and flushed
+every `chunk_size` samples into `<field>/<chunk>.npy` files, so a crashed run
+can still be loaded. close() merges the chunks into one contiguous column per
+field, which load_session() memory-maps - opening an hour-long run is instant
+and only the slices you touch are read from disk.
+
+Usage:
+    python3 session_log.py convert recorded_messages.txt run_dir --robot-id zumo01
+    python3 session_log.py info run_dir
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+FORMAT_NAME = "zumo-session"
+FORMAT_VERSION = 1
+
+# Field name -> dtype. 't' is always present and is the host timestamp.
+DEFAULT_FIELDS = {
+    "t": "float64",
+    "X": "float32",        # mm
+    "Y": "float32",        # mm
+    "Theta": "float32",    # deg
+    "vL": "float32",       # mm/s, measured
+    "vR": "float32",       # mm/s, measured
+    "vl_cmd": "float32",   # mm/s, commanded
+    "vr_cmd": "float32",   # mm/s, commanded
+    "battery": "float32",  # V
+}
+
+# Message keys used by the different firmware examples, mapped to field names.
+MESSAGE_KEYS = {
+    "X": "X", "x": "X",
+    "Y": "Y", "y": "Y",
+    "Theta": "Theta", "theta": "Theta",
+    "vL": "vL", "vR": "vR",
+    "vl": "vl_cmd", "vr": "vr_cmd",
+    "battery": "battery", "Battery": "battery",
+}
+
+
+class SessionWriter:
+    def __init__(self, path, fields=None, chunk_size=4096, **metadata):
+        """
+        Create a new session directory at `path`.
+
+        Extra keyword arguments (robot_id, firmware, gains, ...) are stored in
+        the metadata header as-is and must be JSON serialisable.
+        """
+        self.path = path
+        self.fields = dict(fields or DEFAULT_FIELDS)
+        self.fields.setdefault("t", "float64")
+        self.chunk_size = chunk_size
+
+        os.makedirs(path, exist_ok=False)
+        for name in self.fields:
+            os.makedirs(os.path.join(path, name))
+
+        # Preallocated chunk buffers, one per field. Missing values stay NaN.
+        self._buffers = {name: np.full(chunk_size, np.nan, dtype=dtype)
+                         for name, dtype in self.fields.items()}
+        self._fill = 0
+        self._chunk_lengths = []
+        self.closed = False
+
+        self.meta = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "fields": self.fields,
+            "chunks": self._chunk_lengths,
+            "consolidated": False,
+            **metadata,
+        }
+        self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return sum(self._chunk_lengths) + self._fill
+
+    def append(self, t=None, **values):
+        """
+        Append one sample. Fields not given are stored as NaN. Raises
+        ValueError or TypeError for a non-numeric value (KeyError for an
+        unknown field), leaving the buffer unchanged.
+        """
+        # Convert everything before writing, so a bad value cannot leave a
+        # half-written row behind for the next sample.
+        row = [(self._buffers["t"], float(time.time() if t is None else t))]
+        for name, value in values.items():
+            if value is not None:
+                row.append((self._buffers[name], float(value)))
+        i = self._fill
+        for buf, value in row:
+            buf[i] = value
+        self._fill += 1
+        if self._fill == self.chunk_size:
+            self.flush()
+
+    def append_message(self, msg, t=None):
+        """Append a decoded robot JSON message, mapping its keys to fields."""
+        values = {}
+        for key, value in msg.items():
+            name = MESSAGE_KEYS.get(key, key)
+            if name in self.fields and name != "t":
+                values[name] = value
+        self.append(t, **values)
+
+    def flush(self):
+        """Write the buffered samples as a new chunk and update the header."""
+        n = self._fill
+        if n == 0:
+            return
+        chunk = len(self._chunk_lengths)
+        for name, buf in self._buffers.items():
+            np.save(os.path.join(self.path, name, f"{chunk:06d}.npy"), buf[:n])
+            buf.fill(np.nan)
+        self._chunk_lengths.append(n)
+        self._fill = 0
+        self._write_meta()
+
+    def close(self):
+        """Flush, then merge all chunks into one contiguous column per field."""
+        if self.closed:
+            return
+        self.flush()
+        total = sum(self._chunk_lengths)
+        for name, dtype in self.fields.items():
+            column = np.lib.format.open_memmap(os.path.join(self.path, name + ".npy"),
+                                               mode="w+", dtype=dtype, shape=(total,))
+            start = 0
+            for chunk, n in enumerate(self._chunk_lengths):
+                column[start:start + n] = np.load(os.path.join(self.path, name, f"{chunk:06d}.npy"))
+                start += n
+            column.flush()
+            del column
+            shutil.rmtree(os.path.join(self.path, name))
+        self.meta["consolidated"] = True
+        self.meta["length"] = total
+        self._write_meta()
+        self.closed = True
+
+    def _write_meta(self):
+        # Write-then-rename so the header is never seen half written.
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+
+class Session:
+    """A loaded session: `meta` header plus read-only columns by field name."""
+
+    def __init__(self, path, meta, columns):
+        self.path = path
+        self.meta = meta
+        self.columns = columns
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __len__(self):
+        return len(self.columns["t"])
+
+    @property
+    def fields(self):
+        return list(self.columns)
+
+    def as_array(self, names):
+        """Stack the given fields into an (N, len(names)) float array."""
+        return np.column_stack([np.asarray(self.columns[n], dtype=float) for n in names])
+
+
+def load_session(path, mmap=True):
+    """
+    Load a session directory.
+
+    Consolidated sessions are memory-mapped. Sessions whose writer did not get
+    to close() (e.g. the app crashed) are assembled from their chunk files.
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} directory")
+
+    mode = "r" if mmap else None
+    columns = {}
+    for name in meta["fields"]:
+        column_file = os.path.join(path, name + ".npy")
+        if meta.get("consolidated") and os.path.exists(column_file):
+            columns[name] = np.load(column_file, mmap_mode=mode)
+        else:
+            parts = [np.load(os.path.join(path, name, f"{chunk:06d}.npy"))
+                     for chunk in range(len(meta["chunks"]))]
+            columns[name] = (np.concatenate(parts) if parts
+                             else np.empty(0, dtype=meta["fields"][name]))
+    return Session(path, meta, columns)
+
+
+def convert_text_log(text_path, session_path, period=0.01, **metadata):
+    """
+    Convert a recorded_messages.txt style log (one JSON message per line) into
+    a session. The text log has no timestamps, so samples are spaced `period`
+    seconds apart. Lines that are not valid JSON are skipped.
+    """
+    with SessionWriter(session_path, source=os.path.basename(text_path),
+                       **metadata) as writer:
+        n = 0
+        with open(text_path, errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(msg, dict):
+                    writer.append_message(msg, t=n * period)
+                    n += 1
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar session files for ZumoPi runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="convert a JSON-lines text log into a session")
+    conv.add_argument("text_log")
+    conv.add_argument("session_dir")
+    conv.add_argument("--period", type=float, default=0.01,
+                      help="sample spacing in seconds (text logs carry no timestamps)")
+    conv.add_argument("--robot-id", default=None)
+    conv.add_argument("--firmware", default=None)
+
+    info = sub.add_parser("info", help="print a session's header and field summary")
+    info.add_argument("session_dir")
+
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        n = convert_text_log(args.text_log, args.session_dir, period=args.period,
+                             robot_id=args.robot_id, firmware=args.firmware)
+        print(f"Wrote {n} samples to {args.session_dir}")
+    else:
+        session = load_session(args.session_dir)
+        header = {k: v for k, v in session.meta.items() if k not in ("fields", "chunks")}
+        print(json.dumps(header, indent=2))
+        print(f"{len(session)} samples")
+        for name in session.fields:
+            column = np.asarray(session[name], dtype=float)
+            valid = column[~np.isnan(column)]
+            if len(valid):
+                print(f"  {name:8s} min {valid.min():12.3f}  max {valid.max():12.3f}  ({len(valid)} valid)")
+            else:
+                print(f"  {name:8s} (no data)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+"""
+Decoder for the batched binary telemetry of MicroPython/lib/telemetry.py.
+
+The robot sends frames of `count` fixed-size samples behind a 0xA5 0x5A
+sync word, with a frame counter and a checksum (layout in telemetry.py).
+FrameDecoder takes whatever bytes the serial port returned, finds frames,
+checks them and decodes each frame's samples in one np.frombuffer call.
+
+  - a corrupted or truncated frame is dropped and the decoder resyncs on
+    the next sync word; frames missing from the sequence are counted
+  - bytes between frames that form text lines (print() output, REPL
+    messages) are returned separately instead of being lost
+  - robot timestamps are unwrapped from utime.ticks_us() (which wraps at
+    2**30 on the RP2040, ~17.9 min) to seconds since the first sample
+
+Usage:
+    python3 telemetry_frames.py --serial /dev/ttyAMA10
+    python3 telemetry_frames.py --serial /dev/ttyAMA10 --session run_dir --seconds 60
+"""
+import argparse
+import struct
+import time
+
+import numpy as np
+import serial
+
+SYNC = b"\xa5\x5a"
+HEADER = struct.Struct("<2sBH")
+RECORD_DTYPE = np.dtype([("t_us", "<u4"), ("left", "<i4"), ("right", "<i4"),
+                         ("gyro_z", "<i2"), ("acc_x", "<i2"), ("acc_y", "<i2")])
+TICKS_PERIOD = 1 << 30  # utime.ticks_us() wraps at TICKS_MAX + 1 on the RP2040
+MAX_TEXT = 1024     # bytes of unterminated text kept while waiting for a newline
+SESSION_FIELDS = {"t_robot": "float64", "left": "float64", "right": "float64",
+                  "gyro_z": "float32", "acc_x": "float32", "acc_y": "float32"}
+
+
+def encode_frame(seq, records):
+    """Frame bytes for a RECORD_DTYPE array, exactly as the robot builds them."""
+    body = HEADER.pack(SYNC, len(records), seq & 0xFFFF)[2:] + np.asarray(records, RECORD_DTYPE).tobytes()
+    return SYNC + body + bytes([sum(body) & 0xFF])
+
+
+class FrameDecoder:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.expected_seq = None
+        self.frames = 0
+        self.lost_frames = 0
+        self.bad_frames = 0
+        self.t_last = None
+        self.t_elapsed = 0
+
+    def feed(self, data):
+        """
+        Add received bytes. Returns (samples, lines): a structured array with
+        the RECORD_DTYPE fields plus "t" (s, robot clock), and any text lines.
+        """
+        self.buffer += data
+        chunks = []
+        lines = []
+        buf = self.buffer
+        pos = 0
+        resync = False
+        while True:
+            start = buf.find(SYNC, pos)
+            if resync:
+                # Rest of a rejected frame: binary, not text.
+                if start < 0:
+                    pos = max(len(buf) - 1, pos)
+                    break
+                pos = start
+                resync = False
+            if start < 0:
+                # No frame start yet: hand out complete text lines, keep the
+                # rest (and a 0xA5 that may be the first half of a sync word).
+                newline = buf.rfind(b"\n", pos)
+                if newline >= 0:
+                    self._text(buf[pos:newline + 1], lines)
+                    pos = newline + 1
+                if len(buf) - pos > MAX_TEXT:
+                    pos = len(buf) - 1
+                break
+            self._text(buf[pos:start], lines)
+            if len(buf) - start < HEADER.size:
+                pos = start
+                break
+            _, count, seq = HEADER.unpack_from(buf, start)
+            end = start + HEADER.size + count * RECORD_DTYPE.itemsize
+            if len(buf) < end + 1:
+                pos = start
+                break
+            if count == 0 or (sum(buf[start + 2:end]) & 0xFF) != buf[end]:
+                self.bad_frames += 1
+                pos = start + 1
+                resync = True
+                continue
+            chunks.append(np.frombuffer(bytes(buf[start + HEADER.size:end]), RECORD_DTYPE))
+            self._sequence(seq)
+            pos = end + 1
+        del buf[:pos]
+        records = np.concatenate(chunks) if chunks else np.zeros(0, RECORD_DTYPE)
+        return self._with_time(records), lines
+
+    @staticmethod
+    def _text(data, lines):
+        for line in bytes(data).split(b"\n"):
+            text = line.decode("ascii", errors="replace").strip()
+            if text:
+                lines.append(text)
+
+    def _sequence(self, seq):
+        if self.expected_seq is not None:
+            self.lost_frames += (seq - self.expected_seq) & 0xFFFF
+        self.expected_seq = (seq + 1) & 0xFFFF
+        self.frames += 1
+
+    def _with_time(self, records):
+        out = np.zeros(len(records), RECORD_DTYPE.descr + [("t", "<f8")])
+        for name in RECORD_DTYPE.names:
+            out[name] = records[name]
+        if len(records):
+            t_us = records["t_us"].astype(np.int64)
+            prev = np.concatenate([[self.t_last if self.t_last is not None else t_us[0]], t_us[:-1]])
+            # Same as utime.ticks_diff(): consecutive samples are far less than a period apart.
+            elapsed = self.t_elapsed + np.cumsum((t_us - prev) % TICKS_PERIOD)
+            out["t"] = elapsed * 1e-6
+            self.t_elapsed = int(elapsed[-1])
+            self.t_last = int(t_us[-1])
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode batched telemetry frames from the robot")
+    parser.add_argument("--serial", default="/dev/ttyAMA10")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--session", default=None, help="record samples to a session_log.py directory")
+    parser.add_argument("--seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    ser = serial.Serial(args.serial, args.baudrate, timeout=0.05)
+    decoder = FrameDecoder()
+    writer = None
+    if args.session:
+        from session_log import SessionWriter
+        writer = SessionWriter(args.session, fields=SESSION_FIELDS, source="telemetry_frames")
+    start = time.monotonic()
+    report = start + 1.0
+    samples = 0
+    try:
+        while args.seconds is None or time.monotonic() - start < args.seconds:
+            records, lines = decoder.feed(ser.read(max(ser.in_waiting, 1)))
+            for line in lines:
+                print(f"robot: {line}")
+            samples += len(records)
+            if writer is not None:
+                now = time.time()
+                for r in records:
+                    writer.append(now, t_robot=r["t"], left=r["left"], right=r["right"],
+                                  gyro_z=r["gyro_z"] / 10.0, acc_x=r["acc_x"], acc_y=r["acc_y"])
+            now = time.monotonic()
+            if now >= report:
+                last = f"  enc {records['left'][-1]} {records['right'][-1]}" if len(records) else ""
+                print(f"{samples / (now - report + 1.0):6.1f} samples/s  frames {decoder.frames}  "
+                      f"lost {decoder.lost_frames}  bad {decoder.bad_frames}{last}")
+                samples = 0
+                report = now + 1.0
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+        if writer is not None:
+            writer.close()
+
+
+if __name__ == "__main__":
+    main()
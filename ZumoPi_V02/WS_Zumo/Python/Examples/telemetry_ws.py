@@ -0,0 +1,268 @@
+#!/usr/bin/python3
+"""
+WebSocket telemetry fan-out for many dashboard clients.
+
+One producer reads telemetry (a robot's UART, or the fleet_gateway.py stream
+for a whole fleet) and parses each line once. Every WebSocket subscriber
+then gets pushed only what changed since its last message. Nothing is
+polled and no figure is rebuilt on the Pi per browser tab.
+
+Backpressure is "drop to latest": the hub keeps only the newest sample per
+robot. A client's sender wakes up when something changes and sends the
+newest sample of every robot it has not seen yet. A slow client therefore
+skips intermediate samples instead of building a backlog, and --max-rate
+caps how often any client is sent to.
+
+Wire format (ws://pi:8765/ by default, ws://pi:8765/json for JSON):
+
+  - text message whenever the robot list changes:
+        {"robots":["robot0","zumo02"],"fields":["X","Y","Theta","vL","vR"]}
+  - binary frames, little endian: uint16 count, then `count` records of
+        uint16 robot index, float64 t, float32 X, Y, Theta, vL, vR
+    (30 bytes per robot instead of ~75 for the JSON line). In JavaScript:
+        const v = new DataView(ev.data); let n = v.getUint16(0, true);
+        for (let i = 0, o = 2; i < n; i++, o += 30) {
+            robot = v.getUint16(o, true); t = v.getFloat64(o + 2, true);
+            x = v.getFloat32(o + 10, true); ...
+        }
+  - JSON mode sends {"robot":..,"t":..,"X":..,...} objects in a list instead
+
+Usage:
+    python3 telemetry_ws.py serve --serial /dev/ttyAMA10
+    python3 telemetry_ws.py serve --gateway 127.0.0.1:9000 --max-rate 30
+    python3 telemetry_ws.py watch ws://raspberrypi:8765/
+"""
+import argparse
+import asyncio
+import json
+import struct
+import time
+
+import websockets
+
+from fleet_gateway import RobotLink
+
+FIELDS = ("X", "Y", "Theta", "vL", "vR")
+# V02 Teleoperate sends x/y/theta, the other firmware X/Y/Theta.
+ALIASES = {"X": "x", "Y": "y", "Theta": "theta"}
+COUNT = struct.Struct("<H")
+RECORD = struct.Struct("<Hd5f")
+
+
+def telemetry_values(msg):
+    """
+    FIELDS values of a telemetry message, or None if msg is not telemetry.
+    Missing or non-numeric fields read as 0.0.
+    """
+    if not isinstance(msg, dict) or ("X" not in msg and "x" not in msg):
+        return None
+    values = []
+    for k in FIELDS:
+        value = msg.get(k, msg.get(ALIASES.get(k)))
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            values.append(0.0)
+    return tuple(values)
+
+
+class TelemetryHub:
+    """Latest sample per robot plus the per-client bookkeeping to send deltas."""
+
+    def __init__(self, max_rate=None):
+        self.max_rate = max_rate
+        self.robots = []           # index -> robot id
+        self.index = {}            # robot id -> index
+        self.latest = []           # index -> (t, values)
+        self.seq = []              # index -> update counter
+        self.clients = set()
+
+    def publish(self, robot, t, values):
+        """Store a sample; values are the FIELDS, as from telemetry_values()."""
+        i = self.index.get(robot)
+        if i is None:
+            i = len(self.robots)
+            self.index[robot] = i
+            self.robots.append(robot)
+            self.latest.append(None)
+            self.seq.append(0)
+        self.latest[i] = (t, values)
+        self.seq[i] += 1
+        for client in self.clients:
+            client.wake.set()
+
+    def robot_list(self):
+        return json.dumps({"robots": self.robots, "fields": FIELDS}, separators=(",", ":"))
+
+    def encode(self, indices, binary):
+        if binary:
+            parts = [COUNT.pack(len(indices))]
+            for i in indices:
+                t, values = self.latest[i]
+                parts.append(RECORD.pack(i, t, *values))
+            return b"".join(parts)
+        out = []
+        for i in indices:
+            t, values = self.latest[i]
+            out.append(dict(zip(FIELDS, values), robot=self.robots[i], t=t))
+        return json.dumps(out, separators=(",", ":"))
+
+
+class Client:
+    def __init__(self, websocket, binary):
+        self.websocket = websocket
+        self.binary = binary
+        self.wake = asyncio.Event()
+        self.sent_seq = []
+        self.known_robots = 0
+
+
+async def handle_client(hub, websocket):
+    request = getattr(websocket, "request", None)
+    path = request.path if request is not None else getattr(websocket, "path", "/")
+    client = Client(websocket, binary=not path.rstrip("/").endswith("json"))
+    hub.clients.add(client)
+    client.wake.set()
+    try:
+        while True:
+            await client.wake.wait()
+            client.wake.clear()
+            if client.known_robots != len(hub.robots):
+                client.known_robots = len(hub.robots)
+                client.sent_seq += [0] * (client.known_robots - len(client.sent_seq))
+                await websocket.send(hub.robot_list())
+            changed = [i for i, seq in enumerate(hub.seq) if seq != client.sent_seq[i]]
+            if changed:
+                for i in changed:
+                    client.sent_seq[i] = hub.seq[i]
+                # Samples arriving while this send is in flight just replace
+                # hub.latest, so the next send carries only the newest ones.
+                await websocket.send(hub.encode(changed, client.binary))
+            if hub.max_rate:
+                await asyncio.sleep(1.0 / hub.max_rate)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        hub.clients.discard(client)
+
+
+async def read_serial(hub, port, baudrate):
+    link = RobotLink("robot0", port, baudrate)
+    reader, _ = await link.open()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                msg = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            values = telemetry_values(msg)
+            if values is not None:
+                hub.publish(link.robot_id, time.time(), values)
+    finally:
+        link.close()
+
+
+async def read_gateway(hub, address):
+    host, _, port = address.rpartition(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                frame = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(frame, dict):
+                continue
+            values = telemetry_values(frame.get("msg"))
+            t = frame.get("t")
+            if not isinstance(t, (int, float)):
+                t = time.time()
+            if values is not None:
+                hub.publish(frame.get("robot"), float(t), values)
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    hub = TelemetryHub(args.max_rate)
+    if args.gateway:
+        producer = read_gateway(hub, args.gateway)
+    else:
+        producer = read_serial(hub, args.serial, args.baudrate)
+    async with websockets.serve(lambda ws, *_: handle_client(hub, ws), args.host, args.port,
+                                compression=None):
+        print(f"Telemetry on ws://{args.host}:{args.port}/ (binary) and /json")
+        await producer
+    print("Telemetry source closed")
+
+
+async def watch(url, seconds):
+    """Minimal subscriber: decodes the stream and prints rates once a second."""
+    robots = []
+    counts = {}
+    latest = {}
+    start = time.monotonic()
+    report = start + 1.0
+    async with websockets.connect(url, compression=None) as ws:
+        async for message in ws:
+            if isinstance(message, str):
+                data = json.loads(message)
+                if isinstance(data, dict):
+                    robots = data["robots"]
+                    continue
+                for sample in data:
+                    counts[sample["robot"]] = counts.get(sample["robot"], 0) + 1
+                    latest[sample["robot"]] = (sample["X"], sample["Y"], sample["Theta"])
+            else:
+                (n,) = COUNT.unpack_from(message)
+                for k in range(n):
+                    i, t, x, y, theta, _, _ = RECORD.unpack_from(message, COUNT.size + k * RECORD.size)
+                    counts[robots[i]] = counts.get(robots[i], 0) + 1
+                    latest[robots[i]] = (x, y, theta)
+            now = time.monotonic()
+            if now >= report:
+                for robot in sorted(counts):
+                    x, y, theta = latest[robot]
+                    print(f"{robot}: {counts[robot]:4d} samples/s  X {x:8.1f}  Y {y:8.1f}  Theta {theta:7.1f}")
+                counts = {}
+                report = now + 1.0
+            if seconds and now - start > seconds:
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket telemetry fan-out")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    srv = sub.add_parser("serve", help="read telemetry and serve it to WebSocket clients")
+    source = srv.add_mutually_exclusive_group()
+    source.add_argument("--serial", default="/dev/ttyAMA10", help="robot UART (single robot)")
+    source.add_argument("--gateway", default=None, help="fleet_gateway.py host:port (whole fleet)")
+    srv.add_argument("--baudrate", type=int, default=115200)
+    srv.add_argument("--host", default="0.0.0.0")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--max-rate", type=float, default=None,
+                     help="cap messages per second to each client (default: as fast as data arrives)")
+
+    w = sub.add_parser("watch", help="subscribe and print per-robot rates")
+    w.add_argument("url", nargs="?", default="ws://127.0.0.1:8765/")
+    w.add_argument("--seconds", type=float, default=None)
+
+    args = parser.parse_args()
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args))
+        else:
+            asyncio.run(watch(args.url, args.seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+UART command latency test.
+
+Sends {"ping":seq} lines and times the echo that the robot's receive loop
+sends back (MicroPython commandReceiver.py, or zumo_simulator.py). The
+round trip is the time a motor command waits before the robot acts on it,
+plus the time the echo takes to come back, so it shows directly what the
+receive loop adds on top of the wire time (about 1 ms per 10 bytes each
+way at 115200 baud, printed for reference).
+
+Telemetry and other lines arriving in between are skipped.
+
+Usage:
+    python3 zumo_simulator.py --rx-poll 0.1      # poll-and-sleep receive loop
+    python3 zumo_simulator.py                    # receive as bytes arrive
+    python3 uart_latency.py --serial /dev/pts/3 --count 200
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import serial
+
+
+def measure(ser, count=100, interval=0.02, timeout=1.0):
+    """Round-trip times in seconds (NaN for lost pings)."""
+    rtts = np.full(count, np.nan)
+    ser.reset_input_buffer()
+    for seq in range(count):
+        line = b'{"ping":%d}\n' % seq
+        start = time.perf_counter()
+        ser.write(line)
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            reply = ser.readline()
+            if not reply.startswith(b'{"ping"'):
+                continue
+            try:
+                if json.loads(reply)["ping"] == seq:
+                    rtts[seq] = time.perf_counter() - start
+                    break
+            except (ValueError, KeyError):
+                continue
+        # Random phase against the robot's loop, so a polling period shows as spread.
+        time.sleep(interval * np.random.uniform(0.5, 1.5))
+    return rtts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure command round trips over the UART")
+    parser.add_argument("--serial", default="/dev/ttyAMA10")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.02, help="mean time between pings, s")
+    args = parser.parse_args()
+
+    ser = serial.Serial(args.serial, args.baudrate, timeout=0.05)
+    try:
+        rtts = measure(ser, args.count, args.interval) * 1000.0
+    finally:
+        ser.close()
+    ok = rtts[np.isfinite(rtts)]
+    wire = 2 * len(b'{"ping":100}\n') * 10 / args.baudrate * 1000.0
+    if not len(ok):
+        print(f"No replies to {args.count} pings")
+        return
+    print(f"{len(ok)}/{args.count} replies: round trip median {np.median(ok):.2f} ms, "
+          f"p95 {np.percentile(ok, 95):.2f} ms, max {ok.max():.2f} ms (wire time {wire:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
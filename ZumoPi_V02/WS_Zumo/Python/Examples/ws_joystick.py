@@ -0,0 +1,257 @@
+#!/usr/bin/python3
+"""
+Low-latency joystick over WebSocket.
+
+In Joystick.py a stick movement travels browser -> Dash HTTP callback ->
+ZumoApp.update_joystick -> (up to 100 ms later) transmit_data -> UART. Here
+the page's joystick sends {"x":..,"y":..} over a WebSocket at input rate and
+the server mixes and writes the wheel command to the UART as soon as it
+arrives, so stick-to-wheel latency is a few milliseconds.
+
+Safety: the page repeats the current stick position every 100 ms while it is
+held. If nothing arrives for --deadman seconds (tab closed, Wi-Fi lost), or
+the socket of the client that sent the last command (or of the last client)
+closes, the robot is sent a stop command.
+
+Latency: with "measure" ticked on the page (or `ws_joystick.py measure`),
+each message carries a client timestamp. The server answers once the
+command has been handed to the serial port, and the page shows the round
+trip and the server's share of it.
+
+Usage:
+    python3 ws_joystick.py serve --serial /dev/ttyAMA10     # then open http://<pi>:8500/
+    python3 ws_joystick.py measure ws://raspberrypi:8766/ --count 500
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import websockets
+
+from drive_mixing import DriveMixer, MAX_SPEED
+from fleet_gateway import RobotLink
+
+STOP = b'{"vl":0,"vr":0}\n'
+RESEND_PERIOD = 0.5     # s, repeat an unchanged command (firmware times out after 1 s)
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta name="viewport" content="width=device-width, user-scalable=no">
+<title>Zumo Joystick</title>
+<style>
+ body { font-family: sans-serif; text-align: center; touch-action: none; }
+ #pad { width: 280px; height: 280px; border-radius: 50%; background: #ddd;
+        margin: 20px auto; position: relative; }
+ #knob { width: 80px; height: 80px; border-radius: 50%; background: #1f77b4;
+         position: absolute; left: 100px; top: 100px; }
+</style></head>
+<body>
+<h3>Zumo Joystick</h3>
+<div id="pad"><div id="knob"></div></div>
+<div id="status">connecting...</div>
+<label><input type="checkbox" id="measure"> measure latency</label>
+<div id="latency"></div>
+<script>
+const ws = new WebSocket("ws://" + location.hostname + ":WS_PORT/");
+const pad = document.getElementById("pad"), knob = document.getElementById("knob");
+let x = 0, y = 0, held = false, seq = 0, rtts = [];
+ws.onopen = () => document.getElementById("status").textContent = "connected";
+ws.onclose = () => document.getElementById("status").textContent = "disconnected";
+ws.onmessage = (ev) => {
+  const m = JSON.parse(ev.data);
+  if (m.pong === undefined) return;
+  rtts.push(performance.now() - m.pong);
+  if (rtts.length >= 50) {
+    rtts.sort((a, b) => a - b);
+    document.getElementById("latency").textContent =
+      "round trip median " + rtts[25].toFixed(1) + " ms, max " + rtts[49].toFixed(1) +
+      " ms, server " + m.server_ms.toFixed(2) + " ms";
+    rtts = [];
+  }
+};
+function send() {
+  if (ws.readyState !== 1) return;
+  const m = {x: +x.toFixed(3), y: +y.toFixed(3), seq: seq++};
+  if (document.getElementById("measure").checked) m.ping = performance.now();
+  ws.send(JSON.stringify(m));
+}
+function move(ev) {
+  const r = pad.getBoundingClientRect(), R = r.width / 2;
+  let dx = (ev.clientX - r.left - R) / R, dy = -(ev.clientY - r.top - R) / R;
+  const d = Math.hypot(dx, dy);
+  if (d > 1) { dx /= d; dy /= d; }
+  x = dx; y = dy;
+  knob.style.left = (R - 40 + dx * R) + "px"; knob.style.top = (R - 40 - dy * R) + "px";
+  send();
+}
+pad.addEventListener("pointerdown", (ev) => { held = true; pad.setPointerCapture(ev.pointerId); move(ev); });
+pad.addEventListener("pointermove", (ev) => { if (held) move(ev); });
+pad.addEventListener("pointerup", () => {
+  held = false; x = 0; y = 0; knob.style.left = "100px"; knob.style.top = "100px"; send();
+});
+setInterval(() => { if (held) send(); }, 100);   // keep the deadman alive while held
+</script></body></html>
+"""
+
+
+class JoystickServer:
+    def __init__(self, serial_port, baudrate=115200, deadman=0.3, mixer=None):
+        self.link = RobotLink("robot0", serial_port, baudrate)
+        self.mixer = mixer or DriveMixer()
+        self.deadman = deadman
+        self.writer = None
+        self.clients = set()
+        self.driver = None      # client that sent the last command
+        self.last_input = None
+        self.last_command = None
+        self.last_write = 0.0
+        self.commands = 0
+
+    async def write(self, data):
+        now = time.monotonic()
+        if data == self.last_command and now - self.last_write < RESEND_PERIOD:
+            return
+        self.last_command = data
+        self.last_write = now
+        self.writer.write(data)
+        await self.writer.drain()
+        self.commands += 1
+
+    async def handle_client(self, websocket):
+        self.clients.add(websocket)
+        try:
+            async for message in websocket:
+                received = time.perf_counter()
+                try:
+                    msg = json.loads(message)
+                    left, right = self.mixer.mix(float(msg.get("x", 0.0)), float(msg.get("y", 0.0)))
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                self.driver = websocket
+                self.last_input = time.monotonic()
+                await self.write(b'{"vl":%.1f,"vr":%.1f}\n' % (left, right))
+                if "ping" in msg:
+                    await websocket.send(json.dumps({
+                        "pong": msg["ping"],
+                        "seq": msg.get("seq"),
+                        "server_ms": (time.perf_counter() - received) * 1000.0,
+                    }))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)
+            # Another page closing must not stop the robot under the one driving it.
+            if websocket is self.driver or not self.clients:
+                self.driver = None
+                self.last_input = None
+                await self.write(STOP)
+
+    async def watchdog(self):
+        while True:
+            await asyncio.sleep(self.deadman / 3)
+            if self.last_input is not None and time.monotonic() - self.last_input > self.deadman:
+                self.last_input = None
+                print("Deadman timeout, stopping")
+                await self.write(STOP)
+
+    async def serve(self, host, ws_port):
+        reader, self.writer = await self.link.open()
+        await self.write(STOP)
+
+        async def drain_telemetry():
+            while await reader.readline():
+                pass
+
+        tasks = [asyncio.create_task(self.watchdog()), asyncio.create_task(drain_telemetry())]
+        try:
+            async with websockets.serve(lambda ws, *_: self.handle_client(ws), host, ws_port,
+                                        compression=None):
+                await asyncio.gather(*tasks)
+        finally:
+            self.last_command = None
+            self.writer.write(STOP)
+            await self.writer.drain()
+            self.link.close()
+
+
+def serve_page(host, http_port, ws_port):
+    page = PAGE.replace("WS_PORT", str(ws_port)).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, http_port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure(url, count, rate):
+    """Send `count` stick updates at `rate` Hz and report round-trip times."""
+    rtts = []
+    server = []
+    async with websockets.connect(url, compression=None) as ws:
+        for i in range(count):
+            # Alternate between two small stick positions so every message produces a UART write.
+            start = time.perf_counter()
+            await ws.send(json.dumps({"x": 0.0, "y": 0.05 if i % 2 else 0.1, "seq": i, "ping": start}))
+            while True:
+                reply = json.loads(await ws.recv())
+                if reply.get("seq") == i:
+                    break
+            rtts.append((time.perf_counter() - start) * 1000.0)
+            server.append(reply["server_ms"])
+            await asyncio.sleep(1.0 / rate)
+        await ws.send(json.dumps({"x": 0.0, "y": 0.0}))
+    rtts.sort()
+    print(f"{count} commands: round trip median {statistics.median(rtts):.2f} ms, "
+          f"p95 {rtts[int(0.95 * (count - 1))]:.2f} ms, max {rtts[-1]:.2f} ms; "
+          f"server median {statistics.median(server):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket joystick control channel")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    srv = sub.add_parser("serve", help="serve the joystick page and control channel")
+    srv.add_argument("--serial", default="/dev/ttyAMA10")
+    srv.add_argument("--baudrate", type=int, default=115200)
+    srv.add_argument("--host", default="0.0.0.0")
+    srv.add_argument("--http-port", type=int, default=8500)
+    srv.add_argument("--ws-port", type=int, default=8766)
+    srv.add_argument("--max-speed", type=float, default=MAX_SPEED, help="mm/s at full stick")
+    srv.add_argument("--calibration", default=None, help="wheel calibration JSON (drive_mixing.py)")
+    srv.add_argument("--deadman", type=float, default=0.3, help="stop after this many seconds without input")
+
+    m = sub.add_parser("measure", help="measure command round trips")
+    m.add_argument("url", nargs="?", default="ws://127.0.0.1:8766/")
+    m.add_argument("--count", type=int, default=200)
+    m.add_argument("--rate", type=float, default=50.0, help="messages per second")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "serve":
+            serve_page(args.host, args.http_port, args.ws_port)
+            print(f"Joystick page on http://{args.host}:{args.http_port}/, "
+                  f"control channel on port {args.ws_port}")
+            mixer = DriveMixer.load(args.calibration, args.max_speed)
+            server = JoystickServer(args.serial, args.baudrate, args.deadman, mixer)
+            asyncio.run(server.serve(args.host, args.ws_port))
+        else:
+            asyncio.run(measure(args.url, args.count, args.rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+"""
+Zumo firmware simulator speaking the UART JSON protocol over a pty.
+
+Each simulated robot gets its own pseudo-terminal. Point any Pi-side app at
+the printed device name instead of /dev/ttyAMA10. The simulator mirrors the
+Teleoperate firmware:
+
+  - accepts {"vl":150,"vr":150} wheel speed commands (mm/s) with the 1 s
+    command timeout, and {"LEDNumber":3,"Color":"Red"} LED commands; a
+    {"ping":..} line is echoed back, as the MicroPython commandReceiver.py
+    does, for uart_latency.py
+  - runs the PI wheel-speed loop every 10 ms on a first-order motor model
+  - counts encoder pulses and integrates odometry the same way Odometry.cpp
+    does, using the wheel constants from ZumoController.h (or the V02 ones)
+  - sends {"X":..,"Y":..,"Theta":..,"vL":..,"vR":..} telemetry at --rate Hz,
+    capped at what the UART baud rate can actually carry
+  - --rx-poll 0.1 only looks at received bytes every 100 ms, like the
+    poll-and-sleep loop of uartExample.py, to compare receive latencies
+
+Usage:
+    python3 zumo_simulator.py --robots 3 --rate 100
+    python3 zumo_simulator.py --rx-poll 0.1
+"""
+import argparse
+import errno
+import json
+import math
+import os
+import select
+import time
+import tty
+
+# Wheel/encoder constants (mm) per platform.
+PLATFORMS = {
+    # ZumoController.h: WHEEL_DIAMETER 0.0375 m, GEAR_RATIO 100, ENCODER_PPR 12, WHEELS_DISTANCE 0.112 m
+    "v01": dict(wheel_diameter=37.5, gear_ratio=100, encoder_ppr=12, wheel_distance=112.0, free_rpm=320),
+    # Odometry odom(37.5, 75, 12, 98) in the V02 examples
+    "v02": dict(wheel_diameter=37.5, gear_ratio=75, encoder_ppr=12, wheel_distance=98.0, free_rpm=650),
+}
+
+LED_COUNT = 10
+LED_COLORS = {
+    "red": (255, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+    "white": (255, 255, 255),
+    "off": (0, 0, 0),
+    "black": (0, 0, 0),
+}
+
+CONTROL_PERIOD = 0.01    # s, controlTask() runs every 10 ms
+COMMAND_TIMEOUT = 1.0    # s, commandTimeout in Teleoperate.ino
+MOTOR_MAX = 400          # motors.setSpeeds() range
+MOTOR_TAU = 0.05         # s, wheel speed time constant of the motor model
+KP = 1.0                 # PI gains from Teleoperate.ino
+KI = 2.5
+
+
+class SimulatedZumo:
+    def __init__(self, platform="v01"):
+        p = PLATFORMS[platform]
+        self.wheel_distance = p["wheel_distance"]
+        self.encoder2dist = math.pi * p["wheel_diameter"] / (p["encoder_ppr"] * p["gear_ratio"])
+        # Wheel surface speed at full motor command.
+        self.max_wheel_speed = math.pi * p["wheel_diameter"] * p["free_rpm"] / 60.0
+
+        # True wheel state (mm/s and fractional encoder counts).
+        self.wheel_speed = [0.0, 0.0]
+        self.counts = [0.0, 0.0]
+        self.last_counts = [0, 0]
+
+        # Odometry estimate, as computed on the robot.
+        self.posX = 0.0
+        self.posY = 0.0
+        self.theta = 0.0
+        self.v_left = 0.0
+        self.v_right = 0.0
+
+        # Command state.
+        self.desired_left = 0.0
+        self.desired_right = 0.0
+        self.int_error_left = 0.0
+        self.int_error_right = 0.0
+        self.last_command_time = -COMMAND_TIMEOUT
+        self.leds = [(0, 0, 0)] * LED_COUNT
+
+    def handle_line(self, line, now):
+        """Process one received line. Returns a response line or None."""
+        try:
+            doc = json.loads(line)
+        except json.JSONDecodeError as e:
+            return f"JSON Parse Error: {e.msg}"
+        if not isinstance(doc, dict):
+            return "JSON Parse Error: InvalidInput"
+
+        if "ping" in doc:
+            return line
+        if "vl" in doc and "vr" in doc:
+            try:
+                left = float(doc["vl"])
+                right = float(doc["vr"])
+            except (TypeError, ValueError):
+                return "Invalid value in JSON command"
+            if not (math.isfinite(left) and math.isfinite(right)):
+                return "Invalid value in JSON command"
+            self.desired_left = left
+            self.desired_right = right
+            self.last_command_time = now
+            return None
+        if "LEDNumber" in doc:
+            try:
+                led = int(doc["LEDNumber"])
+            except (TypeError, ValueError, OverflowError):
+                return "Invalid LED number"
+            color = str(doc.get("Color", ""))
+            if led < 0 or led >= LED_COUNT:
+                return "Invalid LED number"
+            if color.lower() not in LED_COLORS:
+                return f"Unknown color: {color}"
+            self.leds[led] = LED_COLORS[color.lower()]
+            return f"Set LED {led} to {color}"
+        return "Missing keys in JSON command"
+
+    def step(self, now, dt=CONTROL_PERIOD):
+        """Advance one control period: PI control, motor model, encoders, odometry."""
+        if now - self.last_command_time > COMMAND_TIMEOUT:
+            self.desired_left = 0.0
+            self.desired_right = 0.0
+            self.int_error_left = 0.0
+            self.int_error_right = 0.0
+
+        # Velocity PI control, as in controlTask().
+        error_left = self.desired_left - self.v_left
+        error_right = self.desired_right - self.v_right
+        self.int_error_left += error_left * dt
+        self.int_error_right += error_right * dt
+        u_left = max(-MOTOR_MAX, min(MOTOR_MAX, KP * error_left + KI * self.int_error_left))
+        u_right = max(-MOTOR_MAX, min(MOTOR_MAX, KP * error_right + KI * self.int_error_right))
+
+        # First-order motor response towards the commanded speed.
+        alpha = dt / (MOTOR_TAU + dt)
+        for i, u in enumerate((int(u_left), int(u_right))):
+            target = u / MOTOR_MAX * self.max_wheel_speed
+            self.wheel_speed[i] += alpha * (target - self.wheel_speed[i])
+            self.counts[i] += self.wheel_speed[i] * dt / self.encoder2dist
+
+        # Encoders only report whole pulses.
+        current = [int(c) for c in self.counts]
+        delta_left = current[0] - self.last_counts[0]
+        delta_right = current[1] - self.last_counts[1]
+        self.last_counts = current
+        self.update_odometry(delta_right, delta_left, dt)
+
+    def update_odometry(self, delta_right, delta_left, dt):
+        # Same midpoint integration as Odometry::update().
+        dx_r = delta_right * self.encoder2dist
+        dx_l = delta_left * self.encoder2dist
+        self.v_right = dx_r / dt
+        self.v_left = dx_l / dt
+        d_theta = (dx_r - dx_l) / self.wheel_distance
+        d_center = (dx_r + dx_l) / 2.0
+        self.posX += d_center * math.cos(self.theta + d_theta / 2.0)
+        self.posY += d_center * math.sin(self.theta + d_theta / 2.0)
+        self.theta += d_theta
+
+    def telemetry(self):
+        return ('{"X":%.2f,"Y":%.2f,"Theta":%.2f,"vL":%.2f,"vR":%.2f}'
+                % (self.posX, self.posY, math.degrees(self.theta), self.v_left, self.v_right))
+
+
+class PtyLink:
+    """The robot's UART: a raw pty whose slave end the Pi-side app opens."""
+
+    def __init__(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port_name = os.ttyname(self.slave_fd)
+        self.rx_buffer = b""
+        self.sent = 0
+        self.dropped = 0
+
+    def read_lines(self):
+        try:
+            self.rx_buffer += os.read(self.master_fd, 4096)
+        except BlockingIOError:
+            return []
+        lines = []
+        while b"\n" in self.rx_buffer:
+            line, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
+            line = line.decode("ascii", errors="ignore").strip()
+            if line:
+                lines.append(line)
+        return lines
+
+    def write_line(self, text):
+        # A real UART drops bytes nobody reads; do the same instead of blocking.
+        try:
+            os.write(self.master_fd, (text + "\n").encode("ascii"))
+            self.sent += 1
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EIO):
+                raise
+            self.dropped += 1
+
+    def close(self):
+        os.close(self.slave_fd)
+        os.close(self.master_fd)
+
+
+def link_rate_limit(baudrate, message_length):
+    """Maximum messages per second an 8N1 UART can carry (10 bits per byte)."""
+    return baudrate / 10.0 / (message_length + 1)
+
+
+def run(robots, links, rate, duration=None, rx_poll=0.0):
+    """
+    Run all robots in one loop until Ctrl+C or `duration` seconds. With
+    rx_poll > 0, received lines are only processed every rx_poll seconds.
+    """
+    start = time.perf_counter()
+    next_control = start
+    next_telemetry = start
+    next_rx = start
+    telemetry_period = 1.0 / rate
+    by_fd = {link.master_fd: (robot, link) for robot, link in zip(robots, links)}
+
+    while duration is None or time.perf_counter() - start < duration:
+        wake = min(next_control, next_telemetry, next_rx if rx_poll else next_control)
+        timeout = max(0.0, wake - time.perf_counter())
+        readable, _, _ = select.select([] if rx_poll else list(by_fd), [], [], timeout)
+        now = time.perf_counter()
+        if rx_poll and now >= next_rx:
+            readable = list(by_fd)
+            next_rx = max(next_rx + rx_poll, now)
+
+        for fd in readable:
+            robot, link = by_fd[fd]
+            for line in link.read_lines():
+                response = robot.handle_line(line, now - start)
+                if response:
+                    link.write_line(response)
+
+        # Catch up on control ticks at a fixed step so dynamics are rate independent.
+        while now >= next_control:
+            for robot in robots:
+                robot.step(next_control - start)
+            next_control += CONTROL_PERIOD
+
+        if now >= next_telemetry:
+            for robot, link in zip(robots, links):
+                link.write_line(robot.telemetry())
+            next_telemetry += telemetry_period
+            if next_telemetry < now:
+                next_telemetry = now + telemetry_period
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Zumo robots on pseudo-terminals")
+    parser.add_argument("--robots", type=int, default=1, help="number of simulated robots")
+    parser.add_argument("--rate", type=float, default=100.0, help="telemetry rate in Hz")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="v01",
+                        help="wheel constants: v01 = ZumoController.h, v02 = Odometry.h examples")
+    parser.add_argument("--baudrate", type=int, default=115200,
+                        help="UART baud rate used to cap the telemetry rate")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--rx-poll", type=float, default=0.0,
+                        help="process received bytes only every N seconds (0 = as they arrive)")
+    args = parser.parse_args()
+
+    robots = [SimulatedZumo(args.platform) for _ in range(args.robots)]
+    links = [PtyLink() for _ in range(args.robots)]
+
+    # Worst-case message length for large coordinates and negative speeds.
+    sample = '{"X":-12345.67,"Y":-12345.67,"Theta":-12345.67,"vL":-1234.56,"vR":-1234.56}'
+    max_rate = link_rate_limit(args.baudrate, len(sample))
+    rate = args.rate
+    if rate > max_rate:
+        print(f"Telemetry rate {rate:.0f} Hz exceeds the {args.baudrate} baud link, using {max_rate:.0f} Hz")
+        rate = max_rate
+
+    for i, link in enumerate(links):
+        print(f"Robot {i}: {link.port_name}")
+    print(f"Platform {args.platform}, telemetry {rate:.0f} Hz. Ctrl+C to stop.")
+
+    try:
+        run(robots, links, rate, args.duration, args.rx_poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for i, link in enumerate(links):
+            print(f"Robot {i}: sent {link.sent} lines, dropped {link.dropped}")
+            link.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/python3
+"""
+Vectorized differential-drive simulator mirroring ZumoController.
+
+Python counterpart of ZumoController::odometry(), control() and P2P_CTRL()
+(V01 PathControl example) and of the Simulink models in Matlab_Simulation.
+Every state variable carries a leading batch axis, so B robots - each with
+its own gains - are simulated in one NumPy step. Sweeping thousands of gain
+sets along a path takes seconds.
+
+Units are SI (m, m/s, rad) like ZumoController.h.
+
+Usage:
+    python3 diff_drive_sim.py --batch 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+# Platform constants from ZumoController.h
+GEAR_RATIO = 100
+WHEELS_DISTANCE = 0.112   # m
+WHEEL_DIAMETER = 0.0375   # m
+ENCODER_PPR = 12
+# The firmware uses 3.14 for pi; the odometry estimate inherits that scale error.
+ENCODER2DIST = WHEEL_DIAMETER * 3.14 / (ENCODER_PPR * GEAR_RATIO)
+
+# Motor model: motorsSetSpeed() range and the wheel speed at full command
+# (100:1 HP motor, ~320 rpm free run).
+MOTOR_MAX = 400
+FREE_WHEEL_SPEED = np.pi * WHEEL_DIAMETER * 320 / 60   # m/s
+MOTOR_TAU = 0.05                                       # s
+
+# P2P_CTRL thresholds
+STOP_DISTANCE = 0.025   # m
+PASS_DISTANCE = 0.05    # m
+
+# Hand-tuned gains from ZumoController.h
+DEFAULT_GAINS = {
+    "Kp": 2000.0,
+    "Ki": 25.0,
+    "Kp_theta": 0.25,
+    "Kp_de": 0.75,
+    "a_max": 0.1,
+    "v_max": 0.15,
+}
+
+# Figure-eight desired_path from PathControl.ino (generated by infSignMath.m), in m.
+FIGURE_EIGHT = np.array([
+    (0.042426, 0.042426), (0.077046, 0.0079789), (0.11062, -0.024426), (0.14266, -0.053409),
+    (0.17249, -0.077685), (0.19926, -0.096164), (0.22175, -0.10817), (0.23849, -0.11388),
+    (0.24856, -0.11498), (0.25357, -0.11407), (0.2579, -0.11159), (0.2644, -0.10486),
+    (0.27236, -0.091744), (0.27997, -0.072333), (0.28586, -0.047971), (0.28928, -0.02042),
+    (0.28988, 0.0084613), (0.28761, 0.036794), (0.28268, 0.062705), (0.27567, 0.084374),
+    (0.26764, 0.10022), (0.26032, 0.10948), (0.2552, 0.11335), (0.25104, 0.11473),
+    (0.24348, 0.11475), (0.22949, 0.11125), (0.20921, 0.10196), (0.18406, 0.086127),
+    (0.15538, 0.064147), (0.12417, 0.036973), (0.091165, 0.0058275), (0.056924, -0.027941),
+    (0.021886, -0.062931), (-0.013608, -0.097754), (-0.04932, -0.13108), (-0.085148, -0.16171),
+    (-0.1212, -0.18854), (-0.15788, -0.21057), (-0.19599, -0.22657), (-0.23627, -0.23458),
+    (-0.27792, -0.2317), (-0.31689, -0.2163), (-0.34868, -0.19074), (-0.37232, -0.15903),
+    (-0.38917, -0.12362), (-0.40059, -0.085645), (-0.4074, -0.045863), (-0.40997, -0.0050792),
+    (-0.40842, 0.035818), (-0.40269, 0.075927), (-0.39246, 0.11442), (-0.37707, 0.15054),
+    (-0.35526, 0.18333), (-0.32554, 0.21075), (-0.28803, 0.22903), (-0.24656, 0.235),
+    (-0.20575, 0.2294), (-0.16716, 0.21515), (-0.1302, 0.19449), (-0.09405, 0.16875),
+    (-0.058187, 0.13897), (-0.022443, 0.1062), (0.013123, 0.071628), (0.11062, -0.024426),
+])
+
+
+def make_params(batch, **overrides):
+    """
+    Build a gain dictionary of (batch,) arrays. Overrides may be scalars or
+    arrays of length `batch`; everything else takes the ZumoController default.
+    """
+    params = {}
+    for name, default in DEFAULT_GAINS.items():
+        value = overrides.pop(name, default)
+        params[name] = np.broadcast_to(np.asarray(value, dtype=float), (batch,)).copy()
+    if overrides:
+        raise KeyError(f"Unknown parameters: {', '.join(overrides)}")
+    return params
+
+
+class BatchSimulator:
+    def __init__(self, path, params, dt=0.01, quantize=True, initial_pose=(0.0, 0.0, 0.0),
+                 motor_tau=MOTOR_TAU, wheels_distance=WHEELS_DISTANCE):
+        """
+        path: (N, 2) waypoints in m, shared by all robots.
+        params: dict of (B,) gain arrays, see make_params().
+        quantize: count whole encoder pulses like the real robot.
+        initial_pose: (x, y, theta), scalars or (B,) arrays.
+        """
+        self.path = np.asarray(path, dtype=float)
+        self.num_points = len(self.path)
+        self.params = params
+        self.batch = len(next(iter(params.values())))
+        self.dt = dt
+        self.quantize = quantize
+        self.initial_pose = initial_pose
+        self.motor_alpha = dt / (motor_tau + dt)
+        self.wheels_distance = wheels_distance
+
+        # P2P_CTRL re-sums the remaining segment lengths every tick; the same
+        # sums come from one suffix sum. remaining[i] = path length from point i.
+        seg = np.hypot(*np.diff(self.path, axis=0).T)
+        self.remaining = np.concatenate([np.cumsum(seg[::-1])[::-1], [0.0]])
+
+        self.reset()
+
+    def reset(self):
+        B = self.batch
+        x0, y0, th0 = (np.broadcast_to(np.asarray(v, dtype=float), (B,)).copy()
+                       for v in self.initial_pose)
+
+        # True plant state.
+        self.true_pose = np.stack([x0, y0, th0], axis=1)
+        self.wheel_speed = np.zeros((B, 2))    # left, right [m/s]
+        self.counts = np.zeros((B, 2))         # encoder pulses
+        self.last_counts = np.zeros((B, 2))
+
+        # ZumoController::car_state (odometry estimate).
+        self.pose = self.true_pose.copy()
+        self.v_meas = np.zeros((B, 2))
+
+        # ZumoController::path_state and controller memory.
+        self.curr_point = np.zeros(B, dtype=int)
+        self.v_forward = np.zeros(B)
+        self.prev_v_forward = np.zeros(B)
+        self.theta_t = np.zeros(B)
+        self.de = np.zeros(B)
+        self.dist = np.zeros(B)
+        self.v_target = np.zeros((B, 2))
+        self.err_sum = np.zeros((B, 2))
+        self.u = np.zeros((B, 2))
+
+        # Run bookkeeping.
+        self.time = 0.0
+        self.done = np.zeros(B, dtype=bool)
+        self.completion_time = np.full(B, np.inf)
+        self.de_sq_integral = np.zeros(B)
+        self.de_abs_max = np.zeros(B)
+
+    def step(self):
+        """One 10 ms tick of PathControl.ino: odometry(), P2P_CTRL(), then the plant moves."""
+        self.odometry()
+        self.p2p_ctrl()
+        self.plant()
+        self.time += self.dt
+
+    def odometry(self):
+        if self.quantize:
+            counts = np.floor(self.counts)
+        else:
+            counts = self.counts.copy()
+        delta = counts - self.last_counts
+        self.last_counts = counts
+
+        dx = delta * ENCODER2DIST                  # left, right
+        self.v_meas = dx / self.dt
+        d_theta = (dx[:, 1] - dx[:, 0]) / WHEELS_DISTANCE
+        d_center = (dx[:, 0] + dx[:, 1]) / 2
+        heading = self.pose[:, 2] + d_theta / 2
+        self.pose[:, 0] += np.cos(heading) * d_center
+        self.pose[:, 1] += np.sin(heading) * d_center
+        self.pose[:, 2] += d_theta
+
+    def p2p_ctrl(self):
+        p = self.params
+        path = self.path
+        last = self.num_points - 1
+        idx = self.curr_point
+        pos = self.pose[:, :2]
+        theta = self.pose[:, 2]
+
+        # Car direction, target direction and path direction vectors.
+        Vr = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+        target = path[idx]
+        Vt = target - pos
+        Vd = np.where((idx > 0)[:, None], target - path[np.maximum(idx - 1, 0)], target)
+
+        cross_VdVr = Vd[:, 1] * Vr[:, 0] - Vd[:, 0] * Vr[:, 1]
+        cross_VtVd = Vt[:, 1] * Vd[:, 0] - Vt[:, 0] * Vd[:, 1]
+        norm_Vd = np.hypot(Vd[:, 0], Vd[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dot_VdVr = (Vd[:, 0] * Vr[:, 0] + Vd[:, 1] * Vr[:, 1]) / norm_Vd
+            self.de = cross_VtVd / norm_Vd
+
+        # Remaining distance and pass-to-next-point condition.
+        dist = np.hypot(Vt[:, 0], Vt[:, 1])
+        not_last = idx < last
+        next_point = path[np.minimum(idx + 1, last)]
+        dist_next = np.hypot(*(next_point - pos).T)
+        advance = not_last & ((np.abs(dist) < PASS_DISTANCE) | (dist_next < dist))
+        dist = dist + np.where(not_last, self.remaining[idx], 0.0)
+        self.curr_point = idx + advance
+        self.dist = dist
+
+        # Desired heading change towards the path direction.
+        direction = np.where(cross_VdVr > 0, 1.0, -1.0)
+        self.theta_t = np.where(np.abs(cross_VdVr) < 0.001,
+                                np.where(dot_VdVr == -1, np.pi / 2, 0.0),
+                                np.arccos(np.clip(dot_VdVr, -1.0, 1.0)) * direction)
+
+        # Stop condition: last point reached, or passed it.
+        dot_VtVr = Vt[:, 0] * Vr[:, 0] + Vt[:, 1] * Vr[:, 1]
+        stop = (self.curr_point == last) & ((np.abs(dist) < STOP_DISTANCE) | (dot_VtVr < -0.1))
+        run = ~stop
+
+        # Desired forward velocity with the slew limit on the command profile.
+        v_forward = np.sqrt(2 * p["a_max"] * dist) / 2
+        max_change = p["a_max"] * self.dt
+        prev = self.prev_v_forward
+        v_forward = np.where(v_forward - prev >= max_change, prev + max_change, v_forward)
+        v_forward = np.where(v_forward - prev <= -max_change, prev - max_change, v_forward)
+        self.prev_v_forward = np.where(run, v_forward, prev)
+        v_forward = np.minimum(v_forward, p["v_max"])
+
+        steer = self.theta_t * p["Kp_theta"] + self.de * p["Kp_de"]
+        v_target = np.stack([v_forward - steer, v_forward + steer], axis=1)
+        self.v_target = np.where(run[:, None], v_target, self.v_target)
+        self.v_forward = np.where(run, v_forward, 0.0)
+        self.theta_t = np.where(run, self.theta_t, 0.0)
+
+        # control(): PI on wheel speed, integer motor command, saturation.
+        error = self.v_target - self.v_meas
+        self.err_sum = np.where(run[:, None], self.err_sum + error, self.err_sum)
+        u = np.trunc(p["Kp"][:, None] * error + p["Ki"][:, None] * self.err_sum)
+        u = np.clip(u, -MOTOR_MAX, MOTOR_MAX)
+        self.u = np.where(run[:, None], u, 0.0)
+
+        # Bookkeeping: first stop marks completion; track cross-track error while running.
+        newly_done = stop & ~self.done
+        self.completion_time[newly_done] = self.time
+        self.done |= stop
+        active = ~self.done & np.isfinite(self.de)
+        self.de_sq_integral += np.where(active, self.de ** 2, 0.0) * self.dt
+        self.de_abs_max = np.where(active, np.maximum(self.de_abs_max, np.abs(self.de)), self.de_abs_max)
+
+    def plant(self):
+        # First-order motor response, then exact wheel displacements over dt.
+        target_speed = self.u / MOTOR_MAX * FREE_WHEEL_SPEED
+        self.wheel_speed += self.motor_alpha * (target_speed - self.wheel_speed)
+        dx = self.wheel_speed * self.dt
+        self.counts += dx / (WHEEL_DIAMETER * np.pi / (ENCODER_PPR * GEAR_RATIO))
+
+        d_theta = (dx[:, 1] - dx[:, 0]) / self.wheels_distance
+        d_center = (dx[:, 0] + dx[:, 1]) / 2
+        heading = self.true_pose[:, 2] + d_theta / 2
+        self.true_pose[:, 0] += np.cos(heading) * d_center
+        self.true_pose[:, 1] += np.sin(heading) * d_center
+        self.true_pose[:, 2] += d_theta
+
+    def run(self, max_time=60.0, record=False):
+        """
+        Step until every robot has stopped or `max_time` has passed.
+
+        Returns a dict of per-robot results. With record=True it also holds
+        'pose' and 'true_pose' histories of shape (T, B, 3).
+        """
+        history, true_history = [], []
+        steps = int(round(max_time / self.dt))
+        for _ in range(steps):
+            self.step()
+            if record:
+                history.append(self.pose.copy())
+                true_history.append(self.true_pose.copy())
+            if self.done.all():
+                break
+
+        run_time = np.minimum(self.completion_time, self.time)
+        result = {
+            "done": self.done.copy(),
+            "completion_time": self.completion_time.copy(),
+            "rms_de": np.sqrt(self.de_sq_integral / np.maximum(run_time, self.dt)),
+            "max_de": self.de_abs_max.copy(),
+            "final_pose": self.pose.copy(),
+            "final_true_pose": self.true_pose.copy(),
+            "sim_time": self.time,
+        }
+        if record:
+            result["pose"] = np.array(history)
+            result["true_pose"] = np.array(true_history)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched ZumoController path-following simulation")
+    parser.add_argument("--batch", type=int, default=1000, help="number of robots simulated at once")
+    parser.add_argument("--max-time", type=float, default=60.0, help="simulated seconds")
+    args = parser.parse_args()
+
+    # Sweep the heading gain around the hand-tuned value, other gains at defaults.
+    rng = np.random.default_rng(0)
+    params = make_params(args.batch,
+                         Kp_theta=rng.uniform(0.05, 1.0, args.batch),
+                         Kp_de=rng.uniform(0.1, 2.0, args.batch))
+    sim = BatchSimulator(FIGURE_EIGHT, params)
+
+    start = time.perf_counter()
+    result = sim.run(args.max_time)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {args.batch} robots x {result['sim_time']:.1f} s in {elapsed:.2f} s wall time")
+    print(f"Completed: {result['done'].sum()} / {args.batch}")
+    if result["done"].any():
+        best = np.argmin(np.where(result["done"], result["rms_de"], np.inf))
+        print(f"Best RMS cross-track error {result['rms_de'][best] * 1000:.1f} mm "
+              f"(Kp_theta={params['Kp_theta'][best]:.3f}, Kp_de={params['Kp_de'][best]:.3f}, "
+              f"{result['completion_time'][best]:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
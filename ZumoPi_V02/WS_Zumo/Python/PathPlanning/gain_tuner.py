@@ -0,0 +1,168 @@
+#!/usr/bin/python3
+"""
+Parallel gain tuner for P2P path following.
+
+Samples candidate gain sets for ZumoController (Kp, Ki, Kp_theta, Kp_de,
+a_max, v_max), simulates them on a path with diff_drive_sim.BatchSimulator
+across a process pool, scores each run by cross-track error (true robot
+position against the path polyline) and completion time, and writes the
+Pareto front of the two objectives.
+
+Candidates come from a seeded random generator and every chunk is simulated
+deterministically, so the same seed gives the same front regardless of the
+number of worker processes.
+
+Usage:
+    python3 gain_tuner.py --samples 20000 --workers 8 --out pareto.csv
+    python3 gain_tuner.py --path mypath.csv --fix Kp=2000 --fix Ki=25
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from diff_drive_sim import BatchSimulator, DEFAULT_GAINS, FIGURE_EIGHT, make_params
+from path_planner import load_path
+from path_tracking import PathTracker
+
+# Search ranges (low, high) for each gain.
+DEFAULT_RANGES = {
+    "Kp": (500.0, 4000.0),
+    "Ki": (0.0, 100.0),
+    "Kp_theta": (0.05, 1.0),
+    "Kp_de": (0.1, 3.0),
+    "a_max": (0.05, 0.3),
+    "v_max": (0.1, 0.3),
+}
+
+SCORE_EVERY = 10   # score the true pose every N simulation ticks
+
+
+def sample_candidates(n, seed, ranges=None, fixed=None):
+    """Draw n gain sets uniformly within `ranges`; `fixed` gains are held constant."""
+    ranges = dict(DEFAULT_RANGES, **(ranges or {}))
+    fixed = fixed or {}
+    rng = np.random.default_rng(seed)
+    candidates = {}
+    for name in DEFAULT_GAINS:
+        if name in fixed:
+            candidates[name] = np.full(n, float(fixed[name]))
+        else:
+            low, high = ranges[name]
+            candidates[name] = rng.uniform(low, high, n)
+    return candidates
+
+
+def evaluate_chunk(path, gains, max_time):
+    """Simulate one chunk of candidates. Returns (rms_error, max_error, completion_time)."""
+    batch = len(gains["Kp"])
+    sim = BatchSimulator(path, make_params(batch, **gains))
+    steps = int(round(max_time / sim.dt))
+    tracker = PathTracker(path, window_ahead=SCORE_EVERY)
+    last_index = np.full(batch, -1)
+    err_sq = np.zeros(batch)
+    err_max = np.zeros(batch)
+    samples = np.zeros(batch)
+    for i in range(steps):
+        sim.step()
+        if i % SCORE_EVERY == 0:
+            running = ~sim.done
+            proj = tracker.project_batch(sim.true_pose[running, :2], last_index[running])
+            last_index[running] = proj["index"]
+            d = np.abs(proj["cross_track"])
+            err_sq[running] += d ** 2
+            err_max[running] = np.maximum(err_max[running], d)
+            samples[running] += 1
+        if sim.done.all():
+            break
+    rms = np.sqrt(err_sq / np.maximum(samples, 1))
+    return rms, err_max, sim.completion_time.copy()
+
+
+def pareto_front(cost_a, cost_b):
+    """Indices of the points not dominated in (cost_a, cost_b), both minimised."""
+    order = np.lexsort((cost_b, cost_a))
+    front = []
+    best_b = np.inf
+    for i in order:
+        if np.isfinite(cost_a[i]) and cost_b[i] < best_b:
+            front.append(i)
+            best_b = cost_b[i]
+    return np.array(front, dtype=int)
+
+
+def tune(path, candidates, max_time=60.0, workers=None, chunk_size=256):
+    """Evaluate all candidates on a process pool. Returns a dict of result arrays."""
+    n = len(candidates["Kp"])
+    chunks = [{k: v[i:i + chunk_size] for k, v in candidates.items()} for i in range(0, n, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(evaluate_chunk, [path] * len(chunks), chunks, [max_time] * len(chunks)))
+    rms, err_max, completion = (np.concatenate(r) for r in zip(*results))
+    return {"rms_error": rms, "max_error": err_max, "completion_time": completion}
+
+
+def write_results(filename, indices, candidates, scores):
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(list(DEFAULT_GAINS) + ["rms_error_mm", "max_error_mm", "completion_time_s"])
+        for i in indices:
+            writer.writerow([f"{candidates[k][i]:.6g}" for k in DEFAULT_GAINS] +
+                            [f"{scores['rms_error'][i] * 1000:.2f}",
+                             f"{scores['max_error'][i] * 1000:.2f}",
+                             f"{scores['completion_time'][i]:.2f}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune ZumoController gains on a simulated plant")
+    parser.add_argument("--path", default=None, help="x,y CSV path in m (default: PathControl.ino figure-eight)")
+    parser.add_argument("--samples", type=int, default=5000, help="number of candidate gain sets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="candidates simulated per batch")
+    parser.add_argument("--max-time", type=float, default=60.0, help="simulated seconds per run")
+    parser.add_argument("--fix", action="append", default=[], metavar="NAME=VALUE",
+                        help="hold a gain constant, e.g. --fix Kp=2000")
+    parser.add_argument("--out", default="pareto.csv", help="CSV file for the Pareto front")
+    parser.add_argument("--all-out", default=None, help="optional CSV file with every evaluated candidate")
+    args = parser.parse_args()
+
+    fixed = {}
+    for item in args.fix:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_GAINS:
+            parser.error(f"unknown gain {name}")
+        fixed[name] = float(value)
+
+    path = FIGURE_EIGHT if args.path is None else load_path(args.path)
+    candidates = sample_candidates(args.samples, args.seed, fixed=fixed)
+
+    start = time.perf_counter()
+    scores = tune(path, candidates, args.max_time, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    completed = np.isfinite(scores["completion_time"])
+    front = pareto_front(scores["rms_error"], scores["completion_time"])
+    front = front[np.argsort(scores["completion_time"][front])]
+    print(f"Evaluated {args.samples} gain sets on {args.workers or os.cpu_count()} workers in {elapsed:.1f} s")
+    print(f"{completed.sum()} completed the path, {len(front)} on the Pareto front")
+
+    # Reference: the hand-tuned ZumoController gains.
+    reference = {k: np.array([v]) for k, v in DEFAULT_GAINS.items()}
+    ref_rms, _, ref_time = evaluate_chunk(path, reference, args.max_time)
+    print(f"ZumoController defaults: {ref_rms[0] * 1000:.1f} mm RMS, {ref_time[0]:.1f} s")
+
+    for i in front[:10]:
+        gains = ", ".join(f"{k}={candidates[k][i]:.3g}" for k in DEFAULT_GAINS)
+        print(f"  {scores['rms_error'][i] * 1000:6.1f} mm RMS  {scores['completion_time'][i]:5.1f} s  {gains}")
+
+    write_results(args.out, front, candidates, scores)
+    print(f"Pareto front written to {args.out}")
+    if args.all_out:
+        write_results(args.all_out, range(args.samples), candidates, scores)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/python3
+"""
+Time-optimal velocity planning along a path.
+
+P2P_CTRL picks v_forward = sqrt(2*a_max*dist)/2 with a slew limit, and
+motionProfile.m only prototypes a trapezoid. This module plans the fastest
+velocity profile along a resampled path (see path_planner.PathTable) subject
+to:
+
+  - a top speed v_max
+  - a lateral acceleration limit: v <= sqrt(a_lat_max / |curvature|)
+  - a wheel speed limit: the outer wheel runs at v * (1 + |curvature| * L / 2)
+  - a tangential acceleration/deceleration limit a_max
+
+The acceleration limit is applied with the classic forward/backward pass
+over the arc-length samples. Each pass is a prefix scan that is vectorized
+over the samples: with w = v^2, a constant-acceleration limit between samples
+reads w[i+1] <= w[i] + 2*a_max*ds, so w[i] - 2*a_max*s[i] must be a running
+minimum - one np.minimum.accumulate instead of a Python loop.
+
+The result is a time-parameterised reference (t, x, y, heading, v, omega)
+that the robot or diff_drive_sim can track.
+
+Usage:
+    python3 motion_profile.py --benchmark
+    python3 motion_profile.py --spacing 0.01 --a-max 0.2 --v-max 0.25
+"""
+import argparse
+import time
+
+import numpy as np
+
+from path_planner import PathTable, cumulative_distance, lemniscate
+
+WHEELS_DISTANCE = 0.098   # m, V02 Odometry wheel distance
+
+
+def curvature_limit(curvature, v_max, a_lat_max, wheel_v_max=None, wheels_distance=WHEELS_DISTANCE):
+    """Pointwise speed limit from v_max, lateral acceleration and outer wheel speed."""
+    k = np.abs(curvature)
+    with np.errstate(divide="ignore"):
+        v_lim = np.minimum(v_max, np.sqrt(a_lat_max / k))
+    if wheel_v_max is not None:
+        v_lim = np.minimum(v_lim, wheel_v_max / (1.0 + k * wheels_distance / 2.0))
+    return v_lim
+
+
+def acceleration_pass(s, v_limit, a_max, v_start):
+    """
+    Forward pass: the fastest profile below v_limit that accelerates at most
+    a_max from v_start. Vectorized as a running minimum of v^2 - 2*a*s.
+    """
+    w = v_limit ** 2
+    w[0] = min(w[0], v_start ** 2)
+    offset = 2.0 * a_max * s
+    return np.sqrt(np.maximum(np.minimum.accumulate(w - offset) + offset, 0.0))
+
+
+def plan_profile(table, v_max=0.15, a_max=0.1, a_lat_max=0.3, wheel_v_max=None,
+                 v_start=0.0, v_end=0.0, d_max=None):
+    """
+    Velocity profile over the samples of `table`.
+
+    d_max is the deceleration limit (defaults to a_max). Returns v at each sample.
+    """
+    d_max = a_max if d_max is None else d_max
+    s = table.s
+    v_lim = curvature_limit(table.curvature, v_max, a_lat_max, wheel_v_max)
+
+    forward = acceleration_pass(s, v_lim.copy(), a_max, v_start)
+    # Backward pass: the same scan on the reversed path limits deceleration.
+    backward = acceleration_pass(s[-1] - s[::-1], v_lim[::-1].copy(), d_max, v_end)[::-1]
+    return np.minimum(forward, backward)
+
+
+def time_stamps(s, v):
+    """Time at each sample, assuming constant acceleration between samples."""
+    ds = np.diff(s)
+    v_mean = (v[1:] + v[:-1]) / 2.0
+    with np.errstate(divide="ignore"):
+        dt = np.where(v_mean > 1e-9, ds / v_mean, np.inf)
+    return np.concatenate([[0.0], np.cumsum(dt)])
+
+
+class TimedReference:
+    """A time-parameterised reference along a path, sampled on demand."""
+
+    def __init__(self, table, v):
+        self.table = table
+        self.v = v
+        self.t = time_stamps(table.s, v)
+        self.duration = self.t[-1]
+
+    def sample(self, dt=0.01):
+        """Resample the reference at a fixed control period. Returns a dict of arrays."""
+        if not np.isfinite(self.duration):
+            raise ValueError("Profile stops before the end of the path (zero speed inside the path)")
+        t = np.arange(0.0, self.duration + dt, dt)
+        s = np.interp(t, self.t, self.table.s)
+        v = np.interp(t, self.t, self.v)
+        k = np.interp(s, self.table.s, self.table.curvature)
+        return {
+            "t": t,
+            "s": s,
+            "x": np.interp(s, self.table.s, self.table.points[:, 0]),
+            "y": np.interp(s, self.table.s, self.table.points[:, 1]),
+            "heading": np.interp(s, self.table.s, self.table.heading),
+            "v": v,
+            "omega": v * k,
+        }
+
+    def wheel_speeds(self, dt=0.01, wheels_distance=WHEELS_DISTANCE):
+        """Left/right wheel speed references (m/s) at the control period."""
+        ref = self.sample(dt)
+        half = ref["omega"] * wheels_distance / 2.0
+        return ref["t"], ref["v"] - half, ref["v"] + half
+
+
+def trapezoid_time(length, v_max, a_max):
+    """Travel time of the motionProfile.m style trapezoid on a straight line."""
+    d_acc = v_max ** 2 / a_max
+    if length < d_acc:
+        return 2.0 * np.sqrt(length / a_max)
+    return 2.0 * v_max / a_max + (length - d_acc) / v_max
+
+
+def benchmark(points=10000, repeats=20):
+    # Three lemniscate laps resampled to `points` samples.
+    raw = lemniscate()
+    raw = np.vstack([raw, raw, raw])
+    spacing = cumulative_distance(raw)[-1] / (points - 1)
+    table = PathTable.from_points(raw, spacing)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        v = plan_profile(table)
+    elapsed = (time.perf_counter() - start) / repeats
+    ref = TimedReference(table, v)
+    print(f"{len(table)} samples, {table.length:.2f} m: {elapsed * 1000:.2f} ms per profile, "
+          f"duration {ref.duration:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curvature and acceleration limited velocity planning")
+    parser.add_argument("--spacing", type=float, default=0.01, help="path sample spacing in m")
+    parser.add_argument("--v-max", type=float, default=0.15, help="m/s")
+    parser.add_argument("--a-max", type=float, default=0.1, help="m/s^2")
+    parser.add_argument("--a-lat-max", type=float, default=0.3, help="lateral acceleration limit, m/s^2")
+    parser.add_argument("--wheel-v-max", type=float, default=None, help="outer wheel speed limit, m/s")
+    parser.add_argument("--out", default=None, help="write t,x,y,heading,v,omega CSV at 100 Hz")
+    parser.add_argument("--benchmark", action="store_true", help="time the planner on a 10k-point path")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    table = PathTable.from_points(lemniscate(), args.spacing)
+    v = plan_profile(table, args.v_max, args.a_max, args.a_lat_max, args.wheel_v_max)
+    ref = TimedReference(table, v)
+    print(f"Path {table.length:.3f} m, {len(table)} samples")
+    print(f"Profile duration {ref.duration:.2f} s, peak {v.max():.3f} m/s, min inside path "
+          f"{v[1:-1].min():.3f} m/s")
+    print(f"Straight-line trapezoid of the same length: {trapezoid_time(table.length, args.v_max, args.a_max):.2f} s")
+
+    if args.out:
+        ref_samples = ref.sample()
+        keys = ["t", "x", "y", "heading", "v", "omega"]
+        np.savetxt(args.out, np.column_stack([ref_samples[k] for k in keys]),
+                   delimiter=",", header=",".join(keys), comments="", fmt="%.5f")
+        print(f"Reference written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
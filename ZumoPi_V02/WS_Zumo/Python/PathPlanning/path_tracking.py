@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+"""
+Nearest-path-point queries for path tracking.
+
+P2P_CTRL picks `currPoint` by comparing the distance to the current and the
+next waypoint only. On a self-intersecting path like the figure-eight that
+can jump lobes at the crossing, and the remaining distance needs an O(N) sum.
+
+PathTracker projects a position onto the path polyline and returns the
+closest point, the signed cross-track error and the progress along the path:
+
+  - the normal query searches a small window of segments around the last
+    index (slightly backwards, mostly forwards), so the tracker follows the
+    path through crossings instead of snapping to the other lobe
+  - if the window result is farther than `lost_distance` (start-up, robot
+    picked up and moved) a global query runs on a bounding-box index of
+    segment blocks, visiting blocks nearest-first until no closer segment
+    can exist
+  - progress and remaining distance come from the cumulative-distance table,
+    so they cost nothing extra
+
+project_batch() does the windowed query for many robots at once; gain_tuner
+uses it to score simulated runs.
+
+Usage:
+    python3 path_tracking.py --benchmark
+"""
+import argparse
+import time
+
+import numpy as np
+
+
+def project_on_segments(p, a, b):
+    """
+    Project points p onto segments a->b (broadcasting over leading axes).
+    Returns (t, closest_point, distance) with t clipped to [0, 1].
+    """
+    ab = b - a
+    len2 = np.maximum((ab ** 2).sum(axis=-1), 1e-18)
+    t = np.clip(((p - a) * ab).sum(axis=-1) / len2, 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    dist = np.sqrt(((p - closest) ** 2).sum(axis=-1))
+    return t, closest, dist
+
+
+class SegmentIndex:
+    """
+    Two-level bounding-box index over the path segments for global queries.
+
+    Consecutive segments are grouped into blocks of ~sqrt(N) and each block
+    keeps its bounding box. A query measures the distance to every box in
+    one vectorized step, then checks blocks in order of that lower bound
+    until no remaining box can hold a closer segment - usually one or two
+    blocks, so a query touches O(sqrt(N)) data instead of all N segments.
+    """
+
+    def __init__(self, points, block_size=None):
+        self.a = points[:-1]
+        self.b = points[1:]
+        n = len(self.a)
+        self.block_size = block_size or max(int(np.ceil(np.sqrt(n))), 1)
+        starts = np.arange(0, n, self.block_size)
+        lo = np.minimum(self.a, self.b)
+        hi = np.maximum(self.a, self.b)
+        self.block_start = starts
+        self.block_lo = np.minimum.reduceat(lo, starts, axis=0)
+        self.block_hi = np.maximum.reduceat(hi, starts, axis=0)
+
+    def nearest(self, p):
+        """Index of the segment closest to point p."""
+        # Distance from p to each block's box (0 inside) is a lower bound for its segments.
+        gap = np.maximum(np.maximum(self.block_lo - p, p - self.block_hi), 0.0)
+        bound = np.hypot(gap[:, 0], gap[:, 1])
+        best_seg, best_dist = -1, np.inf
+        for block in np.argsort(bound):
+            if bound[block] >= best_dist:
+                break
+            first = self.block_start[block]
+            last = first + self.block_size
+            _, _, dist = project_on_segments(p, self.a[first:last], self.b[first:last])
+            i = int(np.argmin(dist))
+            if dist[i] < best_dist:
+                best_seg, best_dist = first + i, dist[i]
+        return int(best_seg)
+
+
+class PathTracker:
+    def __init__(self, points, window_back=2, window_ahead=10, lost_distance=0.1):
+        """
+        points: (N, 2) path waypoints (any unit; lost_distance uses the same unit).
+        window_back / window_ahead: segments searched around the last index.
+        """
+        self.points = np.asarray(points, dtype=float)
+        self.a = self.points[:-1]
+        self.b = self.points[1:]
+        self.num_segments = len(self.a)
+        self.seg_len = np.hypot(*(self.b - self.a).T)
+        self.s = np.concatenate([[0.0], np.cumsum(self.seg_len)])
+        self.length = self.s[-1]
+        self.window = np.arange(-window_back, window_ahead + 1)
+        self.lost_distance = lost_distance
+        self.index = SegmentIndex(self.points)
+        self.last_index = None
+
+    def project(self, xy, last_index=None):
+        """
+        Project one position. Uses (and updates) the tracker's own last index
+        unless one is given. Returns a dict with index (segment), t, point,
+        cross_track (positive = left of the path), progress, remaining, heading.
+        """
+        xy = np.asarray(xy, dtype=float)
+        if last_index is None:
+            last_index = self.last_index
+        if last_index is None:
+            seg = self.index.nearest(xy)
+        else:
+            segs = np.clip(last_index + self.window, 0, self.num_segments - 1)
+            _, _, dist = project_on_segments(xy, self.a[segs], self.b[segs])
+            i = int(np.argmin(dist))
+            seg = int(segs[i])
+            if dist[i] > self.lost_distance:
+                seg = self.index.nearest(xy)
+        self.last_index = seg
+        result = self._describe(xy[None], np.array([seg]))
+        return {k: v[0] for k, v in result.items()}
+
+    def project_batch(self, xy, last_index):
+        """
+        Windowed projection for B robots. xy is (B, 2), last_index is (B,)
+        (use -1 for robots without a previous index). Robots outside the
+        window fall back to the global index query one by one.
+        """
+        xy = np.asarray(xy, dtype=float)
+        last_index = np.asarray(last_index)
+        segs = np.clip(last_index[:, None] + self.window[None, :], 0, self.num_segments - 1)
+        _, _, dist = project_on_segments(xy[:, None, :], self.a[segs], self.b[segs])
+        best = np.argmin(dist, axis=1)
+        seg = segs[np.arange(len(xy)), best]
+
+        lost = (dist[np.arange(len(xy)), best] > self.lost_distance) | (last_index < 0)
+        for i in np.flatnonzero(lost):
+            seg[i] = self.index.nearest(xy[i])
+        return self._describe(xy, seg)
+
+    def _describe(self, xy, seg):
+        a, b = self.a[seg], self.b[seg]
+        t, closest, dist = project_on_segments(xy, a, b)
+        d = b - a
+        cross = d[:, 0] * (xy[:, 1] - a[:, 1]) - d[:, 1] * (xy[:, 0] - a[:, 0])
+        progress = self.s[seg] + t * self.seg_len[seg]
+        return {
+            "index": seg,
+            "t": t,
+            "point": closest,
+            "cross_track": np.where(cross >= 0, dist, -dist),
+            "progress": progress,
+            "remaining": self.length - progress,
+            "heading": np.arctan2(d[:, 1], d[:, 0]),
+        }
+
+    def point_at(self, progress):
+        """Path point(s) at the given arc-length progress (clipped to the path)."""
+        progress = np.clip(progress, 0.0, self.length)
+        return np.column_stack([np.interp(progress, self.s, self.points[:, 0]),
+                                np.interp(progress, self.s, self.points[:, 1])])
+
+
+def benchmark(points=10000, queries=20000):
+    from path_planner import PathTable, lemniscate
+
+    raw = np.vstack([lemniscate()] * 3)
+    table = PathTable.from_points(raw, 9.0 / points)
+    tracker = PathTracker(table.points, lost_distance=0.05)
+    rng = np.random.default_rng(0)
+
+    # Robots moving along the path with noise: windowed queries.
+    s = np.sort(rng.uniform(0, table.length, queries))
+    xy = tracker.point_at(s) + rng.normal(0, 0.01, (queries, 2))
+    start = time.perf_counter()
+    index = -1
+    for p in xy:
+        index = tracker.project(p, index if index >= 0 else None)["index"]
+    windowed = (time.perf_counter() - start) / queries
+
+    # Random points anywhere: global index queries.
+    xy = rng.uniform(table.points.min(axis=0), table.points.max(axis=0), (2000, 2))
+    start = time.perf_counter()
+    for p in xy:
+        tracker.index.nearest(p)
+    indexed = (time.perf_counter() - start) / len(xy)
+
+    start = time.perf_counter()
+    for p in xy:
+        np.argmin(project_on_segments(p, tracker.a, tracker.b)[2])
+    brute = (time.perf_counter() - start) / len(xy)
+
+    print(f"{len(table)} waypoints")
+    print(f"windowed query {windowed * 1e6:.1f} us, index query {indexed * 1e6:.1f} us, "
+          f"brute force {brute * 1e6:.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Path tracking spatial index")
+    parser.add_argument("--benchmark", action="store_true", help="time queries on a 10k-point path")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()